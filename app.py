@@ -1,11 +1,37 @@
 # app.py
+import os
+import time
 import streamlit as st
-from views.economic import show_mobility_ladder, show_data_verification
-from views.mobility import show_mobility_visualizations
-from views.affordability import show_affordability_analysis
-from views.institution import show_institution_profile
-from views.enrollment import show_enrollment_patterns
-import pandas as pd
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+from utils.metrics import mark_session_active, observe_rerun, start_exporter
+from utils.profiling import PROFILE_ALWAYS, begin_rerun, end_rerun, label_rerun
+from views.registry import show_view
+
+# Define navigation structure
+NAV_STRUCTURE = {
+    "Mobility Ladder": {
+        "Four Year College": [
+            "Cumulative Probability",
+            "Individual Probability",
+            "Data Verification"
+        ],
+    },
+    "Mobility vs Affordability": {
+        "Four Year College": ["Mobility vs Affordability Quadrant", "Cost Trends"],
+    },
+    "Institution Explorer": {
+        "Four Year College": ["Institution Profile", "Peer Comparison"]
+    },
+    "Enrollment Explorer": {
+        "Four Year College": ["Enrollment Patterns", "Counterfactual Enrollment"]
+    },
+    "Mobility Work": {
+        "Four Year College": ["Work Analysis", "Mobility Rate Leaderboard"]
+    },
+    "Data Explorer": {
+        "Four Year College": ["SQL Query", "Covariate Correlations"]
+    }
+}
 
 def get_page_config():
     return {
@@ -36,6 +62,7 @@ def show_home():
     1. **Select Category** - Choose between:
        - *Mobility Ladder*: Examine how students from a specific parent income quintile move across income quintiles
        - *Mobility vs Affordability*: Explore the relationship between mobility rates and college costs
+       - *Data Explorer*: Ask ad-hoc questions of the data with SQL, or see how institutional characteristics correlate with mobility
     
     2. **Select Analysis Group** - Currently focused on four-year colleges
     
@@ -96,63 +123,98 @@ def apply_filters(df, include_inst_group=True):
     
     return df
 
+def debug_enabled():
+    """
+    Whether the hidden debug panel is on (?debug=1 or SEMD_DEBUG=1)
+    """
+    return st.query_params.get("debug") == "1" or os.environ.get("SEMD_DEBUG") == "1"
+
+def memtrace_enabled():
+    """
+    Whether reruns are traced with tracemalloc (?memtrace=1 or SEMD_MEMTRACE=1)
+    """
+    return st.query_params.get("memtrace") == "1" or os.environ.get("SEMD_MEMTRACE") == "1"
+
 def main():
     st.set_page_config(**get_page_config())
     
+    # Metrics exporter (if configured) and active session tracking
+    start_exporter()
+    ctx = get_script_run_ctx()
+    if ctx is not None:
+        mark_session_active(ctx.session_id)
+    
+    debug = debug_enabled()
+    memtrace = memtrace_enabled()
+    if debug or memtrace or PROFILE_ALWAYS:
+        begin_rerun(trace_memory=memtrace)
+    view = "unknown"
+    started = time.perf_counter()
+    try:
+        view = render_page()
+    except Exception:
+        observe_rerun(view, time.perf_counter() - started, error=True)
+        raise
+    else:
+        observe_rerun(view, time.perf_counter() - started)
+    finally:
+        profile = end_rerun()
+    
+    if debug:
+        show_view("debug_panel", profile)
+
+def render_page():
+    """
+    Render the sidebar navigation and the selected view
+    
+    Returns:
+    --------
+    str
+        Label of the rendered view, used for per-view metrics
+    """
     # First level: Category Selection
     category = st.sidebar.selectbox(
         "Select Category",
-        ["Home", "Mobility Ladder", "Mobility vs Affordability", "Institution Explorer", "Enrollment Explorer", "Mobility Work"]
+        ["Home"] + list(NAV_STRUCTURE.keys())
     )
     
     if category == "Home":
+        label_rerun("Home")
         show_home()
-        return
-    
-    # Define navigation structure
-    nav_structure = {
-        "Mobility Ladder": {
-            "Four Year College": [
-                "Cumulative Probability",
-                "Individual Probability",
-                "Data Verification"
-            ],
-        },
-        "Mobility vs Affordability": {
-            "Four Year College": ["Mobility vs Affordability Quadrant", "Cost Trends"],
-        },
-        "Institution Explorer": {
-            "Four Year College": ["Institution Profile", "Peer Comparison"]
-        },
-        "Enrollment Explorer": {
-            "Four Year College": ["Enrollment Patterns"]
-        },
-        "Mobility Work": {
-            "Four Year College": ["Work Analysis"]
-        }
-    }
+        return "Home"
     
     # Second level: Analysis Group Selection
-    analysis_groups = list(nav_structure[category].keys())
+    analysis_groups = list(NAV_STRUCTURE[category].keys())
     analysis_group = st.sidebar.selectbox(
         "Select Analysis Group",
         analysis_groups
     )
     
     # Third level: Analysis Selection
-    analyses = nav_structure[category][analysis_group]
+    analyses = NAV_STRUCTURE[category][analysis_group]
     analysis = st.sidebar.selectbox(
         "Select Analysis",
         analyses
     )
+    view = f"{category} / {analysis}"
+    label_rerun(view)
     
     # Route to appropriate view based on selections
     if category == "Mobility Ladder":
-        # Load data once
-        df = pd.read_csv("data/mrc_table2.csv")
+        # Load data once (cached, already filtered for 4-year colleges)
+        from utils.data_utils import available_cohorts, load_mobility_data
         
-        # Filter for 4-year colleges
-        df = df[df['iclevel'] == 1]
+        # Birth cohort selection when a cohort-level table has been ingested
+        cohort = None
+        cohorts = available_cohorts()
+        if cohorts:
+            selected_cohort = st.sidebar.selectbox(
+                "Birth Cohort",
+                ["All cohorts (pooled)"] + cohorts
+            )
+            if selected_cohort != "All cohorts (pooled)":
+                cohort = selected_cohort
+        df = load_mobility_data(cohort=cohort)
         
         # Apply filters without institution group
         filtered_df = apply_filters(df, include_inst_group=False)
@@ -168,11 +230,11 @@ def main():
             quintile_num = int(selected_quintile[1])
             
             if analysis == "Data Verification":
-                show_data_verification(filtered_df, quintile_num)
+                show_view("data_verification", filtered_df, quintile_num)
             elif analysis == "Cumulative Probability":
-                show_mobility_ladder(filtered_df, "cumulative", parent_quintile=quintile_num)
+                show_view("mobility_ladder", filtered_df, "cumulative", parent_quintile=quintile_num)
             elif analysis == "Individual Probability":
-                show_mobility_ladder(filtered_df, "individual", parent_quintile=quintile_num)
+                show_view("mobility_ladder", filtered_df, "individual", parent_quintile=quintile_num)
         else:
             st.info("This analysis is currently under development.")
             
@@ -192,7 +254,7 @@ def main():
                 )
                 quintile_num = int(selected_quintile[1])
                 
-                show_affordability_analysis(df, parent_quintile=quintile_num)
+                show_view("affordability", df, parent_quintile=quintile_num)
             else:
                 st.info("This analysis is currently under development.")
         else:
@@ -204,33 +266,40 @@ def main():
         
         if df is not None:  # Check if merge was successful
             if analysis == "Institution Profile":
-                show_institution_profile(df)
+                show_view("institution_profile", df)
             else:
                 st.info("This analysis is currently under development.")
         else:
             st.error("Error loading data. Please check the data files.")
     elif category == "Enrollment Explorer":
-        # Load data
-        df = pd.read_csv("data/mrc_table2.csv")
-        df = df[df['iclevel'] == 1]  # Filter for 4-year colleges
-        
         if analysis == "Enrollment Patterns":
-            show_enrollment_patterns(df)
+            # Uses the cached enrollment cube for four-year colleges
+            show_view("enrollment_patterns")
+        elif analysis == "Counterfactual Enrollment":
+            # Reweights parent income shares over the snapshot's transition tensor
+            show_view("counterfactual")
         else:
             st.info("This analysis is currently under development.")
     elif category == "Mobility Work":
-        # Load and merge datasets
-        from utils.data_utils import merge_datasets
-        df = merge_datasets()
-        
-        if df is not None:
-            if analysis == "Work Analysis":
-                from views.mobility_work import show_mobility_work_analysis
-                show_mobility_work_analysis(df)
-            else:
-                st.info("This analysis is currently under development.")
+        if analysis == "Work Analysis":
+            # Uses the cached mobility work rankings for the merged dataset
+            show_view("mobility_work")
+        elif analysis == "Mobility Rate Leaderboard":
+            # Uses the cached access x success decomposition
+            show_view("mobility_rate_leaderboard")
         else:
-            st.error("Error loading data. Please check the data files.")
+            st.info("This analysis is currently under development.")
+    elif category == "Data Explorer":
+        if analysis == "SQL Query":
+            # Read-only SQL over the compiled dataset (needs duckdb)
+            show_view("sql_query")
+        elif analysis == "Covariate Correlations":
+            # Cached per filter state over the snapshot's aligned table10 columns
+            show_view("covariate_correlations")
+        else:
+            st.info("This analysis is currently under development.")
+    
+    return view
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,216 @@
+# benchmarks/run_benchmarks.py
+"""
+Benchmark the pure compute path of every view, headless (no Streamlit server).
+
+Each benchmark runs against synthetic data at several multiples of the real
+four-year institution count and records wall time (best of --repeat) and
+peak traced memory. Results are compared against a stored baseline so that
+regressions show up before deploy. Run from the repository root:
+
+    python benchmarks/run_benchmarks.py --scales 1,10,100,1000
+    python benchmarks/run_benchmarks.py --save-baseline     # record a new baseline
+
+Exits with status 1 if any benchmark is slower or uses more memory than the
+baseline by more than --tolerance, or if there is no baseline. The committed
+benchmarks/baseline.json was recorded on a single-CPU Linux machine; record
+your own with --save-baseline before comparing on different hardware.
+"""
+import argparse
+import gc
+import inspect
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+os.chdir(REPO_ROOT)
+
+import numpy as np
+import pandas as pd
+
+from utils.affordability_utils import add_affordability_columns, assign_quadrants
+from utils.enrollment_utils import enrollment_by_tier, enrollment_distribution
+from utils.mobility_utils import TIER_NAMES, create_mobility_ladder, group_ladders
+from utils.snapshot import shared_snapshot
+from utils.stats_models import calculate_mobility_work, mobility_work_scores
+from utils.synthetic_data import synthetic_merged_frame
+from utils import viz_utils
+
+BASELINE_PATH = os.path.join(REPO_ROOT, "benchmarks", "baseline.json")
+
+
+def scale_frame(df, factor, seed=0):
+    """
+    The real merged dataset at 1x; above that, `factor` times as many
+    synthetic four-year institutions (see utils.synthetic_data)
+    """
+    if factor == 1:
+        return df.copy()
+    return synthetic_merged_frame(len(df) * factor, seed=seed)
+
+
+def _pure(func):
+    # Benchmark the computation itself, not the coalescing/profiling wrappers
+    return inspect.unwrap(func)
+
+
+def _affordability(df):
+    df = add_affordability_columns(df, parent_quintile=1)
+    median_price = df['sticker_price_2013'].median()
+    median_mobility = df['mobility_rate'].median()
+    return assign_quadrants(df, median_price, median_mobility).value_counts()
+
+
+def _tier_ladders(df):
+    mobility = _pure(create_mobility_ladder)(df, parent_quintile=1)
+    return _pure(group_ladders)(mobility, mobility['tier'], TIER_NAMES)
+
+
+def benchmarks():
+    """
+    (name, prepare, run) triples; prepare(df) builds the untimed input for run
+    """
+    ladder = _pure(create_mobility_ladder)
+    return [
+        ("create_mobility_ladder", lambda df: df, lambda df: ladder(df, parent_quintile=1)),
+        ("calculate_mobility_work", lambda df: df.copy(), _pure(calculate_mobility_work)),
+        ("mobility_work_scores", lambda df: df, _pure(mobility_work_scores)),
+        ("affordability_quadrants", lambda df: df.copy(), _affordability),
+        ("enrollment_by_tier", lambda df: df, _pure(enrollment_by_tier)),
+        ("plot_mobility_ladder",
+         lambda df: ladder(df, parent_quintile=1),
+         lambda m: _pure(viz_utils.plot_mobility_ladder)(m, "All", "Ivy Plus")),
+        ("plot_mobility_ladder_cdf",
+         lambda df: ladder(df, parent_quintile=1),
+         _pure(viz_utils.plot_mobility_ladder_cdf)),
+        ("plot_ladder_small_multiples",
+         _tier_ladders,
+         lambda ladders: _pure(viz_utils.plot_ladder_small_multiples)(
+             ladders.drop(index='All'), reference=ladders.loc['All'])),
+        ("plot_cost_mobility",
+         lambda df: df.assign(mobility_q4q5=df['kq4_cond_parq1'] + df['kq5_cond_parq1']),
+         _pure(viz_utils.plot_cost_mobility)),
+        ("plot_mobility_sankey",
+         lambda df: ladder(df, parent_quintile=1),
+         lambda m: _pure(viz_utils.plot_mobility_sankey)(m, "All")),
+        ("plot_mobility_alluvial",
+         lambda df: ladder(df, parent_quintile=1),
+         lambda m: _pure(viz_utils.plot_mobility_alluvial)(m, "All")),
+        ("plot_mobility_area",
+         lambda df: ladder(df, parent_quintile=1),
+         lambda m: _pure(viz_utils.plot_mobility_area)(m, "All")),
+        ("plot_enrollment_distribution",
+         lambda df: enrollment_distribution(_pure(enrollment_by_tier)(df).iloc[0]),
+         lambda d: _pure(viz_utils.plot_enrollment_distribution)(d, "All")),
+    ]
+
+
+def measure(prepare, run, df, repeat):
+    """
+    Best wall time over `repeat` runs and peak traced memory of one run
+    """
+    # Untimed warm-up so first-call costs (imports, plotly validators) are excluded
+    run(prepare(df))
+
+    timings = []
+    for _ in range(repeat):
+        arg = prepare(df)
+        gc.collect()
+        t0 = time.perf_counter()
+        run(arg)
+        timings.append(time.perf_counter() - t0)
+
+    arg = prepare(df)
+    gc.collect()
+    tracemalloc.start()
+    run(arg)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return min(timings), peak
+
+
+def compare(results, baseline, tolerance, min_delta=0.0):
+    """
+    Names of results that regressed against the baseline; slowdowns
+    smaller than min_delta seconds are timer noise and never count
+    """
+    regressions = []
+    for key, result in results.items():
+        base = baseline.get(key)
+        if base is None:
+            continue
+        if result["seconds"] > max(base["seconds"] * (1 + tolerance), base["seconds"] + min_delta):
+            regressions.append(f"{key}: time {base['seconds']:.4f}s -> {result['seconds']:.4f}s")
+        if result["peak_bytes"] > base["peak_bytes"] * (1 + tolerance):
+            regressions.append(f"{key}: peak {base['peak_bytes']:,} -> {result['peak_bytes']:,} bytes")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scales", default="1,10,100,1000",
+                        help="Comma-separated multiples of the institution count")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per benchmark")
+    parser.add_argument("--only", help="Run only benchmarks whose name contains this")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="Baseline JSON path")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="Write these results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Allowed relative slowdown / memory growth (default 0.25)")
+    parser.add_argument("--min-delta-ms", type=float, default=5.0,
+                        help="Ignore slowdowns smaller than this many ms (default 5)")
+    parser.add_argument("--output", help="Also write the results to this JSON file")
+    args = parser.parse_args()
+
+    base_df = shared_snapshot().merged_frame()
+    results = {}
+    for factor in [int(s) for s in args.scales.split(",")]:
+        df = scale_frame(base_df, factor)
+        print(f"\n== {factor}x ({len(df):,} institutions) ==")
+        for name, prepare, run in benchmarks():
+            if args.only and args.only not in name:
+                continue
+            seconds, peak = measure(prepare, run, df, args.repeat)
+            results[f"{name}@{factor}x"] = {"seconds": seconds, "peak_bytes": peak, "rows": len(df)}
+            print(f"{name:32s} {seconds * 1000:10.2f} ms  {peak / 2**20:10.2f} MiB peak")
+        del df
+        gc.collect()
+
+    record = {
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(record, f, indent=2)
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(record, f, indent=2)
+        print(f"\nBaseline written to {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print(f"\nNo baseline at {args.baseline}; run with --save-baseline to create one")
+        sys.exit(1)
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)["results"]
+    regressions = compare(results, baseline, args.tolerance, args.min_delta_ms / 1000)
+    if regressions:
+        print("\nRegressions against baseline:")
+        for line in regressions:
+            print(f"  {line}")
+        sys.exit(1)
+    print("\nNo regressions against baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,312 @@
+# scripts/load_test.py
+"""
+Drive app.py with many simulated sessions in parallel and report latency and memory.
+
+Each session is a headless AppTest instance that repeatedly navigates to a
+random category and analysis, then randomizes the view's widgets (select
+boxes, multiselects, sliders, radios, checkboxes, toggles, number inputs and
+an occasional button click). Every rerun is timed and attributed to its view.
+
+By default (--mode process) the sessions run concurrently, spread over
+--workers processes (default: one each). AppTest swaps process-global
+runtime state on every run, so sessions sharing a process cannot overlap:
+--mode serial runs them all in this process one rerun at a time, which
+measures per-rerun cost with shared in-process caches but no contention.
+Run from the repository root:
+
+    python scripts/load_test.py --sessions 8 --steps 25 --output load_report.json
+    python scripts/load_test.py --mode serial --sessions 8 --compare load_report.json
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+os.chdir(REPO_ROOT)
+
+import numpy as np
+
+from app import NAV_STRUCTURE
+from utils.metrics import resident_bytes
+
+APP_PATH = os.path.join(REPO_ROOT, "app.py")
+NAV_LABELS = {"Select Category", "Select Analysis Group", "Select Analysis"}
+PERCENTILES = (50, 90, 95, 99)
+
+# AppTest runs in one process must not overlap (see module docstring)
+_run_lock = threading.Lock()
+
+# Chance of clicking one of the view's buttons (e.g. export "Prepare") per step
+BUTTON_CLICK_RATE = 0.3
+
+
+class MemorySampler:
+    """
+    Background thread recording the peak RSS of this process
+    """
+
+    def __init__(self, interval=0.1):
+        self.interval = interval
+        self.start_bytes = resident_bytes()
+        self.peak_bytes = self.start_bytes
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.peak_bytes = max(self.peak_bytes, resident_bytes())
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.end_bytes = resident_bytes()
+        self.peak_bytes = max(self.peak_bytes, self.end_bytes)
+
+
+def _run(at, timeout):
+    with _run_lock:
+        at.run(timeout=timeout)
+
+
+def _timed_run(at, samples, view, timeout):
+    with _run_lock:
+        started = time.perf_counter()
+        at.run(timeout=timeout)
+        elapsed = time.perf_counter() - started
+    errors = [e.value for e in at.exception] + [e.value for e in at.error]
+    samples.append({"view": view, "seconds": elapsed, "error": errors[0] if errors else None})
+
+
+def _randomize_widgets(at, rng):
+    """
+    Pick random values for the view's own widgets, sidebar and main area
+    (not the navigation)
+    """
+    for box in at.selectbox:
+        if box.label not in NAV_LABELS and box.options:
+            box.set_value(rng.choice(box.options))
+    for radio in at.radio:
+        if radio.options and not radio.disabled:
+            radio.set_value(rng.choice(radio.options))
+    for multi in at.multiselect:
+        if multi.options:
+            multi.set_value(rng.sample(multi.options, rng.randint(1, len(multi.options))))
+    for slider in at.slider:
+        if isinstance(slider.value, (int, float)):
+            steps = int((slider.max - slider.min) / slider.step)
+            value = slider.min + rng.randint(0, steps) * slider.step
+            slider.set_value(type(slider.value)(value))
+    for box in list(at.checkbox) + list(at.toggle):
+        if not box.disabled:
+            box.set_value(rng.random() < 0.5)
+    for number in at.number_input:
+        low = number.min if number.min is not None else 0
+        high = number.max if number.max is not None else low + 100 * number.step
+        value = low + rng.randint(0, int((high - low) / number.step)) * number.step
+        number.set_value(type(number.value)(value) if number.value is not None else value)
+    buttons = [button for button in at.button if not button.disabled]
+    if buttons and rng.random() < BUTTON_CLICK_RATE:
+        rng.choice(buttons).click()
+
+
+def run_session(session_id, steps, seed, think_time=0.0, timeout=120):
+    """
+    One simulated user: `steps` random navigations, each followed by a
+    randomized widget interaction
+
+    Returns:
+    --------
+    list of dict
+        One sample per rerun: view, seconds, error
+    """
+    from streamlit.testing.v1 import AppTest
+
+    rng = random.Random(seed * 100_003 + session_id)
+    samples = []
+    at = AppTest.from_file(APP_PATH, default_timeout=timeout)
+    # The first run pays for imports and snapshot attach; keep it separate
+    _timed_run(at, samples, "(first run)", timeout)
+
+    categories = ["Home"] + list(NAV_STRUCTURE)
+    for _ in range(steps):
+        category = rng.choice(categories)
+        _select(at, "Select Category", category)
+        if category == "Home":
+            _timed_run(at, samples, "Home", timeout)
+            continue
+        # Run once so the analysis selectbox for this category exists
+        _run(at, timeout)
+        group = rng.choice(list(NAV_STRUCTURE[category]))
+        analysis = rng.choice(NAV_STRUCTURE[category][group])
+        _select(at, "Select Analysis Group", group)
+        _select(at, "Select Analysis", analysis)
+        view = f"{category} / {analysis}"
+        _timed_run(at, samples, view, timeout)
+
+        _randomize_widgets(at, rng)
+        _timed_run(at, samples, view, timeout)
+        if think_time:
+            time.sleep(rng.uniform(0, 2 * think_time))
+    return samples
+
+
+def _select(at, label, value):
+    for box in at.sidebar.selectbox:
+        if box.label == label:
+            box.set_value(value)
+            return
+
+
+def run_worker(session_ids, steps, seed, think_time):
+    """
+    Run the given sessions in this process, one rerun at a time
+
+    Returns:
+    --------
+    dict
+        Samples from every session plus this process's memory figures
+    """
+    with MemorySampler() as memory:
+        with ThreadPoolExecutor(max_workers=len(session_ids)) as pool:
+            futures = [
+                pool.submit(run_session, session_id, steps, seed, think_time)
+                for session_id in session_ids
+            ]
+            samples = [sample for future in futures for sample in future.result()]
+    return {
+        "pid": os.getpid(),
+        "samples": samples,
+        "rss_start_bytes": memory.start_bytes,
+        "rss_end_bytes": memory.end_bytes,
+        "rss_peak_bytes": memory.peak_bytes,
+    }
+
+
+def summarize(samples):
+    """
+    Latency percentiles (ms) and error counts per view and overall
+    """
+    by_view = {}
+    for sample in samples:
+        by_view.setdefault(sample["view"], []).append(sample)
+    by_view["overall"] = samples
+
+    summary = {}
+    for view, view_samples in sorted(by_view.items()):
+        ms = np.array([s["seconds"] for s in view_samples]) * 1000
+        stats = {f"p{p}_ms": round(float(np.percentile(ms, p)), 1) for p in PERCENTILES}
+        stats["max_ms"] = round(float(ms.max()), 1)
+        stats["reruns"] = len(view_samples)
+        stats["errors"] = sum(1 for s in view_samples if s["error"])
+        summary[view] = stats
+    return summary
+
+
+def compare(report, previous):
+    """
+    Lines describing p50/p95 and memory changes against a previous report
+    """
+    lines = []
+    for view, stats in report["views"].items():
+        old = previous["views"].get(view)
+        if old is None:
+            continue
+        for key in ("p50_ms", "p95_ms"):
+            if old[key]:
+                change = (stats[key] - old[key]) / old[key] * 100
+                lines.append(f"{view:62s} {key:7s} {old[key]:9.1f} -> {stats[key]:9.1f} ({change:+.0f}%)")
+    for key in ("rss_growth_bytes", "rss_peak_bytes"):
+        old, new = previous["memory"][key], report["memory"][key]
+        lines.append(f"{'memory':62s} {key:17s} {old / 2**20:9.1f} -> {new / 2**20:9.1f} MiB")
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sessions", type=int, default=8,
+                        help="Simulated sessions in total (default: 8)")
+    parser.add_argument("--steps", type=int, default=20,
+                        help="Navigations per session (default: 20)")
+    parser.add_argument("--mode", choices=["process", "serial"], default="process",
+                        help="Concurrent sessions over worker processes, or all sessions in "
+                             "this process taking turns (no contention)")
+    parser.add_argument("--workers", type=int,
+                        help="Processes in --mode process (default: one per session)")
+    parser.add_argument("--think-time", type=float, default=0.0,
+                        help="Mean pause between navigations in seconds (default: 0)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write the report to this JSON file")
+    parser.add_argument("--compare", metavar="PATH",
+                        help="Print changes against a previous report")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    session_ids = list(range(args.sessions))
+    if args.mode == "serial":
+        workers = [run_worker(session_ids, args.steps, args.seed, args.think_time)]
+    else:
+        n_workers = min(args.workers or args.sessions, args.sessions)
+        with ProcessPoolExecutor(max_workers=n_workers) as pool:
+            futures = [
+                pool.submit(run_worker, session_ids[i::n_workers], args.steps, args.seed,
+                            args.think_time)
+                for i in range(n_workers)
+            ]
+            workers = [future.result() for future in futures]
+    wall = time.perf_counter() - started
+
+    samples = [sample for worker in workers for sample in worker["samples"]]
+    report = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": sys.version.split()[0],
+        "config": vars(args),
+        "wall_seconds": round(wall, 2),
+        "reruns_per_second": round(len(samples) / wall, 2),
+        "views": summarize(samples),
+        "memory": {
+            "workers": len(workers),
+            "rss_start_bytes": sum(w["rss_start_bytes"] for w in workers),
+            "rss_end_bytes": sum(w["rss_end_bytes"] for w in workers),
+            "rss_peak_bytes": sum(w["rss_peak_bytes"] for w in workers),
+            "rss_growth_bytes": sum(w["rss_end_bytes"] - w["rss_start_bytes"] for w in workers),
+        },
+        "errors": sorted({s["error"] for s in samples if s["error"]}),
+    }
+
+    print(f"{'view':62s} {'reruns':>6s} " + " ".join(f"{'p%d' % p:>8s}" for p in PERCENTILES)
+          + f" {'max':>8s} {'errors':>6s}")
+    for view, stats in report["views"].items():
+        print(f"{view:62s} {stats['reruns']:6d} "
+              + " ".join(f"{stats[f'p{p}_ms']:8.1f}" for p in PERCENTILES)
+              + f" {stats['max_ms']:8.1f} {stats['errors']:6d}")
+    memory = report["memory"]
+    print(f"\n{report['reruns_per_second']} reruns/s over {report['wall_seconds']}s; "
+          f"RSS {memory['rss_start_bytes'] / 2**20:.0f} -> {memory['rss_end_bytes'] / 2**20:.0f} MiB "
+          f"(peak {memory['rss_peak_bytes'] / 2**20:.0f} MiB, {memory['workers']} worker(s))")
+    for error in report["errors"]:
+        print(f"error: {error}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            previous = json.load(f)
+        print(f"\nChanges against {args.compare}:")
+        for line in compare(report, previous):
+            print(f"  {line}")
+
+
+if __name__ == "__main__":
+    main()
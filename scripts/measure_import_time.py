@@ -0,0 +1,82 @@
+# scripts/measure_import_time.py
+"""
+Measure cold-start import time of the app shell and of each registered view.
+
+Every measurement runs in a fresh interpreter so that nothing is served from
+sys.modules. Run from the repository root:
+
+    python scripts/measure_import_time.py --repeat 5 --json import_times.jsonl
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from views.registry import view_modules
+
+TIMER = (
+    "import time; t = time.perf_counter(); import {module}; "
+    "print(time.perf_counter() - t)"
+)
+
+
+def time_import(module, repeat):
+    """
+    Import a module in `repeat` fresh interpreters and return the timings (ms)
+    """
+    timings = []
+    for _ in range(repeat):
+        result = subprocess.run(
+            [sys.executable, "-c", TIMER.format(module=module)],
+            cwd=REPO_ROOT,
+            capture_output=True,
+            text=True,
+            check=True
+        )
+        timings.append(float(result.stdout.strip().splitlines()[-1]) * 1000)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="Fresh interpreters per module (default: 3)")
+    parser.add_argument("--json", metavar="PATH",
+                        help="Append the results as one JSON line to PATH")
+    args = parser.parse_args()
+
+    modules = ["app"] + view_modules()
+    results = {}
+    for module in modules:
+        timings = time_import(module, args.repeat)
+        results[module] = {
+            "median_ms": round(statistics.median(timings), 1),
+            "min_ms": round(min(timings), 1),
+            "max_ms": round(max(timings), 1),
+        }
+
+    width = max(len(m) for m in modules)
+    print(f"{'module'.ljust(width)}  median_ms  min_ms  max_ms")
+    for module, stats in results.items():
+        print(f"{module.ljust(width)}  {stats['median_ms']:9.1f}  "
+              f"{stats['min_ms']:6.1f}  {stats['max_ms']:6.1f}")
+
+    if args.json:
+        record = {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": sys.version.split()[0],
+            "repeat": args.repeat,
+            "modules": results,
+        }
+        with open(args.json, "a") as f:
+            f.write(json.dumps(record) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,435 @@
+# scripts/static_export.py
+"""
+Render every dashboard permutation to static HTML and JSON, so a plain file
+server can absorb read traffic and pages can be embedded publicly.
+
+The exporter walks NAV_STRUCTURE from app.py. For each view it enumerates
+the sidebar widgets listed in EXPORT_AXES (parent quintile, comparison
+dimension, single tiers, institutions) and GROUP_AXES (every single group and
+pair of the Tier, Institution Control and Institution Type comparisons; the
+State and Mobility Cluster comparisons keep their default groups), and keeps
+every other widget at its default.
+Each permutation is rendered by the real app through a headless AppTest,
+and its titles, text, figures, tables and metrics are written as
+
+    <out>/<category>/<analysis>/<permutation>.html   (plotly.js from a CDN)
+    <out>/<category>/<analysis>/<permutation>.json
+
+together with <out>/index.html and <out>/index.json. The work fans out over
+a process pool with one task per view and value of its first axis. Run from
+the repository root:
+
+    python scripts/static_export.py --out site --workers 8
+    python scripts/static_export.py --out site --only "Mobility Ladder"
+"""
+import argparse
+import contextlib
+import html
+import itertools
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import get_context
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+os.chdir(REPO_ROOT)
+
+from app import NAV_STRUCTURE
+
+APP_PATH = os.path.join(REPO_ROOT, "app.py")
+PLOTLY_JS = "https://cdn.plot.ly/plotly-2.35.2.min.js"
+
+# Sidebar selectboxes enumerated for the export, in the order they are nested
+EXPORT_AXES = (
+    "Select Parent Income Quintile",
+    "Compare By",
+    "Select College Type",
+    "Select Institution",
+)
+
+# Group multiselects enumerated as every single group and pair ("All" kept
+# as the reference), while the selectbox they depend on has one of the values
+GROUP_AXES = {
+    "Groups": ("Compare By", {"Tier", "Institution Control", "Institution Type"}),
+}
+GROUP_AXIS_SIZES = (1, 2)
+
+# Interactive views with nothing to precompute
+SKIP_ANALYSES = {"SQL Query"}
+
+HEADING_TAGS = {"title": "h1", "header": "h2", "subheader": "h3"}
+
+
+def slugify(value):
+    slug = re.sub(r"[^a-z0-9]+", "-", str(value).lower()).strip("-")
+    return slug or "x"
+
+
+def _select(at, label, value):
+    if label in GROUP_AXES:
+        for box in at.sidebar.multiselect:
+            if box.label == label:
+                box.set_value(["All", *value])
+                return
+    for box in at.sidebar.selectbox:
+        if box.label == label:
+            box.set_value(value)
+            return
+
+
+def _group_options(box):
+    """
+    Single groups and pairs of a group multiselect, as tuples
+    """
+    groups = [g for g in box.options if g != "All"]
+    return [combo for size in GROUP_AXIS_SIZES for combo in itertools.combinations(groups, size)]
+
+
+def _axes(at, fixed):
+    """
+    Export axes present in the sidebar and not fixed yet: (label, options),
+    selectboxes in sidebar order, then the group multiselects
+    """
+    axes = [(box.label, list(box.options)) for box in at.sidebar.selectbox
+            if box.label in EXPORT_AXES and box.label not in fixed]
+    values = {box.label: box.value for box in at.sidebar.selectbox}
+    for box in at.sidebar.multiselect:
+        if box.label in GROUP_AXES and box.label not in fixed:
+            depends_on, enumerated = GROUP_AXES[box.label]
+            if values.get(depends_on) in enumerated:
+                axes.append((box.label, _group_options(box)))
+    return axes
+
+
+def _param_value(value):
+    return " + ".join(value) if isinstance(value, tuple) else value
+
+
+@contextlib.contextmanager
+def _preserve_main():
+    """
+    AppTest runs app.py as __main__ and leaves it there; put this script
+    back so the pool can unpickle the next task
+    """
+    main = sys.modules["__main__"]
+    try:
+        yield
+    finally:
+        sys.modules["__main__"] = main
+
+
+def _open_view(category, group, analysis, timeout):
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(APP_PATH, default_timeout=timeout)
+    at.run()
+    _select(at, "Select Category", category)
+    at.run()
+    _select(at, "Select Analysis Group", group)
+    _select(at, "Select Analysis", analysis)
+    at.run()
+    return at
+
+
+def _markdown_html(text):
+    """
+    Minimal Markdown -> HTML for the views' text (headings, bold, lists, links)
+    """
+    parts = []
+    in_list = False
+    for line in text.strip().splitlines():
+        line = line.strip()
+        escaped = html.escape(line)
+        escaped = re.sub(r"\*\*(.+?)\*\*", r"<strong>\1</strong>", escaped)
+        escaped = re.sub(r"\*(.+?)\*", r"<em>\1</em>", escaped)
+        escaped = re.sub(r"\[(.+?)\]\((.+?)\)", r'<a href="\2">\1</a>', escaped)
+        if escaped.startswith("- "):
+            if not in_list:
+                parts.append("<ul>")
+                in_list = True
+            parts.append(f"<li>{escaped[2:]}</li>")
+            continue
+        if in_list:
+            parts.append("</ul>")
+            in_list = False
+        heading = re.match(r"(#{1,6}) (.*)", escaped)
+        if heading:
+            level = len(heading.group(1))
+            parts.append(f"<h{level}>{heading.group(2)}</h{level}>")
+        elif escaped == "---":
+            parts.append("<hr>")
+        elif escaped:
+            parts.append(f"<p>{escaped}</p>")
+    if in_list:
+        parts.append("</ul>")
+    return "\n".join(parts)
+
+
+def _capture(node, items):
+    """
+    Walk the rendered main area, collecting exportable elements in order
+    """
+    for child in node.children.values():
+        kind = child.type
+        if kind in HEADING_TAGS:
+            items.append({"type": "heading", "tag": HEADING_TAGS[kind], "text": child.proto.body})
+        elif kind == "markdown":
+            items.append({"type": "markdown", "text": child.proto.body})
+        elif kind in ("info", "warning", "error", "success", "caption"):
+            items.append({"type": kind, "text": child.proto.body})
+        elif kind == "plotly_chart":
+            items.append({"type": "figure", "figure": json.loads(child.proto.spec)})
+        elif kind == "arrow_data_frame":
+            frame = child.value
+            items.append({"type": "table", "columns": [str(c) for c in frame.columns],
+                          "rows": json.loads(frame.to_json(orient="values", date_format="iso"))})
+        elif kind == "metric":
+            items.append({"type": "metric", "label": child.proto.label, "value": child.proto.body})
+        elif kind == "tab":
+            items.append({"type": "heading", "tag": "h3", "text": child.label})
+            _capture(child, items)
+        elif hasattr(child, "children"):
+            group = {"type": "row" if kind == "horizontal" else "block", "items": []}
+            _capture(child, group["items"])
+            if group["items"]:
+                items.append(group)
+    return items
+
+
+def _items_html(items, counter):
+    parts = []
+    for item in items:
+        kind = item["type"]
+        if kind == "heading":
+            parts.append(f"<{item['tag']}>{html.escape(item['text'])}</{item['tag']}>")
+        elif kind == "markdown":
+            parts.append(_markdown_html(item["text"]))
+        elif kind in ("info", "warning", "error", "success", "caption"):
+            parts.append(f'<p class="{kind}">{html.escape(item["text"])}</p>')
+        elif kind == "figure":
+            counter[0] += 1
+            div_id = f"figure-{counter[0]}"
+            spec = json.dumps(item["figure"]).replace("</", "<\\/")
+            parts.append(
+                f'<div id="{div_id}" class="figure"></div>\n'
+                f"<script>(function(){{var f={spec};"
+                f"Plotly.newPlot('{div_id}',f.data,f.layout,{{responsive:true}});}})();</script>"
+            )
+        elif kind == "table":
+            head = "".join(f"<th>{html.escape(c)}</th>" for c in item["columns"])
+            body = "".join(
+                "<tr>" + "".join(f"<td>{html.escape('' if v is None else str(v))}</td>" for v in row) + "</tr>"
+                for row in item["rows"]
+            )
+            parts.append(f'<table><thead><tr>{head}</tr></thead><tbody>{body}</tbody></table>')
+        elif kind == "metric":
+            parts.append(f'<div class="metric"><span>{html.escape(item["label"])}</span>'
+                         f'<strong>{html.escape(item["value"])}</strong></div>')
+        elif kind in ("row", "block"):
+            inner = _items_html(item["items"], counter)
+            parts.append(f'<div class="{kind}">{inner}</div>')
+    return "\n".join(parts)
+
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+<script src="{plotly_js}"></script>
+<style>
+body {{ font-family: sans-serif; max-width: 1200px; margin: 2em auto; padding: 0 1em; }}
+.row {{ display: flex; gap: 2em; }} .row > .block {{ flex: 1; min-width: 0; }}
+table {{ border-collapse: collapse; font-size: 0.9em; margin: 1em 0; }}
+td, th {{ border: 1px solid #ddd; padding: 0.25em 0.5em; }}
+.metric span {{ display: block; color: #666; }} .metric strong {{ font-size: 1.6em; }}
+.info, .warning, .error {{ padding: 0.5em 1em; background: #f4f4f4; }}
+.params {{ color: #666; }}
+</style>
+</head>
+<body>
+<p class="params">{params}</p>
+{body}
+</body>
+</html>
+"""
+
+
+def _write_page(out_dir, rel_path, view, params, items):
+    title = f"{view['category']} / {view['analysis']}"
+    page = {"view": view, "params": params, "items": items}
+    path = os.path.join(out_dir, rel_path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path + ".json", "w") as f:
+        json.dump(page, f, separators=(",", ":"))
+    param_text = " · ".join(f"{k}: {v}" for k, v in params.items()) or "Default settings"
+    with open(path + ".html", "w") as f:
+        f.write(PAGE_TEMPLATE.format(
+            title=html.escape(title), plotly_js=PLOTLY_JS,
+            params=html.escape(param_text), body=_items_html(items, [0])
+        ))
+
+
+def _enumerate(at, fixed, emit, timeout):
+    """
+    Depth-first over the remaining export axes; emit() at each leaf
+    """
+    axes = _axes(at, fixed)
+    if not axes:
+        emit(at, fixed)
+        return
+    label, options = axes[0]
+    for option in options:
+        _select(at, label, option)
+        at.run(timeout=timeout)
+        _enumerate(at, {**fixed, label: option}, emit, timeout)
+
+
+def probe_view(category, group, analysis, timeout=120):
+    """
+    Export axes of one view and the options of the first
+
+    Returns:
+    --------
+    tuple
+        (first axis label or None, its options)
+    """
+    with _preserve_main():
+        at = _open_view(category, group, analysis, timeout)
+        axes = _axes(at, {})
+    if not axes:
+        return None, []
+    return axes[0]
+
+
+def export_task(out_dir, category, group, analysis, fixed, timeout=120):
+    """
+    Render every permutation of one view with the given axes fixed
+
+    Returns:
+    --------
+    list of dict
+        Index entries (view, params, path, error)
+    """
+    view = {"category": category, "group": group, "analysis": analysis}
+    base = os.path.join(slugify(category), slugify(analysis))
+    entries = []
+
+    def emit(at, params):
+        params = {label: _param_value(value) for label, value in params.items()}
+        slug = "__".join(slugify(v) for v in params.values()) or "index"
+        rel_path = os.path.join(base, slug)
+        errors = [e.value for e in at.exception]
+        entry = {**view, "params": params, "path": None, "error": None}
+        if errors:
+            entry["error"] = str(errors[0])
+        else:
+            _write_page(out_dir, rel_path, view, params, _capture(at.main, []))
+            entry["path"] = rel_path
+        entries.append(entry)
+
+    with _preserve_main():
+        at = _open_view(category, group, analysis, timeout)
+        for label, value in fixed.items():
+            _select(at, label, value)
+            at.run(timeout=timeout)
+        _enumerate(at, dict(fixed), emit, timeout)
+    return entries
+
+
+def write_index(out_dir, entries, data_version, seconds):
+    """
+    index.json (manifest) and index.html (links grouped by view)
+    """
+    manifest = {
+        "generated_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "data_version": data_version,
+        "seconds": round(seconds, 1),
+        "pages": [e for e in entries if e["path"]],
+        "errors": [e for e in entries if e["error"]],
+    }
+    with open(os.path.join(out_dir, "index.json"), "w") as f:
+        json.dump(manifest, f, indent=1)
+
+    sections = []
+    by_view = {}
+    for entry in manifest["pages"]:
+        by_view.setdefault((entry["category"], entry["analysis"]), []).append(entry)
+    for (category, analysis), pages in by_view.items():
+        links = "".join(
+            f'<li><a href="{html.escape(p["path"])}.html">'
+            f'{html.escape(" · ".join(p["params"].values()) or "Default settings")}</a></li>'
+            for p in pages
+        )
+        sections.append(f"<h2>{html.escape(category)} / {html.escape(analysis)}</h2><ul>{links}</ul>")
+    with open(os.path.join(out_dir, "index.html"), "w") as f:
+        f.write(PAGE_TEMPLATE.format(
+            title="College Mobility Analysis — static export", plotly_js=PLOTLY_JS,
+            params=html.escape(f"Data version {data_version}, {len(manifest['pages'])} pages"),
+            body="<h1>College Mobility Analysis</h1>" + "\n".join(sections)
+        ))
+    return manifest
+
+
+def _views(only=None):
+    for category, groups in NAV_STRUCTURE.items():
+        if only and category not in only:
+            continue
+        for group, analyses in groups.items():
+            for analysis in analyses:
+                if analysis not in SKIP_ANALYSES:
+                    yield category, group, analysis
+
+
+def export_all(out_dir, workers=None, only=None, timeout=120):
+    """
+    Export every view permutation to out_dir over a process pool
+
+    Returns:
+    --------
+    dict
+        The index manifest
+    """
+    from utils.snapshot import shared_snapshot
+
+    started = time.perf_counter()
+    os.makedirs(out_dir, exist_ok=True)
+    views = list(_views(only))
+    # Spawned workers: AppTest and the snapshot are set up fresh per process
+    with ProcessPoolExecutor(max_workers=workers, mp_context=get_context("spawn")) as pool:
+        probes = list(pool.map(probe_view, *zip(*views)))
+        futures = []
+        for (category, group, analysis), (label, options) in zip(views, probes):
+            for option in options or [None]:
+                fixed = {label: option} if label else {}
+                futures.append(pool.submit(export_task, out_dir, category, group, analysis,
+                                           fixed, timeout))
+        entries = []
+        for done, future in enumerate(as_completed(futures), 1):
+            entries.extend(future.result())
+            print(f"\r{done}/{len(futures)} tasks, {len(entries)} pages", end="", flush=True)
+    print()
+
+    # Keep the index in navigation order regardless of completion order
+    order = {view: i for i, view in enumerate(views)}
+    entries.sort(key=lambda e: order[(e["category"], e["group"], e["analysis"])])
+    return write_index(out_dir, entries, shared_snapshot().version, time.perf_counter() - started)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export every dashboard permutation to static HTML/JSON")
+    parser.add_argument("--out", default="site", help="Output directory")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--only", action="append", help="Export only this category (repeatable)")
+    parser.add_argument("--timeout", type=float, default=120, help="Seconds allowed per rerun")
+    args = parser.parse_args()
+
+    manifest = export_all(args.out, args.workers, args.only, args.timeout)
+    print(f"{len(manifest['pages'])} pages written to {args.out} in {manifest['seconds']} s"
+          f" ({len(manifest['errors'])} errors)")
+    for entry in manifest["errors"][:10]:
+        print(f"  {entry['category']} / {entry['analysis']} {entry['params']}: {entry['error']}")
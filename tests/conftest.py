@@ -0,0 +1,49 @@
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Tests import the app's modules (utils.*) from the repository root
+sys.path.insert(0, REPO_ROOT)
+
+# Institutions kept in the small data directory (plus a few non-four-year rows)
+SMALL_ROWS = 120
+
+
+@pytest.fixture
+def small_data_dir(tmp_path):
+    """
+    Data directory with a slice of the real table2 and the matching table10 rows
+    """
+    from utils.snapshot import COST_FILE, DATA_DIR, MOBILITY_FILE
+
+    mobility = pd.read_csv(os.path.join(REPO_ROOT, DATA_DIR, MOBILITY_FILE))
+    four_year = mobility[mobility['iclevel'] == 1].head(SMALL_ROWS)
+    others = mobility[mobility['iclevel'] == 2].head(5)
+    mobility = pd.concat([four_year, others]).sort_index()
+    cost = pd.read_csv(os.path.join(REPO_ROOT, DATA_DIR, COST_FILE))
+    cost = cost[cost['super_opeid'].isin(mobility['super_opeid'])]
+
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    mobility.to_csv(data_dir / MOBILITY_FILE, index=False)
+    cost.to_csv(data_dir / COST_FILE, index=False)
+    return data_dir
+
+
+@pytest.fixture
+def small_snapshot(small_data_dir, tmp_path, monkeypatch):
+    """
+    Snapshot compiled from small_data_dir, pinned as the shared snapshot,
+    with the disk cache in a temporary directory
+    """
+    from utils import disk_cache
+    from utils.snapshot import Snapshot, build_snapshot, pinned_snapshot
+
+    monkeypatch.setattr(disk_cache, "CACHE_DIR", str(tmp_path / "cache"))
+    snapshot = Snapshot(build_snapshot(str(small_data_dir), str(tmp_path / "snapshot")))
+    with pinned_snapshot(snapshot):
+        yield snapshot
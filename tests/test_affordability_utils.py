@@ -0,0 +1,39 @@
+import numpy as np
+
+from utils.affordability_utils import pareto_frontier
+
+
+def brute_force_frontier(price, mobility):
+    """
+    Valid rows that no other row matches or beats on both price and
+    mobility while beating them on one
+    """
+    valid = ~(np.isnan(price) | np.isnan(mobility))
+    mask = np.zeros(len(price), dtype=bool)
+    for i in np.flatnonzero(valid):
+        dominated = (valid & (price <= price[i]) & (mobility >= mobility[i])
+                     & ((price < price[i]) | (mobility > mobility[i])))
+        mask[i] = not dominated.any()
+    return mask
+
+
+def test_pareto_frontier_matches_brute_force():
+    rng = np.random.default_rng(0)
+    for n in (1, 2, 10, 300):
+        price = rng.uniform(0, 50_000, n)
+        # Rounded rates give ties in mobility
+        mobility = np.round(rng.uniform(0, 0.2, n), 2)
+        price[rng.random(n) < 0.1] = np.nan
+        mobility[rng.random(n) < 0.1] = np.nan
+        np.testing.assert_array_equal(pareto_frontier(price, mobility),
+                                      brute_force_frontier(price, mobility))
+
+
+def test_pareto_frontier_ties():
+    price = np.array([10.0, 20.0, 20.0, 30.0, 30.0, np.nan])
+    mobility = np.array([0.3, 0.5, 0.4, 0.5, 0.6, 0.9])
+    # Equal rate at a higher price, or equal price at a lower rate, is dominated
+    np.testing.assert_array_equal(pareto_frontier(price, mobility),
+                                  [True, True, False, False, True, False])
+    # Exact duplicates: one of them
+    assert pareto_frontier([10.0, 10.0], [0.5, 0.5]).sum() == 1
@@ -0,0 +1,92 @@
+import http.client
+import json
+import socket
+import threading
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+from utils.api import API_PREFIX, MAX_BATCH, MAX_BODY_BYTES, APIHandler, handle, handle_batch
+
+LADDERS = f"{API_PREFIX}/ladders"
+
+
+def test_etag_answers_304_without_a_body(small_snapshot):
+    status, body, etag = handle(LADDERS, {"parent_quintile": ["2"]})
+    assert status == 200 and body["parent_quintile"] == 2 and body["tiers"]
+    assert handle(LADDERS, {"parent_quintile": ["2"]}, etag) == (304, None, etag)
+    assert handle(LADDERS, {"parent_quintile": ["2"]}, f'"other", {etag}')[0] == 304
+
+    # Other parameters are a different resource
+    status, _, other = handle(LADDERS, {"parent_quintile": ["3"]}, etag)
+    assert status == 200 and other != etag
+
+
+def test_errors(small_snapshot):
+    assert handle(LADDERS, {"parent_quintile": ["9"]})[0] == 400
+    assert handle(f"{API_PREFIX}/nope", {})[0] == 404
+
+
+def test_batch_runs_each_request(small_snapshot):
+    _, _, etag = handle(LADDERS, {})
+    result = handle_batch({"requests": [
+        {"path": LADDERS, "etag": etag},
+        {"path": f"{API_PREFIX}/mobility-work", "params": {"limit": 3}},
+        {"params": {}},
+        {"path": f"{API_PREFIX}/nope"},
+    ]})
+    statuses = [r["status"] for r in result["responses"]]
+    assert statuses == [304, 200, 400, 404]
+    assert len(result["responses"][1]["body"]["institutions"]) == 3
+
+    with pytest.raises(ValueError):
+        handle_batch({"requests": [{"path": LADDERS}] * (MAX_BATCH + 1)})
+    with pytest.raises(ValueError):
+        handle_batch([])
+
+
+@pytest.fixture
+def server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), APIHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def raw_exchange(server, request):
+    """
+    Everything the server sends back before closing the connection
+    """
+    with socket.create_connection(("127.0.0.1", server.server_port), timeout=5) as sock:
+        sock.sendall(request)
+        response = b""
+        while chunk := sock.recv(65536):
+            response += chunk
+    return response.decode()
+
+
+@pytest.mark.parametrize("length, status", [("abc", "400"), ("-5", "400"),
+                                            (str(MAX_BODY_BYTES + 1), "413")])
+def test_unusable_body_closes_the_connection(server, length, status):
+    # A second request follows the headers; it must not be parsed
+    response = raw_exchange(server, (
+        f"POST {API_PREFIX}/batch HTTP/1.1\r\nHost: x\r\nContent-Length: {length}\r\n\r\n"
+        f"GET {API_PREFIX}/nope HTTP/1.1\r\nHost: x\r\n\r\n"
+    ).encode())
+    assert response.startswith(f"HTTP/1.1 {status}")
+    assert "Connection: close" in response
+    assert response.count("HTTP/1.1") == 1
+
+
+def test_batch_keeps_the_connection_alive(server):
+    connection = http.client.HTTPConnection("127.0.0.1", server.server_port, timeout=5)
+    payload = json.dumps({"requests": [{"path": f"{API_PREFIX}/nope"}]})
+    for _ in range(2):
+        connection.request("POST", f"{API_PREFIX}/batch", body=payload,
+                           headers={"Content-Type": "application/json"})
+        response = connection.getresponse()
+        assert response.status == 200
+        assert json.loads(response.read())["responses"][0]["status"] == 404
+    connection.close()
@@ -0,0 +1,33 @@
+import numpy as np
+
+from utils.clustering import kmeans_run
+
+CENTERS = np.array([[0.0, 0.0], [10.0, 0.0], [0.0, 10.0]])
+
+
+def blobs(rng, per_blob=50):
+    X = np.concatenate([center + rng.normal(scale=0.5, size=(per_blob, 2)) for center in CENTERS])
+    truth = np.repeat(np.arange(len(CENTERS)), per_blob)
+    return X, truth
+
+
+def test_separated_blobs_are_recovered():
+    X, truth = blobs(np.random.default_rng(0))
+    inertia, labels, centroids = kmeans_run(X, 3, seed=1)
+
+    # Same partition up to cluster numbering
+    pairs = set(zip(truth, labels))
+    assert len(pairs) == 3 and len({label for _, label in pairs}) == 3
+    order = [labels[truth == t][0] for t in range(3)]
+    np.testing.assert_allclose(centroids[order], CENTERS, atol=0.3)
+
+    brute = sum(((X[i] - centroids[labels[i]]) ** 2).sum() for i in range(len(X)))
+    np.testing.assert_allclose(inertia, brute)
+    distances = ((X[:, None] - centroids[None]) ** 2).sum(axis=2)
+    np.testing.assert_array_equal(labels, distances.argmin(axis=1))
+
+
+def test_more_iterations_never_increase_inertia():
+    X = np.random.default_rng(3).random((200, 5))
+    inertias = [kmeans_run(X, 4, seed=5, max_iter=iterations)[0] for iterations in (1, 2, 5, 300)]
+    assert all(later <= earlier + 1e-9 for earlier, later in zip(inertias, inertias[1:]))
@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+
+from utils.correlation_utils import pairwise_pearson, pairwise_spearman
+
+
+def sample(rng, n=150, a=6, b=4):
+    base = rng.normal(size=(n, 1))
+    X = base + rng.normal(size=(n, a))
+    Y = base * rng.uniform(-1, 1, b) + rng.normal(size=(n, b))
+    # Missing values in X, with a few distinct patterns and a sparse column
+    X[rng.random((n, a)) < 0.15] = np.nan
+    X[:-2, -1] = np.nan
+    return X, Y
+
+
+def pandas_reference(X, Y, method):
+    """
+    DataFrame.corr of each column pair over its complete rows
+    """
+    def corr(i, j):
+        pair = pd.DataFrame({'x': X[:, i], 'y': Y[:, j]}).dropna()
+        return pair.corr(method=method).at['x', 'y']
+    return np.array([[corr(i, j) for j in range(Y.shape[1])] for i in range(X.shape[1])])
+
+
+def pair_counts(X, Y):
+    return (~np.isnan(X)).astype(int).T @ (~np.isnan(Y)).astype(int)
+
+
+def test_pairwise_pearson_matches_pandas():
+    X, Y = sample(np.random.default_rng(0))
+    Y[np.random.default_rng(1).random(Y.shape) < 0.1] = np.nan
+    r, n = pairwise_pearson(X, Y)
+    np.testing.assert_array_equal(n, pair_counts(X, Y))
+    expected = pandas_reference(X, Y, 'pearson')
+    expected[n < 3] = np.nan
+    np.testing.assert_allclose(r, expected, atol=1e-10)
+
+
+def test_pairwise_spearman_matches_pandas_for_complete_outcomes():
+    X, Y = sample(np.random.default_rng(2))
+    X = np.round(X, 1)  # ties
+    rho, n = pairwise_spearman(X, Y)
+    np.testing.assert_array_equal(n, pair_counts(X, Y))
+    expected = pandas_reference(X, Y, 'spearman')
+    expected[n < 3] = np.nan
+    np.testing.assert_allclose(rho, expected, atol=1e-10)
+
+
+def test_constant_column_has_no_correlation():
+    X = np.column_stack([np.ones(10), np.arange(10.0)])
+    r, _ = pairwise_pearson(X, np.arange(10.0)[:, None])
+    assert np.isnan(r[0, 0]) and np.isclose(r[1, 0], 1)
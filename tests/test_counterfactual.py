@@ -0,0 +1,64 @@
+import numpy as np
+
+from utils import counterfactual
+from utils.counterfactual import shifted_shares, simulate
+
+
+def random_inputs(rng, n=40, tiers=3):
+    tensor = rng.random((n, 5, 5))
+    tensor /= tensor.sum(axis=2, keepdims=True)
+    shares = rng.random((n, 5))
+    shares /= shares.sum(axis=1, keepdims=True)
+    return {
+        'tensor': tensor,
+        'shares': shares,
+        'counts': rng.integers(100, 5000, n).astype(np.float64),
+        'tier_index': rng.integers(0, tiers, n),
+        'tiers': list(range(tiers)),
+        'tier_names': [f"Tier {t}" for t in range(tiers)],
+    }
+
+
+def test_zero_shift_keeps_shares():
+    rng = np.random.default_rng(0)
+    inputs = random_inputs(rng)
+    shifted = shifted_shares(inputs['shares'], inputs['tier_index'], np.zeros((2, 3, 5)))
+    np.testing.assert_allclose(shifted, np.broadcast_to(inputs['shares'], shifted.shape))
+
+
+def test_shifted_shares_clip_and_renormalize_only_shifted_tiers():
+    rng = np.random.default_rng(1)
+    inputs = random_inputs(rng)
+    shifts = np.zeros((1, 3, 5))
+    shifts[0, 1] = [0.5, -0.9, 0, 0, 0]
+    shifted = shifted_shares(inputs['shares'], inputs['tier_index'], shifts)[0]
+
+    np.testing.assert_allclose(shifted.sum(axis=1), 1)
+    assert (shifted >= 0).all()
+    in_tier = inputs['tier_index'] == 1
+    assert (shifted[in_tier, 1] == 0).all()
+    np.testing.assert_allclose(shifted[~in_tier], inputs['shares'][~in_tier])
+    expected = np.clip(inputs['shares'][in_tier] + shifts[0, 1], 0, None)
+    np.testing.assert_allclose(shifted[in_tier], expected / expected.sum(axis=1, keepdims=True))
+
+
+def test_simulate_matches_a_loop_over_institutions(monkeypatch):
+    rng = np.random.default_rng(2)
+    inputs = random_inputs(rng)
+    monkeypatch.setattr(counterfactual, "simulation_inputs", lambda: inputs)
+    shifts = np.zeros((2, 3, 5))
+    shifts[1, 0] = [0.05, 0.05, 0, -0.05, -0.05]
+
+    students = simulate(shifts)
+    assert students.shape == (2, 3, 5, 5)
+    shares = shifted_shares(inputs['shares'], inputs['tier_index'], shifts)
+    expected = np.zeros_like(students)
+    for s in range(2):
+        for i, tier in enumerate(inputs['tier_index']):
+            expected[s, tier] += inputs['counts'][i] * shares[s, i][:, None] * inputs['tensor'][i]
+    np.testing.assert_allclose(students, expected)
+
+    # The all-zero scenario reproduces the enrollment of every tier
+    for tier in range(3):
+        np.testing.assert_allclose(students[0, tier].sum(),
+                                   inputs['counts'][inputs['tier_index'] == tier].sum())
@@ -0,0 +1,100 @@
+import os
+from types import SimpleNamespace
+
+import pytest
+
+from utils import disk_cache
+from utils.snapshot import pinned_snapshot
+
+
+def fake_snapshot(version):
+    return SimpleNamespace(version=version, group_version=lambda *groups: f"{version}:{groups}")
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(disk_cache, "CACHE_DIR", str(tmp_path))
+    return tmp_path
+
+
+def entries(cache_dir):
+    return sorted(p for p in cache_dir.iterdir() if p.suffix == ".bin")
+
+
+def test_key_depends_on_arguments_and_data_version(cache_dir):
+    calls = []
+
+    @disk_cached_payload("testkey", calls)
+    def payload(n, scale=1):
+        return [n * scale]
+
+    with pinned_snapshot(fake_snapshot("v1")):
+        assert payload(1) == [1]
+        assert payload(1) == [1]
+        assert payload(2) == [2]
+        assert payload(2, scale=3) == [6]
+    assert calls == [(1, 1), (2, 1), (2, 3)]
+    assert len(entries(cache_dir)) == 3
+
+    with pinned_snapshot(fake_snapshot("v2")):
+        assert payload(1) == [1]
+    assert calls[-1] == (1, 1)
+    assert len(entries(cache_dir)) == 4
+
+
+def test_group_scoped_entries_ignore_other_versions(cache_dir):
+    calls = []
+
+    @disk_cached_payload("testgroups", calls, data=("mobility",))
+    def payload(n, scale=1):
+        return [n * scale]
+
+    snapshot = fake_snapshot("v1")
+    with pinned_snapshot(snapshot):
+        payload(1)
+    # Another group changed: the whole-snapshot version moves, this group's does not
+    snapshot.version = "v2"
+    snapshot.group_version = lambda *groups: f"v1:{groups}"
+    with pinned_snapshot(snapshot):
+        payload(1)
+    assert calls == [(1, 1)]
+
+
+def test_least_recently_used_entry_is_evicted(cache_dir, monkeypatch):
+    calls = []
+
+    @disk_cached_payload("testlru", calls)
+    def payload(n, scale=1):
+        return bytes(1000)
+
+    monkeypatch.setattr(disk_cache, "CACHE_MAX_BYTES", 2500)
+    with pinned_snapshot(fake_snapshot("v1")):
+        payload(1)
+        first, = entries(cache_dir)
+        payload(2)
+        second, = set(entries(cache_dir)) - {first}
+        os.utime(first, (100, 100))
+        os.utime(second, (200, 200))
+
+        payload(1)  # hit: now the most recently used
+        payload(3)  # over the cap: the entry of payload(2) goes
+        assert first.exists() and not second.exists()
+        assert len(entries(cache_dir)) == 2
+
+        payload(1)
+        payload(2)
+    assert calls == [(1, 1), (2, 1), (3, 1), (2, 1)]
+    assert disk_cache.cache_stats()["testlru"]["evictions"] >= 2
+
+
+def disk_cached_payload(kind, calls, data=None):
+    """
+    disk_cached with a call log, so tests can tell hits from misses
+    """
+    def decorator(func):
+        def logged(n, scale=1):
+            calls.append((n, scale))
+            return func(n, scale=scale)
+        logged.__module__, logged.__qualname__ = func.__module__, func.__qualname__
+        return disk_cache.disk_cached(kind, data=data)(logged)
+    return decorator
@@ -0,0 +1,50 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.export import export_bytes, iter_csv, iter_parquet, with_cost_columns
+
+
+def result_table(n=25):
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        'super_opeid': np.arange(n),
+        'name': [f"College, {i}" for i in range(n)],  # commas need quoting
+        'rate': rng.random(n),
+        'price': np.where(rng.random(n) < 0.2, np.nan, rng.uniform(1000, 50000, n)),
+    })
+
+
+def test_csv_chunks_round_trip():
+    df = result_table()
+    chunks = list(iter_csv(df, chunk_rows=10))
+    assert len(chunks) == 1 + 3  # header, then ceil(25 / 10) chunks
+    pd.testing.assert_frame_equal(pd.read_csv(io.BytesIO(b"".join(chunks))), df)
+    assert export_bytes(df, "CSV", chunk_rows=10) == b"".join(chunks)
+
+
+def test_empty_csv_is_the_header():
+    df = result_table().iloc[:0]
+    assert export_bytes(df) == b"super_opeid,name,rate,price\n"
+
+
+def test_parquet_round_trip_one_row_group_per_chunk():
+    pq = pytest.importorskip("pyarrow.parquet")
+    df = result_table()
+    payload = export_bytes(df, "Parquet", chunk_rows=10)
+    parquet = pq.ParquetFile(io.BytesIO(payload))
+    assert parquet.metadata.num_row_groups == 3
+    pd.testing.assert_frame_equal(parquet.read().to_pandas(), df)
+    assert payload == b"".join(iter_parquet(df, chunk_rows=10))
+
+
+def test_cost_columns_are_matched_by_super_opeid(small_snapshot):
+    merged = small_snapshot.merged_frame()
+    df = merged[['super_opeid', 'name']].iloc[[3, 1]].reset_index(drop=True)
+    df.loc[len(df)] = [-1, "Unknown"]
+    exported = with_cost_columns(df, ['sticker_price_2013'])
+    np.testing.assert_allclose(exported['sticker_price_2013'],
+                               [merged['sticker_price_2013'].iat[3],
+                                merged['sticker_price_2013'].iat[1], np.nan])
@@ -0,0 +1,92 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from utils.ingest import compile_table, pool_cohorts
+from utils.snapshot import MOBILITY_FILE
+
+
+def write_cohort_file(data_dir, cohorts=(1980, 1981), scale=(1.0, 3.0)):
+    """
+    table2 repeated once per cohort (plus cohort column); counts scaled per cohort
+    """
+    mobility = pd.read_csv(os.path.join(data_dir, MOBILITY_FILE))
+    frames = [mobility.assign(cohort=cohort, count=mobility['count'] * factor)
+              for cohort, factor in zip(cohorts, scale)]
+    path = os.path.join(data_dir, "cohorts.csv")
+    pd.concat(frames, ignore_index=True).to_csv(path, index=False)
+    return path
+
+
+def read_compiled(out_dir, prefix, meta):
+    """
+    Frame from compile_table's blocks and category codes
+    """
+    table = meta[prefix]
+    columns = {}
+    for dtype, cols in table["blocks"].items():
+        block = np.load(os.path.join(out_dir, f"{prefix}_{dtype}.npy"))
+        columns.update({col: block[i] for i, col in enumerate(cols)})
+    for col in table["str_columns"]:
+        codes = np.load(os.path.join(out_dir, f"{prefix}_codes_{col}.npy"))
+        columns[col] = pd.Categorical.from_codes(codes, table["categories"][col])
+    return pd.DataFrame({col: columns[col] for col in table["columns"]})
+
+
+def test_compile_table_in_chunks_matches_a_full_read(small_data_dir, tmp_path):
+    path = write_cohort_file(small_data_dir)
+    meta = {}
+    # A chunk size that does not divide the row count
+    rows = compile_table(path, "cohort", str(tmp_path), meta, chunksize=7)
+
+    expected = pd.read_csv(path)
+    expected = expected[expected['iclevel'] == 1].reset_index(drop=True)
+    compiled = read_compiled(str(tmp_path), "cohort", meta)
+    assert rows == len(expected) == len(compiled)
+    assert not [name for name in os.listdir(tmp_path) if name.startswith(".spool")]
+
+    for col in expected.columns:
+        if isinstance(compiled[col].dtype, pd.CategoricalDtype):
+            pd.testing.assert_series_equal(compiled[col].astype(object), expected[col].astype(object))
+        else:
+            np.testing.assert_allclose(compiled[col].astype(np.float64), expected[col],
+                                       rtol=1e-6, equal_nan=True, err_msg=col)
+    assert compiled['tier'].dtype == np.int8
+
+
+def test_pool_cohorts_weights_by_count(small_data_dir):
+    path = write_cohort_file(small_data_dir)
+    pooled = pool_cohorts(path, chunksize=11).set_index('super_opeid')
+    mobility = pd.read_csv(os.path.join(small_data_dir, MOBILITY_FILE))
+    mobility = mobility[mobility['iclevel'] == 1].set_index('super_opeid')
+
+    assert 'cohort' not in pooled.columns
+    assert pooled.index.sort_values().tolist() == mobility.index.sort_values().tolist()
+    pooled = pooled.loc[mobility.index]
+    # Identical cohorts pool to the same rates; count is the mean per cohort
+    np.testing.assert_allclose(pooled['count'], mobility['count'] * 2)
+    for col in ('kq5_cond_parq1', 'par_q1', 'mr_kq5_pq1'):
+        np.testing.assert_allclose(pooled[col], mobility[col], rtol=1e-9, equal_nan=True)
+    assert pooled['name'].tolist() == mobility['name'].tolist()
+
+
+def test_pool_cohorts_weighted_mean(tmp_path):
+    path = tmp_path / "cohorts.csv"
+    pd.DataFrame({
+        'super_opeid': [1, 1, 2],
+        'name': ['A', 'A', 'B'],
+        'iclevel': [1, 1, 1],
+        'cohort': [1980, 1981, 1980],
+        'count': [100.0, 300.0, 50.0],
+        'par_q1': [0.2, 0.4, 0.5],
+        'kq5_cond_parq1': [0.1, 0.3, np.nan],
+    }).to_csv(path, index=False)
+    pooled = pool_cohorts(str(path), chunksize=2).set_index('super_opeid')
+
+    assert pooled.loc[1, 'count'] == 200
+    np.testing.assert_allclose(pooled.loc[1, 'par_q1'], (100 * 0.2 + 300 * 0.4) / 400)
+    # Conditional rates are weighted by the students from that parent quintile
+    np.testing.assert_allclose(pooled.loc[1, 'kq5_cond_parq1'],
+                               (20 * 0.1 + 120 * 0.3) / 140)
+    assert np.isnan(pooled.loc[2, 'kq5_cond_parq1'])
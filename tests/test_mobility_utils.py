@@ -0,0 +1,34 @@
+import numpy as np
+import pandas as pd
+
+from utils.mobility_utils import LADDER_COLUMNS, group_ladders
+
+
+def ladder_frame(rng, n=80):
+    kids = rng.dirichlet(np.ones(5), n)
+    df = pd.DataFrame(kids, columns=[f'kq{k}_cond_parq' for k in range(1, 6)])
+    df.insert(0, 'par_q', rng.random(n))
+    df['tier'] = rng.integers(1, 5, n).astype(float)
+    df.loc[::9, 'tier'] = np.nan
+    return df
+
+
+def test_group_ladders_match_per_group_means():
+    df = ladder_frame(np.random.default_rng(0))
+    names = {1: "One", 3: "Three", 2: "Two"}
+    ladders = group_ladders(df, df['tier'], names)
+
+    # "All" first, then the named groups in names order; tier 4 is unnamed
+    assert ladders.index.tolist() == ["All", "One", "Three", "Two"]
+    for label, rows in [("All", df)] + [(names[g], df[df['tier'] == g]) for g in names]:
+        assert ladders.loc[label, 'colleges'] == len(rows)
+        np.testing.assert_allclose(ladders.loc[label, LADDER_COLUMNS], rows[LADDER_COLUMNS].mean())
+        np.testing.assert_allclose(ladders.loc[label, 'q4q5'],
+                                   rows['kq4_cond_parq'].mean() + rows['kq5_cond_parq'].mean())
+
+
+def test_group_ladders_without_names_or_all():
+    df = ladder_frame(np.random.default_rng(1))
+    ladders = group_ladders(df, df['tier'], include_all=False)
+    assert ladders.index.tolist() == [1.0, 2.0, 3.0, 4.0]
+    assert ladders['colleges'].sum() == df['tier'].notna().sum()
@@ -0,0 +1,61 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from utils.schema import apply_schema, category_code_dtype, plan_dtypes
+from utils.snapshot import MOBILITY_FILE
+
+
+def raw_frame():
+    return pd.DataFrame({
+        'super_opeid': [1.0, 2.0, 3.0],
+        'name': ['A', 'B', 'A'],
+        'tier': [1.0, 2.0, 3.0],
+        'region': [1.0, np.nan, 2.0],
+        'par_q1': [0.1, 0.2, 0.3],
+        'count': [100.0, 200.0, 300.0],
+        'extra': [1.5, 2.5, 3.5],
+    })
+
+
+def test_apply_schema_narrows_declared_columns():
+    df = apply_schema(raw_frame())
+    assert isinstance(df['name'].dtype, pd.CategoricalDtype)
+    assert df['super_opeid'].dtype == np.int32
+    assert df['tier'].dtype == np.int8
+    assert df['par_q1'].dtype == np.float32
+    # Counts and undeclared columns keep their loaded dtype
+    assert df['count'].dtype == np.float64 and df['extra'].dtype == np.float64
+    # A missing value makes the int cast lossy, so it is skipped
+    assert df['region'].dtype == np.float64
+    pd.testing.assert_frame_equal(df.astype({'name': object, 'par_q1': np.float64}),
+                                  raw_frame(), check_dtype=False, atol=1e-7)
+
+
+def test_plan_dtypes_holds_for_every_chunk():
+    first = pd.DataFrame({'tier': [1.0, 2.0], 'cz': [10, 20], 'state': ['MA', 'NY']})
+    second = pd.DataFrame({'tier': [3.0, 4.0], 'cz': [30.5, np.nan], 'state': ['CA', None]})
+    plan = plan_dtypes([first, second])
+    assert plan == {'tier': 'int8', 'cz': 'float64', 'state': 'category'}
+    assert apply_schema(second, plan)['tier'].dtype == np.int8
+
+
+def test_category_code_dtype_keeps_room_for_missing():
+    assert category_code_dtype(10) == np.int8
+    assert category_code_dtype(127) == np.int16
+    assert category_code_dtype(40_000) == np.int32
+
+
+def test_snapshot_frames_use_the_schema_and_keep_values(small_data_dir, small_snapshot):
+    df = small_snapshot.mobility_frame()
+    raw = pd.read_csv(os.path.join(small_data_dir, MOBILITY_FILE))
+    raw = raw[raw['iclevel'] == 1].reset_index(drop=True)
+
+    assert df['tier'].dtype == np.int8
+    assert df['kq5_cond_parq1'].dtype == np.float32
+    assert isinstance(df['name'].dtype, pd.CategoricalDtype)
+    assert df['name'].astype(str).tolist() == raw['name'].tolist()
+    np.testing.assert_array_equal(df['super_opeid'], raw['super_opeid'])
+    np.testing.assert_allclose(df['kq5_cond_parq1'], raw['kq5_cond_parq1'], rtol=1e-6)
+    np.testing.assert_array_equal(df['count'], raw['count'])
@@ -0,0 +1,95 @@
+import threading
+
+from utils.singleflight import coalesce, singleflight_stats
+
+CALLERS = 6
+
+
+def _wait_for_followers(name, followers):
+    """
+    Block until the given number of callers are waiting on the leader
+    """
+    for _ in range(1000):
+        if singleflight_stats().get(name, {}).get("deduplicated", 0) >= followers:
+            return
+        threading.Event().wait(0.01)
+    raise AssertionError("followers never joined the in-flight call")
+
+
+def _run_concurrently(func, *args):
+    results, errors = [None] * CALLERS, [None] * CALLERS
+
+    def call(i):
+        try:
+            results[i] = func(*args)
+        except Exception as e:
+            errors[i] = e
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(CALLERS)]
+    for thread in threads:
+        thread.start()
+    return threads, results, errors
+
+
+def test_concurrent_identical_calls_share_one_computation():
+    release = threading.Event()
+    computed = []
+
+    @coalesce
+    def square(x):
+        computed.append(x)
+        release.wait(5)
+        return [x * x]
+
+    name = f"{square.__module__}.{square.__qualname__}"
+    threads, results, errors = _run_concurrently(square, 7)
+    _wait_for_followers(name, CALLERS - 1)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert computed == [7]
+    assert errors == [None] * CALLERS
+    assert all(result is results[0] for result in results)
+    assert results[0] == [49]
+
+    # Once finished, the next call computes again
+    assert square(7) == [49]
+    assert computed == [7, 7]
+
+
+def test_followers_receive_the_leader_error():
+    release = threading.Event()
+
+    @coalesce
+    def failing(x):
+        release.wait(5)
+        raise ValueError(x)
+
+    name = f"{failing.__module__}.{failing.__qualname__}"
+    threads, _, errors = _run_concurrently(failing, 1)
+    _wait_for_followers(name, CALLERS - 1)
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert all(isinstance(e, ValueError) for e in errors)
+
+
+def test_different_arguments_do_not_coalesce():
+    release = threading.Event()
+    computed = []
+
+    @coalesce
+    def blocking(x):
+        computed.append(x)
+        if x == 1:
+            release.wait(5)
+        return [x]
+
+    thread = threading.Thread(target=blocking, args=(1,))
+    thread.start()
+    # Computed while the call for 1 is still in flight
+    assert blocking(2) == [2]
+    release.set()
+    thread.join()
+    assert sorted(computed) == [1, 2]
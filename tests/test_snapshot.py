@@ -0,0 +1,62 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from utils import snapshot as snapshot_module
+from utils.snapshot import (COST_FILE, MOBILITY_FILE, Snapshot, build_snapshot,
+                            pinned_snapshot, refresh_snapshot, shared_snapshot)
+
+
+def edit_csv(path, column, delta):
+    df = pd.read_csv(path)
+    df.loc[0, column] += delta
+    df.to_csv(path, index=False)
+    return df.loc[0, 'super_opeid']
+
+
+def test_rebuild_recompiles_only_changed_groups(small_data_dir, tmp_path):
+    snapshot_dir = str(tmp_path / "snapshot")
+    first = Snapshot(build_snapshot(str(small_data_dir), snapshot_dir))
+    old_price = first.cost_frame()['sticker_price_2013'].copy()
+
+    opeid = edit_csv(small_data_dir / COST_FILE, 'sticker_price_2013', 1000)
+    second = Snapshot(build_snapshot(str(small_data_dir), snapshot_dir))
+
+    assert second.version != first.version
+    rebuilt = {group: info["rebuilt"] for group, info in second.meta["groups"].items()}
+    assert rebuilt == {"mobility": False, "cost": True, "join": True, "validation": True}
+    assert second.group_version("mobility") == first.group_version("mobility")
+    assert second.group_version("cost") != first.group_version("cost")
+    # Reused artifacts are the previous snapshot's files, not copies
+    for name in ("tensor.npy", "mobility_float32.npy"):
+        assert os.path.samefile(os.path.join(first.path, name), os.path.join(second.path, name))
+
+    row = second.cost_frame()['super_opeid'].to_numpy() == opeid
+    new_price = second.cost_frame()['sticker_price_2013']
+    np.testing.assert_allclose(new_price[row], old_price[row] + 1000)
+    # The previous snapshot is still readable and unchanged
+    np.testing.assert_array_equal(first.cost_frame()['sticker_price_2013'], old_price)
+
+
+def test_unchanged_sources_reuse_the_snapshot(small_data_dir, tmp_path):
+    snapshot_dir = str(tmp_path / "snapshot")
+    assert build_snapshot(str(small_data_dir), snapshot_dir) == \
+        build_snapshot(str(small_data_dir), snapshot_dir)
+
+
+def test_refresh_swaps_the_shared_handle(small_data_dir, tmp_path, monkeypatch):
+    snapshot_dir = str(tmp_path / "snapshot")
+    old = Snapshot(build_snapshot(str(small_data_dir), snapshot_dir))
+    monkeypatch.setattr(snapshot_module, "_shared_snapshot", old)
+    assert not refresh_snapshot(str(small_data_dir), snapshot_dir)
+
+    edit_csv(small_data_dir / MOBILITY_FILE, 'count', 1)
+    with pinned_snapshot() as pinned:
+        assert refresh_snapshot(str(small_data_dir), snapshot_dir)
+        # A pinned rerun keeps the handle it started with
+        assert shared_snapshot() is pinned is old
+    new = shared_snapshot()
+    assert new is not old and new.version != old.version
+    assert new.meta["groups"]["cost"]["rebuilt"] is False
+    assert not refresh_snapshot(str(small_data_dir), snapshot_dir)
@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+
+from utils.stats_models import percentile_ranks
+
+
+def brute_force_percentile(values, i):
+    """
+    Percentile of row i among the non-missing values, ties averaged
+    """
+    present = values.dropna()
+    below = (present < values.iloc[i]).sum()
+    ties = (present == values.iloc[i]).sum()
+    return (below + (ties + 1) / 2) / len(present) * 100
+
+
+def test_percentile_ranks_match_a_per_row_count():
+    rng = np.random.default_rng(0)
+    n = 60
+    df = pd.DataFrame({
+        'tier': rng.integers(1, 4, n),
+        'state': pd.Categorical(rng.choice(['MA', 'NY', 'CA'], n)),
+        'rate': np.round(rng.random(n), 1),  # ties
+        'price': rng.uniform(1000, 50000, n),
+    })
+    df.loc[df.index[::7], 'price'] = np.nan
+    ranks = percentile_ranks(df, ['rate', 'price'])
+
+    for metric in ('rate', 'price'):
+        for scope, group_col in (('national', None), ('tier', 'tier'), ('state', 'state')):
+            for i in range(n):
+                group = df if group_col is None else df[df[group_col] == df[group_col].iat[i]]
+                values = group[metric].reset_index(drop=True)
+                position = group.index.get_loc(df.index[i])
+                pct = ranks[f'{metric}_pct_{scope}'].iat[i]
+                if np.isnan(df[metric].iat[i]):
+                    assert np.isnan(pct)
+                else:
+                    np.testing.assert_allclose(pct, brute_force_percentile(values, position))
+                # Population ranked against: the group's institutions with a value
+                assert ranks[f'{metric}_n_{scope}'].iat[i] == values.notna().sum()
+
+
+def test_metric_counts_differ_with_missing_values():
+    df = pd.DataFrame({'tier': [1, 1, 1], 'state': ['MA'] * 3,
+                       'rate': [0.1, 0.2, 0.3], 'price': [np.nan, 10.0, 20.0]})
+    ranks = percentile_ranks(df, ['rate', 'price'], scopes=('national', 'tier'))
+    assert ranks['rate_n_national'].tolist() == [3, 3, 3]
+    assert ranks['price_n_tier'].tolist() == [2, 2, 2]
+    assert ranks['price_pct_national'].iloc[1:].tolist() == [50.0, 100.0]
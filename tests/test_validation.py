@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+
+from utils.validation import MAX_FAILURES, PAR_SHARE_COLUMNS, TENSOR_COLUMNS, validate_tables
+
+
+def clean_tables(n=20):
+    rng = np.random.default_rng(0)
+    mobility = pd.DataFrame({'super_opeid': np.arange(1, n + 1), 'name': [f"College {i}" for i in range(n)],
+                             'count': rng.uniform(50, 500, n)})
+    shares = rng.dirichlet(np.ones(5), n)
+    mobility[PAR_SHARE_COLUMNS] = shares
+    kids = rng.dirichlet(np.ones(5), (n, 5)).reshape(n, 25)
+    mobility[TENSOR_COLUMNS] = kids
+    cost = pd.DataFrame({'super_opeid': np.arange(1, n + 1),
+                         'sticker_price_2013': rng.uniform(5000, 60000, n)})
+    return mobility, cost
+
+
+def failed(report):
+    return {(c['check'], c['scope']): c['failures'] for c in report['checks'] if c['status'] == 'fail'}
+
+
+def test_clean_tables_pass():
+    report = validate_tables(*clean_tables())
+    assert report['passed'] and not report['failures']
+    assert report['rows'] == 20
+
+
+def test_each_kind_of_problem_is_reported():
+    mobility, cost = clean_tables()
+    mobility.loc[0, 'kq1_cond_parq2'] += 0.1        # Parent Q2 row sums to 1.1
+    mobility.loc[1, 'count'] = 0                      # counts must be > 0
+    mobility.loc[2, 'par_q1'] = np.nan                # missing, not a failure
+    mobility.loc[3, 'super_opeid'] = 99               # no table10 row
+    cost.loc[4, 'sticker_price_2013'] = -1.0          # prices must be >= 0
+    cost.loc[5, 'super_opeid'] = cost.loc[6, 'super_opeid']
+    report = validate_tables(mobility, cost)
+
+    assert not report['passed']
+    failures = failed(report)
+    assert failures[("Kid quintiles sum to 1", "Parent Q2")] == 1
+    assert failures[("Cohort counts positive", "1 mobility columns")] == 1
+    assert failures[("Prices non-negative", "1 cost columns")] == 1
+    assert failures[("super_opeid unique", "table10")] == 2
+    # Row 3, and the table2 row whose table10 partner lost its id
+    assert failures[("Joins to table10", "table2 institutions")] == 2
+    assert ("Parent shares sum to 1", "All institutions") not in failures
+
+    rows = {(f['check'], f['super_opeid']) for f in report['failures']}
+    assert ("Cohort counts positive", 2) in rows and ("Joins to table10", 99) in rows
+    shares = next(c for c in report['checks'] if c['check'] == "Parent shares sum to 1")
+    assert shares['missing'] == 1
+
+
+def test_zero_price_passes_and_missing_columns_fail():
+    mobility, cost = clean_tables()
+    cost.loc[0, 'sticker_price_2013'] = 0.0
+    assert validate_tables(mobility, cost)['passed']
+
+    report = validate_tables(mobility.drop(columns=['kq5_cond_parq3']), cost)
+    assert failed(report)[("Required columns present", "table2")] == 1
+    assert report['failures'][0]['scope'] == 'kq5_cond_parq3'
+
+
+def test_failure_rows_are_capped():
+    mobility, cost = clean_tables(n=MAX_FAILURES + 10)
+    mobility['count'] = -1.0
+    report = validate_tables(mobility, cost)
+    assert failed(report)[("Cohort counts positive", "1 mobility columns")] == MAX_FAILURES + 10
+    assert sum(f['check'] == "Cohort counts positive" for f in report['failures']) == MAX_FAILURES
@@ -0,0 +1,102 @@
+import numpy as np
+import pandas as pd
+from utils.profiling import profiled
+
+# Tier -> (group, subgroup) used by the affordability quadrant
+TIER_GROUPS = {
+    1: ('Elite', 'Ivy Plus'),
+    2: ('Elite', 'Other Elite'),
+    3: ('Highly Selective', 'Public'),
+    4: ('Highly Selective', 'Private'),
+    5: ('Selective', 'Public'),
+    6: ('Selective', 'Private'),
+    7: ('Nonselective', 'Public'),
+    8: ('Nonselective', 'Private'),
+    10: ('Four-year for-profit', 'For-profit')
+}
+
+QUADRANTS = [
+    'High Mobility, Low Cost',
+    'High Mobility, High Cost',
+    'Low Mobility, Low Cost',
+    'Low Mobility, High Cost'
+]
+
+@profiled
+def add_affordability_columns(df, parent_quintile=1):
+    """
+    Add group, subgroup and mobility_rate (Q4+Q5) columns in place
+
+    Parameters:
+    -----------
+    df : pd.DataFrame
+        Merged dataset
+    parent_quintile : int
+        Parent income quintile to analyze (1-5)
+    """
+    df['group'] = df['tier'].map({tier: g for tier, (g, _) in TIER_GROUPS.items()})
+    df['subgroup'] = df['tier'].map({tier: s for tier, (_, s) in TIER_GROUPS.items()})
+    df['mobility_rate'] = (
+        df[f'kq4_cond_parq{parent_quintile}'] +
+        df[f'kq5_cond_parq{parent_quintile}']
+    )
+    return df
+
+@profiled
+def assign_quadrants(df, median_price, median_mobility, price_col='sticker_price_2013'):
+    """
+    Label each institution with its mobility/cost quadrant
+
+    Institutions exactly on a median line belong to no quadrant (NaN),
+    matching the strict comparisons used for the quadrant counts.
+
+    Returns:
+    --------
+    pd.Series
+        Quadrant label per row
+    """
+    price = df[price_col].to_numpy()
+    mobility = df['mobility_rate'].to_numpy()
+    conditions = [
+        (price < median_price) & (mobility > median_mobility),
+        (price > median_price) & (mobility > median_mobility),
+        (price < median_price) & (mobility < median_mobility),
+        (price > median_price) & (mobility < median_mobility)
+    ]
+    labels = np.select(conditions, QUADRANTS, default='')
+    return pd.Series(labels, index=df.index).replace('', np.nan)
+
+@profiled
+def pareto_frontier(price, mobility):
+    """
+    Flag the non-dominated institutions: no other institution is at least
+    as cheap and at least as mobile while better on one of the two (of
+    exact duplicates, one is flagged)
+
+    Sorts by price (ties: highest mobility first) and keeps every point
+    whose mobility beats the best seen at a lower price, so the skyline
+    costs O(n log n). Rows with a missing price or rate are never on the
+    frontier.
+
+    Parameters:
+    -----------
+    price : array-like
+        Price per institution (lower is better)
+    mobility : array-like
+        Mobility rate per institution (higher is better)
+
+    Returns:
+    --------
+    np.ndarray
+        Boolean mask aligned with the inputs
+    """
+    price = np.asarray(price, dtype=float)
+    mobility = np.asarray(mobility, dtype=float)
+    rows = np.flatnonzero(~(np.isnan(price) | np.isnan(mobility)))
+    order = rows[np.lexsort((-mobility[rows], price[rows]))]
+
+    sorted_mobility = mobility[order]
+    best_before = np.maximum.accumulate(np.concatenate(([-np.inf], sorted_mobility[:-1])))
+    mask = np.zeros(len(price), dtype=bool)
+    mask[order[sorted_mobility > best_before]] = True
+    return mask
@@ -0,0 +1,309 @@
+# utils/api.py
+"""
+Headless JSON API serving the dashboard's aggregates to other tools.
+
+Endpoints reuse the cached artifacts behind the views (utils.artifacts), so
+their numbers match the dashboard and repeated requests are served from the
+disk cache shared with the app. Run next to the app with:
+
+    python -m utils.api --port 8600
+
+GET endpoints:
+
+    /api/v1/health
+    /api/v1/ladders?parent_quintile=1&min_q1_pct=0   mean mobility ladder per tier
+    /api/v1/quadrants?parent_quintile=1               mobility/cost quadrant per institution
+    /api/v1/mobility-work?limit=100                   mobility work scores, highest first
+    /api/v1/institutions?ids=3537,1541                institution profiles
+    /metrics                                          Prometheus metrics of this process
+
+POST /api/v1/batch runs several GET requests in one round trip:
+
+    {"requests": [{"path": "/api/v1/ladders", "params": {"parent_quintile": 2}},
+                  {"path": "/api/v1/quadrants", "etag": "\\"...\\""}]}
+
+Connections are HTTP/1.1 keep-alive. Every response carries an ETag built
+from the versions of the snapshot groups and compute modules it depends on
+plus the request itself, so a matching If-None-Match (or "etag" inside a
+batch) is answered with 304 before any work is done.
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from utils.disk_cache import code_version, data_version
+from utils.metrics import histogram, render_prometheus
+
+API_PREFIX = "/api/v1"
+DEFAULT_PORT = int(os.environ.get("SEMD_API_PORT", 8600))
+MAX_BATCH = 50
+MAX_IDS = 200
+MAX_BODY_BYTES = 1 << 20
+# Idle keep-alive connections are closed after this many seconds
+KEEP_ALIVE_TIMEOUT = 30
+
+API_SECONDS = histogram("semd_api_request_seconds", "API request wall time by endpoint")
+
+logger = logging.getLogger("semd.api")
+
+WORK_COLUMNS = ['super_opeid', 'name', 'tier', 'institution_type', 'mobility_work',
+                'avg_mobility_score', 'bottom_80_pct', 'par_q1', 'kq5_cond_parq1']
+
+
+def _records(df):
+    """
+    DataFrame -> list of dicts with JSON-safe values (NaN -> None)
+    """
+    return json.loads(df.to_json(orient='records'))
+
+
+def _int_param(params, name, default, low, high):
+    values = params.get(name)
+    if not values:
+        return default
+    try:
+        value = int(values[-1])
+    except (TypeError, ValueError):
+        raise ValueError(f"{name} must be an integer") from None
+    if not low <= value <= high:
+        raise ValueError(f"{name} must be between {low} and {high}")
+    return value
+
+
+def _health(params):
+    return {"status": "ok", "data_version": data_version()}
+
+
+def _ladders(params):
+    from utils.artifacts import mobility_tier_ladders
+    parent_quintile = _int_param(params, "parent_quintile", 1, 1, 5)
+    min_q1_pct = _int_param(params, "min_q1_pct", 0, 0, 100)
+    ladders = mobility_tier_ladders(parent_quintile, min_q1_pct)
+    return {
+        "parent_quintile": parent_quintile,
+        "min_q1_pct": min_q1_pct,
+        "tiers": _records(ladders.reset_index()),
+    }
+
+
+def _quadrants(params):
+    from utils.artifacts import affordability_quadrants
+    parent_quintile = _int_param(params, "parent_quintile", 1, 1, 5)
+    institutions, medians = affordability_quadrants(parent_quintile)
+    return {
+        "parent_quintile": parent_quintile,
+        "medians": medians,
+        "counts": institutions['quadrant'].value_counts().to_dict(),
+        "institutions": _records(institutions),
+    }
+
+
+def _mobility_work(params):
+    from utils.artifacts import mobility_work_rankings
+    rankings = mobility_work_rankings()
+    limit = _int_param(params, "limit", 100, 1, max(len(rankings), 1))
+    return {"total": len(rankings), "institutions": _records(rankings[WORK_COLUMNS].head(limit))}
+
+
+def _institutions(params):
+    from utils.snapshot import shared_snapshot
+    raw = ",".join(params.get("ids", [])).replace(" ", "")
+    try:
+        ids = [int(i) for i in raw.split(",") if i]
+    except ValueError:
+        raise ValueError("ids must be a comma-separated list of super_opeid values") from None
+    if not ids:
+        raise ValueError("ids is required")
+    if len(ids) > MAX_IDS:
+        raise ValueError(f"at most {MAX_IDS} ids per request")
+
+    df = shared_snapshot().merged_frame()
+    profiles = df[df['super_opeid'].isin(ids)].copy()
+    for p in range(1, 6):
+        profiles[f'q4q5_cond_parq{p}'] = profiles[f'kq4_cond_parq{p}'] + profiles[f'kq5_cond_parq{p}']
+    found = set(profiles['super_opeid'].tolist())
+    return {
+        "institutions": _records(profiles),
+        "missing": [i for i in ids if i not in found],
+    }
+
+
+# path -> (handler, snapshot groups read, modules whose code shapes the result)
+ROUTES = {
+    f"{API_PREFIX}/health": (_health, None, ()),
+    f"{API_PREFIX}/ladders": (_ladders, ("mobility",),
+                              ("utils.artifacts", "utils.mobility_utils")),
+    f"{API_PREFIX}/quadrants": (_quadrants, ("mobility", "join"),
+                                ("utils.artifacts", "utils.affordability_utils")),
+    f"{API_PREFIX}/mobility-work": (_mobility_work, ("mobility", "join"),
+                                    ("utils.artifacts", "utils.stats_models")),
+    f"{API_PREFIX}/institutions": (_institutions, ("mobility", "join"), ()),
+}
+
+
+def etag_for(path, params, snapshot=None):
+    """
+    ETag of a GET response, computed without running the handler
+    """
+    _, groups, modules = ROUTES[path]
+    key = repr((path, sorted((k, sorted(v)) for k, v in params.items()),
+                data_version(groups, snapshot), code_version((__name__,) + modules)))
+    return '"' + hashlib.sha256(key.encode()).hexdigest()[:32] + '"'
+
+
+def handle(path, params, if_none_match=None):
+    """
+    Run one GET request
+
+    Parameters:
+    -----------
+    path : str
+        Endpoint path, e.g. "/api/v1/ladders"
+    params : dict
+        Query parameters, name -> list of str values
+    if_none_match : str, optional
+        ETag the client already holds
+
+    Returns:
+    --------
+    tuple
+        (HTTP status, JSON-safe body or None, ETag or None)
+    """
+    if path not in ROUTES:
+        return 404, {"error": f"unknown endpoint {path}"}, None
+    from utils.snapshot import pinned_snapshot
+    started = time.perf_counter()
+    try:
+        # ETag and body from the same snapshot, even across a hot swap
+        with pinned_snapshot() as snapshot:
+            etag = etag_for(path, params, snapshot)
+            if if_none_match is not None and etag in [t.strip() for t in if_none_match.split(",")]:
+                return 304, None, etag
+            return 200, ROUTES[path][0](params), etag
+    except ValueError as e:
+        return 400, {"error": str(e)}, None
+    except LookupError as e:
+        return 404, {"error": str(e)}, None
+    except Exception as e:
+        logger.exception("API request %s failed", path)
+        return 500, {"error": f"{type(e).__name__}: {e}"}, None
+    finally:
+        API_SECONDS.observe(time.perf_counter() - started, endpoint=path)
+
+
+def handle_batch(payload):
+    """
+    Run the GET requests listed in a batch payload, in order
+    """
+    if not isinstance(payload, dict) or not isinstance(payload.get("requests"), list):
+        raise ValueError('body must be {"requests": [...]}')
+    requests = payload["requests"]
+    if len(requests) > MAX_BATCH:
+        raise ValueError(f"at most {MAX_BATCH} requests per batch")
+
+    responses = []
+    for request in requests:
+        if not isinstance(request, dict) or "path" not in request:
+            responses.append({"status": 400, "body": {"error": "each request needs a path"}})
+            continue
+        params = {str(k): [str(x) for x in (v if isinstance(v, list) else [v])]
+                  for k, v in (request.get("params") or {}).items()}
+        path = str(request["path"])
+        status, body, etag = handle(path, params, request.get("etag"))
+        responses.append({"path": path, "status": status, "etag": etag, "body": body})
+    return {"responses": responses}
+
+
+class APIHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+    timeout = KEEP_ALIVE_TIMEOUT
+    # Headers and body go out in separate writes; without TCP_NODELAY small
+    # responses on a kept-alive connection wait for the delayed ACK
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.path == "/metrics":
+            self._send_bytes(200, render_prometheus().encode(),
+                             "text/plain; version=0.0.4; charset=utf-8")
+            return
+        status, body, etag = handle(url.path.rstrip("/") or "/", parse_qs(url.query),
+                                    self.headers.get("If-None-Match"))
+        self._send_json(status, body, etag)
+
+    def do_POST(self):
+        url = urlsplit(self.path)
+        if url.path.rstrip("/") != f"{API_PREFIX}/batch":
+            self._send_json(404, {"error": f"unknown endpoint {url.path}"})
+            return
+        # Without a usable length the body cannot be skipped, so the
+        # connection is closed instead of parsing it as the next request
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+            if length < 0:
+                raise ValueError
+        except ValueError:
+            self._send_json(400, {"error": "invalid Content-Length"}, close=True)
+            return
+        if length > MAX_BODY_BYTES:
+            self._send_json(413, {"error": "request body too large"}, close=True)
+            return
+        started = time.perf_counter()
+        try:
+            result = handle_batch(json.loads(self.rfile.read(length) or b"null"))
+        except ValueError as e:  # includes malformed JSON
+            self._send_json(400, {"error": str(e)})
+            return
+        API_SECONDS.observe(time.perf_counter() - started, endpoint=url.path)
+        self._send_json(200, result)
+
+    def _send_json(self, status, body, etag=None, close=False):
+        payload = b"" if body is None else json.dumps(body, separators=(",", ":")).encode()
+        self._send_bytes(status, payload, "application/json", etag, close)
+
+    def _send_bytes(self, status, payload, content_type, etag=None, close=False):
+        self.send_response(status)
+        if close:
+            self.send_header("Connection", "close")  # also sets close_connection
+        if etag is not None:
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", "no-cache")
+        if status != 304:
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        if status != 304:
+            self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(host="127.0.0.1", port=DEFAULT_PORT):
+    """
+    Serve the API until interrupted
+    """
+    from utils.snapshot import shared_snapshot
+    shared_snapshot()  # attach (and start the data watcher) before the first request
+    server = ThreadingHTTPServer((host, port), APIHandler)
+    server.daemon_threads = True
+    print(f"Serving {API_PREFIX} on http://{host}:{server.server_port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Headless JSON API over the dashboard's aggregates")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    args = parser.parse_args()
+    serve(args.host, args.port)
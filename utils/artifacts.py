@@ -0,0 +1,187 @@
+# utils/artifacts.py
+"""
+Derived artifacts over the full snapshot, persisted with the disk cache so
+restarted workers come up warm.
+"""
+import pandas as pd
+
+from utils.affordability_utils import add_affordability_columns, assign_quadrants, pareto_frontier
+from utils.clustering import DEFAULT_K, cluster_institutions
+from utils.correlation_utils import COVARIATE_LABELS, covariate_correlations, outcome_columns
+from utils.disk_cache import disk_cached
+from utils.enrollment_utils import enrollment_by_tier, enrollment_distribution
+from utils.mobility_utils import create_mobility_ladder, tier_ladders
+from utils.profiling import profiled
+from utils.singleflight import coalesce
+from utils.snapshot import shared_snapshot
+from utils.stats_models import institution_rank_table, mobility_rate_decomposition, mobility_work_scores
+
+@profiled
+@coalesce
+@disk_cached("cube", depends_on=("utils.enrollment_utils", "utils.clustering"), data=("mobility",))
+def enrollment_cube(k=None):
+    """
+    Mean parent income distribution and institution count by tier, or by
+    mobility cluster when k is given
+    """
+    df = shared_snapshot().mobility_frame()
+    if k is None:
+        return enrollment_by_tier(df)
+    clustered = df.assign(cluster=df['super_opeid'].map(mobility_clusters(k)[0]))
+    return enrollment_by_tier(clustered, group_col='cluster')
+
+@profiled
+@coalesce
+@disk_cached("figure", fmt="plotly", depends_on=("utils.enrollment_utils", "utils.viz_utils", "utils.clustering"),
+             data=("mobility",))
+def enrollment_figure(tier_id, tier_name, k=None):
+    """
+    Enrollment distribution chart for one tier (or cluster, with k)
+    """
+    from utils.viz_utils import plot_enrollment_distribution
+    distribution = enrollment_distribution(enrollment_cube(k).loc[tier_id])
+    return plot_enrollment_distribution(distribution, tier_name)
+
+@profiled
+@coalesce
+@disk_cached("ranking", depends_on=("utils.stats_models",), data=("mobility", "join"))
+def mobility_work_rankings():
+    """
+    Mobility work scores for every four-year institution, highest first
+    """
+    df_work = mobility_work_scores(shared_snapshot().merged_frame())
+    return df_work.sort_values('mobility_work', ascending=False)
+
+@profiled
+@coalesce
+@disk_cached("leaderboard", depends_on=("utils.stats_models",), data=("mobility",))
+def mobility_rate_leaderboard():
+    """
+    Access x success decomposition and percentiles of the headline
+    mobility rates for every four-year institution
+    """
+    return mobility_rate_decomposition(shared_snapshot().mobility_frame())
+
+@profiled
+@coalesce
+@disk_cached("percentiles", depends_on=("utils.stats_models",), data=("mobility", "join"))
+def institution_percentiles():
+    """
+    National, within-tier and within-state percentile of every institution
+    on every profile metric, indexed by super_opeid
+    """
+    return institution_rank_table(shared_snapshot().merged_frame())
+
+@profiled
+@coalesce
+@disk_cached("ladder", depends_on=("utils.mobility_utils",), data=("mobility",))
+def mobility_tier_ladders(parent_quintile=1, min_q1_pct=0):
+    """
+    Mean mobility ladder per tier for one parent quintile, after the
+    dashboard's minimum bottom-quintile share filter
+    """
+    df = shared_snapshot().mobility_frame()
+    df = df[df['par_q1'] * 100 >= min_q1_pct]
+    return tier_ladders(create_mobility_ladder(df, parent_quintile=parent_quintile))
+
+@profiled
+@coalesce
+@disk_cached("quadrants", depends_on=("utils.affordability_utils",), data=("mobility", "join"))
+def affordability_quadrants(parent_quintile=1):
+    """
+    Mobility/cost quadrant of every institution with cost data
+
+    Returns:
+    --------
+    tuple
+        (pd.DataFrame with one row per institution, dict with the median
+        sticker price and median mobility rate that split the quadrants)
+    """
+    df = add_affordability_columns(shared_snapshot().merged_frame(), parent_quintile)
+    medians = {
+        'sticker_price_2013': float(df['sticker_price_2013'].median()),
+        'mobility_rate': float(df['mobility_rate'].median())
+    }
+    df['quadrant'] = assign_quadrants(df, medians['sticker_price_2013'], medians['mobility_rate'])
+    columns = ['super_opeid', 'name', 'tier', 'group', 'subgroup',
+               'sticker_price_2013', 'mobility_rate', 'quadrant']
+    return df[columns], medians
+
+@profiled
+@coalesce
+@disk_cached("frontier", depends_on=("utils.affordability_utils",), data=("mobility", "join"))
+def affordability_frontier(parent_quintile=1, groups=(), price_col='sticker_price_2013'):
+    """
+    Price-mobility Pareto frontier for one parent quintile
+
+    Parameters:
+    -----------
+    parent_quintile : int
+        Parent income quintile (1-5) of the Q4+Q5 mobility rate
+    groups : tuple of str
+        Institution groups to include; empty for all
+    price_col : str
+        'sticker_price_2013' or 'scorecard_netprice_2013'
+
+    Returns:
+    --------
+    pd.DataFrame
+        Frontier institutions, cheapest first
+    """
+    df = add_affordability_columns(shared_snapshot().merged_frame(), parent_quintile)
+    if groups:
+        df = df[df['group'].isin(groups)]
+    frontier = df[pareto_frontier(df[price_col], df['mobility_rate'])]
+    columns = ['super_opeid', 'name', 'group', 'subgroup', 'sticker_price_2013',
+               'scorecard_netprice_2013', 'mobility_rate', 'par_q1']
+    return frontier[columns].sort_values(price_col).reset_index(drop=True)
+
+@profiled
+@coalesce
+@disk_cached("clusters", depends_on=("utils.clustering",), data=("mobility",))
+def mobility_clusters(k=DEFAULT_K):
+    """
+    K-means mobility clusters of every four-year institution
+
+    Returns:
+    --------
+    tuple
+        (pd.Series super_opeid -> cluster id 1..k, pd.DataFrame centroid
+        profile per cluster)
+    """
+    snapshot = shared_snapshot()
+    return cluster_institutions(snapshot.super_opeid, snapshot.tensor, snapshot.par_shares,
+                                snapshot.mobility_frame()['tier'].to_numpy(), k)
+
+@profiled
+@coalesce
+@disk_cached("correlation", depends_on=("utils.correlation_utils",), data=("mobility", "join"))
+def covariate_correlation_matrix(tiers=(), types=(), min_q1_pct=0):
+    """
+    Pearson and Spearman correlations between the table10 covariates and
+    the mobility outcomes of every parent quintile, for one filter state
+
+    Parameters:
+    -----------
+    tiers : tuple of int
+        Tiers to include; empty for all
+    types : tuple of int
+        Institution types to include (1 public, 2 private non-profit,
+        3 for-profit); empty for all
+    min_q1_pct : int
+        Minimum percentage of students from the bottom parent quintile
+
+    Returns:
+    --------
+    dict
+        'pearson', 'spearman' and 'n' DataFrames (covariates x outcomes)
+    """
+    snapshot = shared_snapshot()
+    df = snapshot.mobility_frame()
+    keep = (snapshot.cost_rows >= 0) & (df['par_q1'].to_numpy() * 100 >= min_q1_pct)
+    if tiers:
+        keep &= df['tier'].isin(tiers).to_numpy()
+    if types:
+        keep &= df['type'].isin(types).to_numpy()
+    covariates = pd.DataFrame(snapshot.cost_columns(list(COVARIATE_LABELS)))[keep]
+    return covariate_correlations(covariates, outcome_columns(df[keep]))
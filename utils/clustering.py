@@ -0,0 +1,225 @@
+# utils/clustering.py
+"""
+K-means clustering of institutions by mobility profile.
+
+Tiers group colleges by selectivity and control; clusters group them by
+what they do for their students. Each institution is described by its
+flattened 5x5 transition matrix P(kid quintile | parent quintile) and its
+parent income shares par_q1..par_q5. All 30 features are shares, so they
+are clustered on their natural scale.
+
+Clusters are numbered by their centroid's Q1 -> Q4+Q5 rate, highest first,
+so "Cluster 1" is always the strongest mobility profile. Results are cached
+per k with the disk cache (utils.artifacts.mobility_clusters); warm them
+ahead of deployment with
+
+    python -m utils.clustering --k 3 4 5 6
+"""
+import argparse
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from utils.profiling import profiled
+
+DEFAULT_K = 5
+K_RANGE = range(2, 11)
+N_INIT = 8
+MAX_ITER = 300
+TOL = 1e-8
+# Processes used for the restarts; 1 runs them in this process
+WORKERS = int(os.environ.get("SEMD_KMEANS_WORKERS", min(N_INIT, os.cpu_count() or 1)))
+# Below this many point-centroid distances per iteration a restart takes
+# milliseconds, less than starting a worker process, so restarts run inline
+POOL_MIN_WORK = 2_000_000
+
+PROFILE_COLUMNS = ([f'par_q{p}' for p in range(1, 6)] +
+                   [f'kq{k}_cond_parq1' for k in range(1, 6)])
+
+
+def clustering_features(tensor, par_shares):
+    """
+    Feature matrix: flattened transition matrices followed by parent shares
+
+    Parameters:
+    -----------
+    tensor : np.ndarray
+        (n, 5, 5) transition matrices, [institution, parent q, kid q]
+    par_shares : np.ndarray
+        (n, 5) parent income shares
+
+    Returns:
+    --------
+    np.ndarray
+        (n, 30) float64 features
+    """
+    tensor = np.asarray(tensor, dtype=np.float64)
+    return np.hstack([tensor.reshape(len(tensor), -1), np.asarray(par_shares, dtype=np.float64)])
+
+
+def _sq_distances(X, sq_norms, centroids):
+    """
+    Squared Euclidean distance of every row to every centroid, (n, k)
+    """
+    distances = sq_norms[:, None] - 2 * X @ centroids.T + (centroids ** 2).sum(axis=1)
+    return np.maximum(distances, 0)
+
+
+def kmeans_run(X, k, seed, max_iter=MAX_ITER, tol=TOL):
+    """
+    One k-means++ seeded Lloyd run
+
+    Parameters:
+    -----------
+    X : np.ndarray
+        (n, d) features
+    k : int
+        Number of clusters
+    seed : int
+        Seed of this restart
+
+    Returns:
+    --------
+    tuple
+        (inertia, labels (n,), centroids (k, d))
+    """
+    rng = np.random.default_rng(seed)
+    n = len(X)
+    sq_norms = (X ** 2).sum(axis=1)
+
+    # k-means++ seeding
+    centroids = np.empty((k, X.shape[1]))
+    centroids[0] = X[rng.integers(n)]
+    closest = _sq_distances(X, sq_norms, centroids[:1])[:, 0]
+    for j in range(1, k):
+        total = closest.sum()
+        pick = rng.choice(n, p=closest / total) if total > 0 else rng.integers(n)
+        centroids[j] = X[pick]
+        closest = np.minimum(closest, _sq_distances(X, sq_norms, centroids[j:j + 1])[:, 0])
+
+    for _ in range(max_iter):
+        distances = _sq_distances(X, sq_norms, centroids)
+        labels = distances.argmin(axis=1)
+        members = (labels[:, None] == np.arange(k)).astype(X.dtype)
+        counts = members.sum(axis=0)
+        sums = members.T @ X
+        updated = np.divide(sums, counts[:, None], out=centroids.copy(), where=counts[:, None] > 0)
+        # An emptied cluster restarts at the point farthest from its centroid
+        for j in np.flatnonzero(counts == 0):
+            updated[j] = X[distances[np.arange(n), labels].argmax()]
+        shift = ((updated - centroids) ** 2).sum()
+        centroids = updated
+        if shift <= tol:
+            break
+
+    distances = _sq_distances(X, sq_norms, centroids)
+    labels = distances.argmin(axis=1)
+    inertia = float(distances[np.arange(n), labels].sum())
+    return inertia, labels, centroids
+
+
+@profiled
+def kmeans(X, k, n_init=N_INIT, seed=0, workers=None):
+    """
+    Best of n_init k-means runs, restarts spread over a process pool
+
+    Each restart gets its own seed from seed, so the result does not
+    depend on the number of workers. Small inputs (fewer than
+    POOL_MIN_WORK distances per iteration) skip the pool.
+
+    Returns:
+    --------
+    tuple
+        (inertia, labels, centroids) of the run with the lowest inertia
+    """
+    X = np.ascontiguousarray(X, dtype=np.float64)
+    seeds = [int(s.generate_state(1)[0]) for s in np.random.SeedSequence(seed).spawn(n_init)]
+    if workers is None:
+        workers = WORKERS if len(X) * k >= POOL_MIN_WORK else 1
+    workers = min(workers, n_init)
+    if workers > 1:
+        # spawn: forking a threaded Streamlit server is not safe
+        with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            runs = list(pool.map(kmeans_run, [X] * n_init, [k] * n_init, seeds))
+    else:
+        runs = [kmeans_run(X, k, s) for s in seeds]
+    return min(runs, key=lambda run: run[0])
+
+
+def cluster_names(k):
+    """
+    Display label per cluster id
+    """
+    return {c: f"Cluster {c}" for c in range(1, k + 1)}
+
+
+@profiled
+def cluster_institutions(super_opeid, tensor, par_shares, tiers, k, n_init=N_INIT, seed=0):
+    """
+    Cluster institutions and describe the clusters
+
+    Parameters:
+    -----------
+    super_opeid : array-like
+        Institution ids (n,)
+    tensor : np.ndarray
+        (n, 5, 5) transition matrices
+    par_shares : np.ndarray
+        (n, 5) parent income shares
+    tiers : array-like
+        Tier id per institution, used to describe each cluster
+    k : int
+        Number of clusters
+
+    Returns:
+    --------
+    tuple
+        (pd.Series super_opeid -> cluster id 1..k,
+         pd.DataFrame centroid profile per cluster: colleges,
+         par_q1..par_q5, kq1..kq5_cond_parq1, q1_q4q5 and most common tier)
+    """
+    from utils.mobility_utils import TIER_NAMES
+
+    X = clustering_features(tensor, par_shares)
+    complete = ~np.isnan(X).any(axis=1)
+    if complete.sum() < k:
+        raise ValueError(f"need at least {k} institutions with complete data to form {k} clusters")
+    inertia, labels, centroids = kmeans(X[complete], k, n_init=n_init, seed=seed)
+
+    # Renumber by the centroid's Q1 -> Q4+Q5 rate, highest first
+    q1_q4q5 = centroids[:, 3] + centroids[:, 4]
+    order = np.argsort(-q1_q4q5, kind='stable')
+    rank = np.empty(k, dtype=int)
+    rank[order] = np.arange(1, k + 1)
+
+    ids = np.asarray(super_opeid)
+    assignments = pd.Series(rank[labels], index=pd.Index(ids[complete], name='super_opeid'), name='cluster')
+
+    tensor_cols = [f'kq{kq}_cond_parq{p}' for p in range(1, 6) for kq in range(1, 6)]
+    profile = pd.DataFrame(centroids[order], columns=tensor_cols + [f'par_q{p}' for p in range(1, 6)],
+                           index=pd.Index(np.arange(1, k + 1), name='cluster'))
+    profile = profile[PROFILE_COLUMNS].copy()
+    profile['q1_q4q5'] = q1_q4q5[order]
+    members = pd.DataFrame({'cluster': assignments.to_numpy(), 'tier': np.asarray(tiers)[complete]})
+    profile.insert(0, 'colleges', members.groupby('cluster').size().reindex(profile.index, fill_value=0))
+    profile['top_tier'] = (members.groupby('cluster')['tier']
+                           .agg(lambda t: TIER_NAMES.get(t.mode().iloc[0], f"Tier {t.mode().iloc[0]}"))
+                           .reindex(profile.index))
+    profile.attrs['inertia'] = inertia
+    return assignments, profile
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Precompute mobility clusters into the disk cache")
+    parser.add_argument("--k", type=int, nargs="+", default=[DEFAULT_K],
+                        help=f"cluster counts to compute ({K_RANGE.start}-{K_RANGE.stop - 1})")
+    args = parser.parse_args()
+
+    from utils.artifacts import mobility_clusters
+    for k in args.k:
+        assignments, profile = mobility_clusters(k)
+        print(f"k={k}: inertia {profile.attrs['inertia']:.3f}, "
+              f"sizes {profile['colleges'].tolist()}")
@@ -0,0 +1,179 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+from utils.profiling import profiled
+
+# table10 institutional covariates (identifiers and geography codes left out)
+COVARIATE_LABELS = {
+    'public': "Public",
+    'barrons': "Barron's selectivity",
+    'multi': "Multi-campus",
+    'hbcu': "HBCU",
+    'flagship': "Flagship",
+    'ipeds_enrollment_2013': "Enrollment (2013)",
+    'ipeds_enrollment_2000': "Enrollment (2000)",
+    'sticker_price_2013': "Sticker price (2013)",
+    'sticker_price_2000': "Sticker price (2000)",
+    'scorecard_netprice_2013': "Net price (2013)",
+    'grad_rate_150_p_2013': "Graduation rate (2013)",
+    'grad_rate_150_p_2002': "Graduation rate (2002)",
+    'sat_avg_2013': "Average SAT (2013)",
+    'sat_avg_2001': "Average SAT (2001)",
+    'scorecard_rej_rate_2013': "Rejection rate (2013)",
+    'scorecard_median_earnings_2011': "Median earnings (2011)",
+    'avgfacsal_2013': "Faculty salary (2013)",
+    'avgfacsal_2001': "Faculty salary (2001)",
+    'exp_instr_pc_2013': "Instruction spending per student (2013)",
+    'exp_instr_pc_2000': "Instruction spending per student (2000)",
+    'exp_instr_2012': "Instruction spending (2012)",
+    'exp_instr_2000': "Instruction spending (2000)",
+    'endowment_pc_2000': "Endowment per student (2000)",
+    'asian_or_pacific_share_fall_2000': "Asian / Pacific Islander share",
+    'black_share_fall_2000': "Black share",
+    'hisp_share_fall_2000': "Hispanic share",
+    'alien_share_fall_2000': "Non-resident alien share",
+    'pct_arthuman_2000': "Arts & humanities majors",
+    'pct_business_2000': "Business majors",
+    'pct_health_2000': "Health majors",
+    'pct_multidisci_2000': "Multidisciplinary majors",
+    'pct_publicsocial_2000': "Public & social service majors",
+    'pct_stem_2000': "STEM majors",
+    'pct_socialscience_2000': "Social science majors",
+    'pct_tradepersonal_2000': "Trade & personal service majors",
+}
+
+# Access outcomes that do not depend on the parent quintile
+ACCESS_OUTCOMES = {
+    'par_q1': "Parent Q1 share",
+    'mr_kq5_pq1': "Mobility rate (Q1 → Q5)",
+    'mr_ktop1_pq1': "Mobility rate (Q1 → top 1%)",
+}
+
+
+def outcome_labels(parent_quintile):
+    """
+    Mobility outcome columns of one parent quintile and their labels
+    """
+    p = parent_quintile
+    return {
+        f'q4q5_cond_parq{p}': f"P{p} → Q4+Q5",
+        f'kq5_cond_parq{p}': f"P{p} → Q5",
+        f'ktop1pc_cond_parq{p}': f"P{p} → top 1%",
+        f'k_rank_cond_parq{p}': f"P{p} mean rank",
+    }
+
+
+def outcome_columns(df):
+    """
+    Every mobility outcome: access metrics, then the per-quintile outcomes
+    for parent quintiles 1-5 (Q4+Q5 rates are derived from table2)
+
+    Returns:
+    --------
+    pd.DataFrame
+        One column per outcome, aligned with df
+    """
+    outcomes = {col: df[col] for col in ACCESS_OUTCOMES}
+    for p in range(1, 6):
+        outcomes[f'q4q5_cond_parq{p}'] = df[f'kq4_cond_parq{p}'] + df[f'kq5_cond_parq{p}']
+        for col in list(outcome_labels(p))[1:]:
+            outcomes[col] = df[col]
+    return pd.DataFrame(outcomes, index=df.index)
+
+
+def pairwise_pearson(X, Y):
+    """
+    Pearson correlation of every column of X with every column of Y over
+    the rows where both are present, as a handful of matrix products
+
+    Parameters:
+    -----------
+    X : np.ndarray
+        (n, a) values, NaN where missing
+    Y : np.ndarray
+        (n, b) values, NaN where missing
+
+    Returns:
+    --------
+    tuple
+        (r (a, b), n (a, b) pairwise observation counts); r is NaN where
+        fewer than 3 pairs or a column is constant over its pairs
+    """
+    X = np.asarray(X, dtype=np.float64)
+    Y = np.asarray(Y, dtype=np.float64)
+    mx = (~np.isnan(X)).astype(np.float64)
+    my = (~np.isnan(Y)).astype(np.float64)
+    # Centering on the column means keeps the sums below well conditioned
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)  # all-NaN columns
+        x = np.nan_to_num(X - np.nanmean(X, axis=0))
+        y = np.nan_to_num(Y - np.nanmean(Y, axis=0))
+
+    n = mx.T @ my
+    sx, sy = x.T @ my, mx.T @ y
+    sxx, syy = (x * x).T @ my, mx.T @ (y * y)
+    sxy = x.T @ y
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cov = sxy - sx * sy / n
+        var_x = sxx - sx * sx / n
+        var_y = syy - sy * sy / n
+        r = cov / np.sqrt(var_x * var_y)
+    r[(n < 3) | ~np.isfinite(r)] = np.nan
+    return np.clip(r, -1, 1), n.astype(np.int64)
+
+
+def pairwise_spearman(X, Y):
+    """
+    Spearman correlation of every column of X with every column of Y over
+    the rows where both are present
+
+    Ranks depend on which rows are compared, so columns of X are grouped by
+    their missing-value pattern and both sides are ranked once per pattern;
+    each group is then a single pairwise_pearson pass over the ranks. The
+    result is exact when Y is complete, as the table2 outcomes are.
+
+    Returns:
+    --------
+    tuple
+        (rho (a, b), n (a, b))
+    """
+    X = np.asarray(X, dtype=np.float64)
+    Y = np.asarray(Y, dtype=np.float64)
+    present = ~np.isnan(X)
+    patterns, pattern_of = np.unique(present.T, axis=0, return_inverse=True)
+
+    rho = np.full((X.shape[1], Y.shape[1]), np.nan)
+    n = np.zeros((X.shape[1], Y.shape[1]), dtype=np.int64)
+    for i, rows in enumerate(patterns):
+        cols = np.flatnonzero(pattern_of.ravel() == i)
+        x_ranks = pd.DataFrame(X[rows][:, cols]).rank().to_numpy()
+        y_ranks = pd.DataFrame(Y[rows]).rank().to_numpy()
+        rho[cols], n[cols] = pairwise_pearson(x_ranks, y_ranks)
+    return rho, n
+
+
+@profiled
+def covariate_correlations(covariates, outcomes):
+    """
+    Pearson and Spearman correlations between covariates and outcomes
+
+    Parameters:
+    -----------
+    covariates : pd.DataFrame
+        One column per institutional covariate
+    outcomes : pd.DataFrame
+        One column per mobility outcome, aligned with covariates
+
+    Returns:
+    --------
+    dict
+        'pearson', 'spearman' and 'n' DataFrames, covariates x outcomes
+    """
+    X = covariates.to_numpy(np.float64)
+    Y = outcomes.to_numpy(np.float64)
+    pearson, n = pairwise_pearson(X, Y)
+    spearman, _ = pairwise_spearman(X, Y)
+    frame = lambda values: pd.DataFrame(values, index=covariates.columns, columns=outcomes.columns)
+    return {'pearson': frame(pearson), 'spearman': frame(spearman), 'n': frame(n)}
@@ -0,0 +1,139 @@
+# utils/counterfactual.py
+"""
+Counterfactual enrollment reweighting.
+
+A scenario shifts the parent income shares (par_q1..par_q5) of every
+institution in some tiers by a number of percentage points; shares are then
+clipped at zero and renormalized. Each institution keeps its enrollment
+(`count`) and its transition matrix P(kid quintile | parent quintile), so
+the counterfactual student counts are
+
+    students[s, tier, p, k] = sum_i tier_i * count_i * shares'[s, i, p] * tensor[i, p, k]
+
+for all scenarios s at once: one einsum over the snapshot's transition
+tensor, fast enough to rerun on every slider change.
+"""
+import numpy as np
+import pandas as pd
+
+from utils.mobility_utils import TIER_NAMES
+from utils.profiling import profiled
+from utils.snapshot import shared_snapshot
+
+QUINTILES = range(1, 6)
+QUINTILE_LABELS = [f'Q{q}' for q in QUINTILES]
+
+_inputs_cache = {}
+
+
+def simulation_inputs():
+    """
+    Arrays the simulator needs, built once per snapshot version
+
+    Returns:
+    --------
+    dict
+        tensor (n, 5, 5), shares (n, 5), counts (n,), tier_index (n,) into
+        tiers, tiers (tier ids) and tier_names
+    """
+    snapshot = shared_snapshot()
+    if snapshot.version not in _inputs_cache:
+        df = snapshot.mobility_frame()
+        tensor = np.asarray(snapshot.tensor, dtype=np.float64)
+        shares = np.asarray(snapshot.par_shares, dtype=np.float64)
+        counts = df['count'].to_numpy(np.float64)
+        # Institutions with incomplete data carry no weight
+        complete = ~(np.isnan(tensor).any(axis=(1, 2)) | np.isnan(shares).any(axis=1) | np.isnan(counts))
+        tiers, tier_index = np.unique(df['tier'].to_numpy(), return_inverse=True)
+        _inputs_cache.clear()
+        _inputs_cache[snapshot.version] = {
+            'tensor': np.where(complete[:, None, None], np.nan_to_num(tensor), 0.0),
+            'shares': np.where(complete[:, None], np.nan_to_num(shares), 0.0),
+            'counts': np.where(complete, np.nan_to_num(counts), 0.0),
+            'tier_index': tier_index,
+            'tiers': tiers.tolist(),
+            'tier_names': [TIER_NAMES.get(t, f"Tier {t}") for t in tiers.tolist()],
+        }
+    return _inputs_cache[snapshot.version]
+
+
+def shifted_shares(shares, tier_index, shifts):
+    """
+    Parent shares after per-tier shifts, clipped at zero and renormalized
+
+    Parameters:
+    -----------
+    shares : np.ndarray
+        Baseline shares (n, 5)
+    tier_index : np.ndarray
+        Tier position of each institution (n,)
+    shifts : np.ndarray
+        Share shifts per scenario, tier and parent quintile (S, T, 5), in
+        share units (0.05 = 5 percentage points)
+
+    Returns:
+    --------
+    np.ndarray
+        Shares per scenario (S, n, 5)
+    """
+    shifted = np.clip(shares[None] + shifts[:, tier_index], 0, None)
+    totals = shifted.sum(axis=2, keepdims=True)
+    return np.divide(shifted, totals, out=np.zeros_like(shifted), where=totals > 0)
+
+
+@profiled
+def simulate(shifts):
+    """
+    Student counts by tier, parent quintile and kid quintile per scenario
+
+    Parameters:
+    -----------
+    shifts : np.ndarray
+        (S, T, 5) share shifts, tiers ordered as simulation_inputs()['tiers'];
+        an all-zero scenario reproduces the data
+
+    Returns:
+    --------
+    np.ndarray
+        (S, T, 5, 5) students: scenario, tier, parent quintile, kid quintile
+    """
+    inputs = simulation_inputs()
+    shifts = np.asarray(shifts, dtype=np.float64)
+    shares = shifted_shares(inputs['shares'], inputs['tier_index'], shifts)
+    membership = np.zeros((len(inputs['counts']), len(inputs['tiers'])))
+    membership[np.arange(len(inputs['counts'])), inputs['tier_index']] = inputs['counts']
+    return np.einsum('it,sip,ipk->stpk', membership, shares, inputs['tensor'], optimize=True)
+
+
+def outcome_tables(students, tier_names):
+    """
+    Tier and national outcomes of one scenario
+
+    Parameters:
+    -----------
+    students : np.ndarray
+        (T, 5, 5) students by tier, parent quintile and kid quintile
+    tier_names : list of str
+        Tier labels
+
+    Returns:
+    --------
+    pd.DataFrame
+        One row per tier plus 'All tiers': students, share of students
+        from Q1 families, kid quintile distribution (Q1..Q5), Q4+Q5 rate
+        of Q1 students and the number of Q1 students reaching Q5
+    """
+    rows = np.concatenate([students, students.sum(axis=0, keepdims=True)])
+    totals = rows.sum(axis=(1, 2))
+    q1_students = rows[:, 0, :].sum(axis=1)
+    kid_distribution = rows.sum(axis=1)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        table = pd.DataFrame({
+            'students': totals,
+            'q1_share': q1_students / totals,
+            **{f'kid_{label}': kid_distribution[:, k] / totals for k, label in enumerate(QUINTILE_LABELS)},
+            'q1_q4q5_rate': rows[:, 0, 3:].sum(axis=1) / q1_students,
+            'q1_to_q5_students': rows[:, 0, 4],
+        }, index=pd.Index(list(tier_names) + ['All tiers'], name='tier'))
+    return table
@@ -0,0 +1,184 @@
+# utils/disk_cache.py
+"""
+Disk-backed cache for derived artifacts (aggregate cubes, rankings, figures).
+
+Entries are keyed by the content version of the data snapshot, a hash of the
+source code of the producing module and the call arguments, so a restarted
+worker comes up warm and a data or code change never serves stale results.
+The cache directory is capped in size; least recently used entries are
+evicted first.
+"""
+import functools
+import hashlib
+import importlib
+import inspect
+import os
+import pickle
+import tempfile
+import threading
+from collections import defaultdict
+
+CACHE_DIR = os.environ.get("SEMD_CACHE_DIR", os.path.join(".cache", "derived"))
+CACHE_MAX_BYTES = int(os.environ.get("SEMD_CACHE_MAX_BYTES", 256 * 1024 * 1024))
+
+_stats = defaultdict(lambda: {"hits": 0, "misses": 0, "evictions": 0})
+_stats_lock = threading.Lock()
+
+
+def _count(kind, stat, n=1):
+    with _stats_lock:
+        _stats[kind][stat] += n
+
+
+def cache_stats():
+    """
+    Hit, miss and eviction counters per artifact kind since process start
+    """
+    with _stats_lock:
+        return {kind: dict(stats) for kind, stats in _stats.items()}
+
+
+def data_version(groups=None, snapshot=None):
+    """
+    Content version of the current (or given) data snapshot, or of some of
+    its artifact groups only
+    """
+    if snapshot is None:
+        from utils.snapshot import shared_snapshot
+        snapshot = shared_snapshot()
+    return snapshot.version if groups is None else snapshot.group_version(*groups)
+
+
+@functools.lru_cache(maxsize=None)
+def _module_hash(module_name):
+    """
+    Hash of a module's source, used as its code version
+    """
+    module = importlib.import_module(module_name)
+    try:
+        source = inspect.getsource(module)
+    except (OSError, TypeError):
+        source = module_name
+    return hashlib.sha256(source.encode()).hexdigest()[:16]
+
+
+def code_version(modules):
+    """
+    Combined source hash of the given modules
+    """
+    return "-".join(_module_hash(m) for m in modules)
+
+
+def _serialize(value, fmt):
+    if fmt == "plotly":
+        return value.to_json().encode()
+    return pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def _deserialize(payload, fmt):
+    if fmt == "plotly":
+        import plotly.io as pio
+        return pio.from_json(payload.decode())
+    return pickle.loads(payload)
+
+
+def _evict(cache_dir, max_bytes):
+    """
+    Remove least recently used entries until the cache fits in max_bytes
+    """
+    entries = []
+    for name in os.listdir(cache_dir):
+        if not name.endswith(".bin"):
+            continue
+        path = os.path.join(cache_dir, name)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+            _count(os.path.basename(path).split("-", 1)[0], "evictions")
+        except FileNotFoundError:
+            pass
+        total -= size
+
+
+def disk_cached(kind, fmt="pickle", depends_on=(), data=None):
+    """
+    Cache a function's result on disk across restarts
+
+    Arguments must have stable reprs (numbers, strings, tuples); pass data
+    through the snapshot rather than as DataFrame arguments.
+
+    Parameters:
+    -----------
+    kind : str
+        Artifact namespace, e.g. "cube", "ranking" or "figure"
+    fmt : str
+        "pickle" for frames and arrays, "plotly" to store figures as JSON
+    depends_on : iterable of str
+        Extra modules whose source changes should invalidate the entries
+    data : iterable of str, optional
+        Snapshot artifact groups the function reads (e.g. ("mobility",));
+        entries then survive changes to unrelated data files. Defaults to
+        the whole snapshot.
+    """
+    def decorator(func):
+        modules = (func.__module__,) + tuple(depends_on)
+        groups = tuple(data) if data is not None else None
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            from utils.snapshot import pinned_snapshot
+            # Key and result from the same snapshot, even across a hot swap
+            with pinned_snapshot() as snapshot:
+                return _cached_call(snapshot, args, kwargs)
+
+        def _cached_call(snapshot, args, kwargs):
+            key_source = repr((kind, func.__qualname__, code_version(modules),
+                               data_version(groups, snapshot), args, sorted(kwargs.items())))
+            key = hashlib.sha256(key_source.encode()).hexdigest()
+            path = os.path.join(CACHE_DIR, f"{kind}-{key}.bin")
+
+            try:
+                with open(path, "rb") as f:
+                    value = _deserialize(f.read(), fmt)
+                os.utime(path)  # mark as recently used
+                _count(kind, "hits")
+                return value
+            except FileNotFoundError:
+                pass
+            except Exception:
+                # Corrupt or incompatible entry; recompute and overwrite
+                pass
+
+            _count(kind, "misses")
+            value = func(*args, **kwargs)
+
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(prefix=".tmp-", dir=CACHE_DIR)
+            with os.fdopen(fd, "wb") as f:
+                f.write(_serialize(value, fmt))
+            os.replace(tmp_path, path)
+            _evict(CACHE_DIR, CACHE_MAX_BYTES)
+            return value
+
+        return wrapper
+    return decorator
+
+
+def clear_disk_cache():
+    """
+    Remove every cached artifact
+    """
+    if not os.path.isdir(CACHE_DIR):
+        return
+    for name in os.listdir(CACHE_DIR):
+        if name.endswith(".bin"):
+            os.remove(os.path.join(CACHE_DIR, name))
@@ -0,0 +1,45 @@
+import pandas as pd
+from utils.profiling import profiled
+
+QUINTILE_COLS = [f'par_q{i}' for i in range(1, 6)]
+TOP_COLS = ['par_top1pc', 'par_toppt1pc']
+
+@profiled
+def enrollment_by_tier(df, group_col='tier'):
+    """
+    Mean parent income distribution and institution count for every tier
+
+    Parameters:
+    -----------
+    df : pd.DataFrame
+        Mobility dataset with par_q1..par_q5, par_top1pc and par_toppt1pc
+    group_col : str
+        Column to group by, e.g. 'tier' or 'cluster'
+
+    Returns:
+    --------
+    pd.DataFrame
+        One row per group with mean shares (as fractions) and n_institutions
+    """
+    grouped = df.groupby(group_col)
+    cube = grouped[QUINTILE_COLS + TOP_COLS].mean()
+    cube['n_institutions'] = grouped.size()
+    return cube
+
+def enrollment_distribution(cube_row):
+    """
+    Percentages and cumulative quintile percentages for one tier
+
+    Parameters:
+    -----------
+    cube_row : pd.Series
+        Row of enrollment_by_tier output
+    """
+    quintiles = [cube_row[col] * 100 for col in QUINTILE_COLS]
+    top_pcts = [cube_row[col] * 100 for col in TOP_COLS]
+    cumulative = pd.Series(quintiles).cumsum().tolist()
+    return {
+        'quintiles': quintiles,
+        'top_pcts': top_pcts,
+        'cumulative': cumulative
+    }
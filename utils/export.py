@@ -0,0 +1,136 @@
+# utils/export.py
+"""
+Chunked CSV and Parquet export of result tables.
+
+iter_csv() and iter_parquet() encode a frame EXPORT_CHUNK_ROWS rows at a
+time (one Parquet row group per chunk). st.download_button (Streamlit 1.40)
+takes bytes rather than a generator, so export_bytes() joins the chunks and
+the whole payload is held in memory while the button is rendered; views
+build it only when a download is requested (views.export).
+
+Parquet needs pyarrow, which is optional; available_formats() only lists
+it when pyarrow is installed.
+"""
+import io
+
+import numpy as np
+import pandas as pd
+
+from utils.snapshot import shared_snapshot
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet export is unavailable without pyarrow
+    pa = pq = None
+
+EXPORT_CHUNK_ROWS = 10_000
+
+# Format -> (file extension, MIME type)
+EXPORT_FORMATS = {
+    "CSV": ("csv", "text/csv"),
+    "Parquet": ("parquet", "application/vnd.apache.parquet"),
+}
+
+
+def available_formats():
+    """
+    Export formats usable in this environment
+    """
+    return [fmt for fmt in EXPORT_FORMATS if fmt != "Parquet" or pq is not None]
+
+
+def cost_column_options():
+    """
+    Numeric table10 columns that can be appended to an export
+    """
+    return list(shared_snapshot().meta["cost_aligned_columns"])
+
+
+def with_cost_columns(df, columns):
+    """
+    Append table10 columns to a result table by super_opeid
+
+    Parameters:
+    -----------
+    df : pd.DataFrame
+        Result rows with a super_opeid column
+    columns : list of str
+        Names from cost_column_options()
+
+    Returns:
+    --------
+    pd.DataFrame
+        df with the requested columns added (NaN where unmatched)
+    """
+    if not columns:
+        return df
+    snapshot = shared_snapshot()
+    rows = pd.Index(snapshot.super_opeid).get_indexer(df['super_opeid'])
+    matched = rows >= 0
+    added = {
+        col: np.where(matched, values[rows], np.nan)
+        for col, values in snapshot.cost_columns(columns).items()
+        if col not in df.columns
+    }
+    return df.assign(**added)
+
+
+def iter_csv(df, chunk_rows=EXPORT_CHUNK_ROWS):
+    """
+    Yield df as UTF-8 CSV bytes: the header, then one piece per chunk of rows
+    """
+    yield df.iloc[:0].to_csv(index=False).encode()
+    for start in range(0, len(df), chunk_rows):
+        yield df.iloc[start:start + chunk_rows].to_csv(index=False, header=False).encode()
+
+
+class _ChunkSink(io.RawIOBase):
+    """
+    Write-only file that hands its bytes back after every row group
+    """
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def drain(self):
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def iter_parquet(df, chunk_rows=EXPORT_CHUNK_ROWS):
+    """
+    Yield df as Parquet bytes, one row group per chunk of rows, then the footer
+    """
+    if pq is None:
+        raise ImportError("Parquet export requires pyarrow")
+    schema = pa.Schema.from_pandas(df, preserve_index=False)
+    sink = _ChunkSink()
+    with pq.ParquetWriter(sink, schema) as writer:
+        for start in range(0, len(df), chunk_rows):
+            chunk = df.iloc[start:start + chunk_rows]
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+            yield sink.drain()
+    yield sink.drain()
+
+
+def export_bytes(df, fmt="CSV", chunk_rows=EXPORT_CHUNK_ROWS):
+    """
+    Encoded export of df in one of EXPORT_FORMATS, built chunk by chunk
+    """
+    chunks = iter_parquet(df, chunk_rows) if fmt == "Parquet" else iter_csv(df, chunk_rows)
+    return b"".join(chunks)
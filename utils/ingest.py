@@ -0,0 +1,239 @@
+# utils/ingest.py
+"""
+Streaming ingest for large Opportunity Insights tables (cohort-level and
+longitudinal files).
+
+Files are read with pd.read_csv(chunksize=...) and never held in memory:
+
+- compile_table() makes two passes. The first plans compact dtypes that are
+  valid for every chunk (utils.schema.plan_dtypes). The second filters each
+  chunk to four-year colleges and appends it to per-dtype spool files on
+  disk. The spools are then transposed through memory maps into the
+  snapshot's column-major layout.
+- pool_cohorts() folds a cohort-by-year table into one row per institution.
+  Values are count-weighted across cohorts; conditional columns
+  (*_cond_parq{p}) are weighted by count * par_q{p}. Medians are
+  approximated by their weighted mean.
+
+build_snapshot() compiles a cohort file found in the data directory
+automatically. To turn a cohort file into a table2-shaped CSV instead:
+
+    python -m utils.ingest pool data/mrc_table2_by_cohort.csv --out pooled.csv
+"""
+import argparse
+import os
+import re
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from utils.schema import category_code_dtype, plan_dtypes
+
+# Peak memory is roughly 3 KB per chunk row for table2-shaped files
+DEFAULT_CHUNKSIZE = 50_000
+
+# Columns that describe the institution and do not vary across cohorts
+DESCRIPTOR_COLUMNS = ['name', 'type', 'tier', 'tier_name', 'iclevel', 'region',
+                      'state', 'cz', 'czname', 'cfips', 'county', 'multi']
+
+CONDITIONAL_PATTERN = re.compile(r'_cond_parq(\d)$')
+
+
+def iter_chunks(path, chunksize=DEFAULT_CHUNKSIZE, iclevel=1):
+    """
+    Yield chunks of a CSV, keeping only rows with the given iclevel (None keeps all)
+    """
+    for chunk in pd.read_csv(path, chunksize=chunksize, low_memory=False):
+        if iclevel is not None:
+            chunk = chunk[chunk['iclevel'] == iclevel]
+        yield chunk
+
+
+def _encode(series, mapping):
+    """
+    Category codes of a chunk, extending mapping with unseen values
+    """
+    for value in pd.unique(series.dropna()):
+        if value not in mapping:
+            mapping[value] = len(mapping)
+    return series.map(mapping).fillna(-1).to_numpy(np.int32)
+
+
+def _transpose_spool(src, dst, dtype, n_rows, n_cols, block):
+    """
+    Row-major spool file -> column-major .npy, one block of rows at a time
+    """
+    out = np.lib.format.open_memmap(dst, mode="w+", dtype=dtype, shape=(n_cols, n_rows))
+    if n_rows:
+        raw = np.memmap(src, dtype=dtype, mode="r", shape=(n_rows, n_cols))
+        for start in range(0, n_rows, block):
+            out[:, start:start + block] = raw[start:start + block].T
+        del raw
+    out.flush()
+    del out
+
+
+def _write_codes(src, dst, mapping, n_rows, block):
+    """
+    Spooled int32 codes -> .npy with sorted categories and the narrowest code type
+
+    Returns:
+    --------
+    list
+        Sorted categories
+    """
+    categories = sorted(mapping, key=str)
+    remap = np.empty(len(categories) + 1, dtype=np.int64)
+    remap[-1] = -1  # missing values keep code -1
+    for new_code, value in enumerate(categories):
+        remap[mapping[value]] = new_code
+
+    dtype = category_code_dtype(len(categories))
+    out = np.lib.format.open_memmap(dst, mode="w+", dtype=dtype, shape=(n_rows,))
+    if n_rows:
+        codes = np.memmap(src, dtype=np.int32, mode="r", shape=(n_rows,))
+        for start in range(0, n_rows, block):
+            out[start:start + block] = remap[codes[start:start + block]]
+        del codes
+    out.flush()
+    del out
+    return categories
+
+
+def compile_table(path, prefix, out_dir, meta, chunksize=DEFAULT_CHUNKSIZE, iclevel=1):
+    """
+    Stream a CSV into the snapshot layout (one block per dtype plus codes)
+
+    Parameters:
+    -----------
+    path : str
+        Source CSV
+    prefix : str
+        Table name inside the snapshot, e.g. "cohort"
+    out_dir : str
+        Snapshot directory being built
+    meta : dict
+        Snapshot metadata; meta[prefix] is filled in
+    chunksize : int
+        Rows read per chunk
+    iclevel : int or None
+        Keep only rows with this iclevel (None keeps all)
+
+    Returns:
+    --------
+    int
+        Number of rows compiled
+    """
+    plan = plan_dtypes(iter_chunks(path, chunksize, iclevel))
+    blocks = {}
+    for col, dtype in plan.items():
+        if dtype != 'category':
+            blocks.setdefault(dtype, []).append(col)
+    str_cols = [col for col, dtype in plan.items() if dtype == 'category']
+
+    spool_dir = tempfile.mkdtemp(prefix=f".spool-{prefix}-", dir=out_dir)
+    mappings = {col: {} for col in str_cols}
+    n_rows = 0
+    try:
+        spools = {dtype: open(os.path.join(spool_dir, f"{dtype}.bin"), "wb") for dtype in blocks}
+        code_spools = {col: open(os.path.join(spool_dir, f"codes-{i}.bin"), "wb")
+                       for i, col in enumerate(str_cols)}
+        try:
+            for chunk in iter_chunks(path, chunksize, iclevel):
+                for dtype, cols in blocks.items():
+                    chunk[cols].to_numpy(dtype).tofile(spools[dtype])
+                for col in str_cols:
+                    _encode(chunk[col], mappings[col]).tofile(code_spools[col])
+                n_rows += len(chunk)
+        finally:
+            for f in list(spools.values()) + list(code_spools.values()):
+                f.close()
+
+        for dtype, cols in blocks.items():
+            _transpose_spool(os.path.join(spool_dir, f"{dtype}.bin"),
+                             os.path.join(out_dir, f"{prefix}_{dtype}.npy"),
+                             dtype, n_rows, len(cols), chunksize)
+        categories = {}
+        for i, col in enumerate(str_cols):
+            categories[col] = _write_codes(os.path.join(spool_dir, f"codes-{i}.bin"),
+                                           os.path.join(out_dir, f"{prefix}_codes_{col}.npy"),
+                                           mappings[col], n_rows, chunksize)
+    finally:
+        shutil.rmtree(spool_dir, ignore_errors=True)
+
+    meta[prefix] = {
+        "columns": list(plan),
+        "blocks": blocks,
+        "str_columns": str_cols,
+        "categories": categories,
+        "rows": n_rows,
+    }
+    return n_rows
+
+
+def _weights(chunk, col):
+    match = CONDITIONAL_PATTERN.search(col)
+    if match and f'par_q{match.group(1)}' in chunk.columns:
+        return chunk['count'] * chunk[f'par_q{match.group(1)}']
+    return chunk['count']
+
+
+def pool_cohorts(path, chunksize=DEFAULT_CHUNKSIZE, iclevel=1):
+    """
+    Pool a cohort-by-year table into one row per institution, streaming
+
+    Returns:
+    --------
+    pd.DataFrame
+        table2-shaped frame (no cohort column); count is the mean count per cohort
+    """
+    columns = None
+    sums = None
+    descriptors = None
+    for chunk in iter_chunks(path, chunksize, iclevel):
+        if columns is None:
+            columns = [c for c in chunk.columns if c != 'cohort']
+        keys = chunk['super_opeid']
+        value_cols = [c for c in columns
+                      if c not in DESCRIPTOR_COLUMNS and c not in ('super_opeid', 'count')]
+
+        parts = {'count': chunk['count'], 'n_cohorts': pd.Series(1, index=chunk.index)}
+        for col in value_cols:
+            values = chunk[col]
+            weights = _weights(chunk, col).where(values.notna(), 0)
+            parts[f'num:{col}'] = (values * weights).fillna(0)
+            parts[f'den:{col}'] = weights
+        partial = pd.DataFrame(parts).groupby(keys).sum()
+        sums = partial if sums is None else sums.add(partial, fill_value=0)
+
+        first = chunk[['super_opeid'] + [c for c in DESCRIPTOR_COLUMNS if c in chunk.columns]]
+        first = first.groupby('super_opeid').first()
+        descriptors = first if descriptors is None else descriptors.combine_first(first)
+
+    if sums is None:
+        return pd.DataFrame(columns=columns)
+
+    pooled = {'count': sums['count'] / sums['n_cohorts']}
+    for col in value_cols:
+        with np.errstate(divide='ignore', invalid='ignore'):
+            pooled[col] = sums[f'num:{col}'] / sums[f'den:{col}'].replace(0, np.nan)
+    result = descriptors.join(pd.DataFrame(pooled))
+    return result.reset_index()[columns]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Streaming ingest of large Opportunity Insights tables")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    pool = subparsers.add_parser("pool", help="Pool a cohort-by-year table into a table2-shaped CSV")
+    pool.add_argument("path", help="Cohort-level CSV")
+    pool.add_argument("--out", required=True, help="Output CSV")
+    pool.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE)
+    pool.add_argument("--all-levels", action="store_true",
+                      help="Keep every iclevel instead of four-year colleges only")
+    args = parser.parse_args()
+
+    pooled = pool_cohorts(args.path, args.chunksize, None if args.all_levels else 1)
+    pooled.to_csv(args.out, index=False)
+    print(f"{args.out}: {len(pooled):,} institutions")
@@ -0,0 +1,260 @@
+# utils/memory.py
+"""
+Memory accounting for cached objects, session state and per-view peaks.
+
+deep_sizeof() walks an object graph and splits its size into heap bytes and
+bytes that live in the memory-mapped snapshot (shared by every worker, so
+they do not count against one worker's private memory). Arrays that are
+views of other arrays are counted once, at their base.
+
+Run as a script for a report of this process's caches, optionally after
+rendering every view with tracemalloc on:
+
+    python -m utils.memory --views --json memory_report.json
+"""
+import argparse
+import json
+import mmap
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+MAX_DEPTH = 64
+
+
+def _is_mapped(array):
+    base = array
+    while base is not None:
+        if isinstance(base, (np.memmap, mmap.mmap)):
+            return True
+        base = getattr(base, "base", None)
+    return False
+
+
+def deep_sizeof(obj):
+    """
+    Deep size of an object
+
+    Returns:
+    --------
+    tuple of int
+        (heap_bytes, mapped_bytes)
+    """
+    sizes = [0, 0]
+    _accumulate(obj, sizes, {}, 0)
+    return sizes[0], sizes[1]
+
+
+def _accumulate(obj, sizes, seen, depth):
+    if id(obj) in seen or depth > MAX_DEPTH:
+        return
+    # Keep visited objects alive: temporaries (e.g. column.array) could
+    # otherwise be freed and their ids reused by later objects
+    seen[id(obj)] = obj
+
+    if isinstance(obj, np.ndarray):
+        if _is_mapped(obj):
+            sizes[1] += obj.nbytes
+        elif isinstance(obj.base, np.ndarray):
+            _accumulate(obj.base, sizes, seen, depth + 1)
+        else:
+            sizes[0] += obj.nbytes
+            if obj.dtype == object:
+                for item in obj.ravel():
+                    _accumulate(item, sizes, seen, depth + 1)
+    elif isinstance(obj, pd.DataFrame):
+        for _, column in obj.items():
+            _accumulate(column.array, sizes, seen, depth + 1)
+        _accumulate(obj.index, sizes, seen, depth + 1)
+    elif isinstance(obj, pd.Series):
+        _accumulate(obj.array, sizes, seen, depth + 1)
+        _accumulate(obj.index, sizes, seen, depth + 1)
+    elif isinstance(obj, pd.Categorical):
+        _accumulate(obj.codes, sizes, seen, depth + 1)
+        _accumulate(obj.categories, sizes, seen, depth + 1)
+    elif isinstance(obj, pd.RangeIndex):
+        sizes[0] += obj.memory_usage()
+    elif isinstance(obj, (pd.Index, pd.api.extensions.ExtensionArray)):
+        values = obj.to_numpy() if isinstance(obj, pd.Index) else getattr(obj, "_ndarray", None)
+        if values is not None:
+            _accumulate(values, sizes, seen, depth + 1)
+        else:
+            sizes[0] += obj.nbytes
+    elif isinstance(obj, dict):
+        sizes[0] += sys.getsizeof(obj)
+        for key, value in obj.items():
+            _accumulate(key, sizes, seen, depth + 1)
+            _accumulate(value, sizes, seen, depth + 1)
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        sizes[0] += sys.getsizeof(obj)
+        for item in obj:
+            _accumulate(item, sizes, seen, depth + 1)
+    elif isinstance(obj, (str, bytes, bytearray, int, float, bool, type(None))):
+        sizes[0] += sys.getsizeof(obj)
+    else:
+        sizes[0] += sys.getsizeof(obj)
+        attributes = getattr(obj, "__dict__", None)
+        if attributes is not None:
+            _accumulate(attributes, sizes, seen, depth + 1)
+
+
+def cache_entries():
+    """
+    Size of every cache held by this process (and the on-disk artifact cache)
+
+    Returns:
+    --------
+    list of dict
+        cache, entry, location ("heap", "mapped" or "disk") and bytes
+    """
+    entries = []
+
+    snapshot = sys.modules.get("utils.snapshot")
+    if snapshot is not None:
+        stats = snapshot.snapshot_stats()
+        if stats["mapped_bytes"]:
+            entries.append({"cache": "snapshot", "entry": "shared_snapshot",
+                            "location": "mapped", "bytes": stats["mapped_bytes"]})
+
+    # st.cache_data / st.cache_resource entries, if any function uses them
+    try:
+        from streamlit.runtime.caching.cache_data_api import _data_caches
+        from streamlit.runtime.caching.cache_resource_api import _resource_caches
+        for caches in (_data_caches, _resource_caches):
+            for stat in caches.get_stats():
+                entries.append({"cache": stat.category_name, "entry": stat.cache_name,
+                                "location": "heap", "bytes": stat.byte_length})
+    except (ImportError, AttributeError):
+        pass
+
+    # Entries left by earlier runs count too, so read the directory even if
+    # this process has not used the disk cache yet
+    from utils import disk_cache
+    if os.path.isdir(disk_cache.CACHE_DIR):
+        by_kind = {}
+        for name in os.listdir(disk_cache.CACHE_DIR):
+            if name.endswith(".bin"):
+                kind = name.split("-", 1)[0]
+                size = os.path.getsize(os.path.join(disk_cache.CACHE_DIR, name))
+                count, total = by_kind.get(kind, (0, 0))
+                by_kind[kind] = (count + 1, total + size)
+        for kind, (count, total) in sorted(by_kind.items()):
+            entries.append({"cache": "disk_cache", "entry": f"{kind} ({count} files)",
+                            "location": "disk", "bytes": total})
+    return entries
+
+
+def session_state_sizes(state):
+    """
+    Deep size of every session state value, largest first
+
+    Parameters:
+    -----------
+    state : mapping
+        e.g. st.session_state.to_dict()
+    """
+    rows = []
+    for key, value in state.items():
+        heap, mapped = deep_sizeof(value)
+        rows.append({"key": str(key), "type": type(value).__name__,
+                     "heap_bytes": heap, "mapped_bytes": mapped})
+    return sorted(rows, key=lambda r: r["heap_bytes"], reverse=True)
+
+
+def memory_report(state=None):
+    """
+    Caches, session state (if given) and traced per-view peaks as one dict
+    """
+    from utils.profiling import view_memory_stats
+    from utils.metrics import resident_bytes
+
+    return {
+        "resident_bytes": resident_bytes(),
+        "caches": cache_entries(),
+        "session_state": session_state_sizes(state) if state is not None else [],
+        "views": view_memory_stats(),
+    }
+
+
+# Widget types whose keyless values are named by their label
+WIDGET_KINDS = ("selectbox", "multiselect", "radio", "slider", "select_slider", "checkbox",
+                "toggle", "number_input", "text_input", "text_area", "button")
+
+
+def _full_state(at):
+    """
+    Every session state value of an AppTest session, including keyless
+    widgets (filtered_state leaves those out); keyed widgets by their key
+    """
+    state = at.session_state._state
+    names = dict(state._key_id_mapper.id_key_mapping)
+    for kind in WIDGET_KINDS:
+        for widget in at.get(kind):
+            names.setdefault(widget.id, f"{kind}: {widget.label}")
+    values = {}
+    for key in state._keys():
+        if key.startswith("$$STREAMLIT_INTERNAL"):
+            continue
+        try:
+            values[names.get(key, key)] = state[key]
+        except KeyError:
+            pass  # value of a widget that is no longer rendered
+    return values
+
+
+def _sweep_views():
+    """
+    Render every category/analysis once with tracemalloc on; returns the
+    session state values seen along the way, widget values included
+    """
+    from streamlit.testing.v1 import AppTest
+    from app import NAV_STRUCTURE
+
+    os.environ["SEMD_MEMTRACE"] = "1"
+    at = AppTest.from_file("app.py", default_timeout=120)
+    at.run()
+    state = {}
+    for category, groups in NAV_STRUCTURE.items():
+        at.sidebar.selectbox[0].set_value(category).run()
+        for analyses in groups.values():
+            for analysis in analyses:
+                at.sidebar.selectbox[2].set_value(analysis).run()
+                state.update(_full_state(at))
+    return state
+
+
+def _mib(n):
+    return f"{n / 2**20:10.2f} MiB"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Report memory held by caches and views")
+    parser.add_argument("--views", action="store_true",
+                        help="Render every view with tracemalloc first and report per-view peaks")
+    parser.add_argument("--json", metavar="PATH", help="Also write the report as JSON")
+    args = parser.parse_args()
+
+    from utils.snapshot import shared_snapshot
+    shared_snapshot()
+    state = _sweep_views() if args.views else None
+    report = memory_report(state)
+
+    print(f"Resident set size: {_mib(report['resident_bytes'])}\n")
+    print("Caches:")
+    for entry in report["caches"]:
+        print(f"  {entry['cache']:20s} {entry['entry']:40s} {entry['location']:7s} {_mib(entry['bytes'])}")
+    if report["session_state"]:
+        print("\nSession state:")
+        for row in report["session_state"]:
+            print(f"  {row['key']:40s} {row['type']:20s} {_mib(row['heap_bytes'])}")
+    if report["views"]:
+        print("\nTraced peak per view:")
+        for view, stats in sorted(report["views"].items(), key=lambda kv: -kv[1]["max_peak_bytes"]):
+            approximate = f", {stats['approximate_reruns']} approximate" if stats["approximate_reruns"] else ""
+            print(f"  {view:62s} {_mib(stats['max_peak_bytes'])}  ({stats['reruns']} reruns{approximate})")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2, default=str)
@@ -0,0 +1,296 @@
+# utils/metrics.py
+"""
+Process metrics in Prometheus text exposition format.
+
+Counters and histograms are updated in-process (e.g. rerun latency per
+view); cache and dataset figures are pulled from their modules at scrape
+time. Export is opt-in per worker:
+
+    SEMD_METRICS_PORT=9101            serve /metrics on 127.0.0.1:9101
+    SEMD_METRICS_FILE=metrics-{pid}.prom
+                                      rewrite the file every
+                                      SEMD_METRICS_INTERVAL seconds (default 15)
+
+With several workers, give each its own port or use {pid} in the file name.
+"""
+import os
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+SESSION_TTL_SECONDS = 300
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_lock = threading.Lock()
+_metrics = {}
+_sessions = {}
+_exporter_started = False
+
+
+def _label_str(labels):
+    if not labels:
+        return ""
+    pairs = []
+    for key, value in sorted(labels.items()):
+        value = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        pairs.append(f'{key}="{value}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+class Counter:
+    """
+    Monotonically increasing counter, optionally labelled
+    """
+    kind = "counter"
+
+    def __init__(self, name, help_text):
+        self.name = name
+        self.help = help_text
+        self._values = {}
+
+    def inc(self, amount=1, **labels):
+        key = tuple(sorted(labels.items()))
+        with _lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self):
+        with _lock:
+            return [(self.name, dict(key), value) for key, value in self._values.items()]
+
+
+class Histogram:
+    """
+    Cumulative-bucket histogram, optionally labelled
+    """
+    kind = "histogram"
+
+    def __init__(self, name, help_text, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.buckets = tuple(buckets)
+        self._values = {}
+
+    def observe(self, value, **labels):
+        key = tuple(sorted(labels.items()))
+        with _lock:
+            if key not in self._values:
+                self._values[key] = {"buckets": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+            entry = self._values[key]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    entry["buckets"][i] += 1
+            entry["sum"] += value
+            entry["count"] += 1
+
+    def samples(self):
+        samples = []
+        with _lock:
+            for key, entry in self._values.items():
+                labels = dict(key)
+                for bound, bucket_count in zip(self.buckets, entry["buckets"]):
+                    samples.append((f"{self.name}_bucket", {**labels, "le": bound}, bucket_count))
+                samples.append((f"{self.name}_bucket", {**labels, "le": "+Inf"}, entry["count"]))
+                samples.append((f"{self.name}_sum", labels, entry["sum"]))
+                samples.append((f"{self.name}_count", labels, entry["count"]))
+        return samples
+
+
+def counter(name, help_text):
+    """
+    Get or create a registered counter
+    """
+    with _lock:
+        if name not in _metrics:
+            _metrics[name] = Counter(name, help_text)
+        return _metrics[name]
+
+
+def histogram(name, help_text, buckets=DEFAULT_BUCKETS):
+    """
+    Get or create a registered histogram
+    """
+    with _lock:
+        if name not in _metrics:
+            _metrics[name] = Histogram(name, help_text, buckets)
+        return _metrics[name]
+
+
+RERUN_SECONDS = histogram("semd_rerun_seconds", "Script rerun wall time by view")
+RERUN_ERRORS = counter("semd_rerun_errors_total", "Reruns that raised an exception by view")
+
+
+def observe_rerun(view, seconds, error=False):
+    """
+    Record the latency of one rerun of a view
+    """
+    RERUN_SECONDS.observe(seconds, view=view)
+    if error:
+        RERUN_ERRORS.inc(view=view)
+
+
+def _prune_sessions(now):
+    """
+    Forget sessions idle for SESSION_TTL_SECONDS; call with _lock held
+    """
+    cutoff = now - SESSION_TTL_SECONDS
+    for session_id in [s for s, seen in _sessions.items() if seen < cutoff]:
+        del _sessions[session_id]
+
+
+def mark_session_active(session_id):
+    """
+    Note that a session ran a rerun; sessions idle for SESSION_TTL_SECONDS
+    no longer count as active and are dropped here too, so the map stays
+    bounded even if /metrics is never scraped
+    """
+    now = time.time()
+    with _lock:
+        _sessions[session_id] = now
+        _prune_sessions(now)
+
+
+def active_sessions():
+    with _lock:
+        _prune_sessions(time.time())
+        return len(_sessions)
+
+
+def resident_bytes():
+    """
+    Resident set size of this process (Linux), or 0 if unavailable
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+def _collected():
+    """
+    Gauges and counters pulled from other modules at scrape time. Modules
+    that were never imported by this worker are skipped.
+    """
+    families = [
+        ("semd_active_sessions", "gauge", "Sessions with a rerun in the last 5 minutes",
+         [({}, active_sessions())]),
+        ("semd_process_resident_bytes", "gauge", "Resident set size of this worker",
+         [({}, resident_bytes())]),
+    ]
+
+    cache_samples = {"hits": [], "misses": [], "evictions": []}
+    snapshot = sys.modules.get("utils.snapshot")
+    if snapshot is not None:
+        stats = snapshot.snapshot_stats()
+        families.append(("semd_dataset_mapped_bytes", "gauge",
+                         "Size of the memory-mapped dataset snapshot", [({}, stats["mapped_bytes"])]))
+        cache_samples["hits"].append(({"cache": "loader"}, stats["hits"]))
+        cache_samples["misses"].append(({"cache": "loader"}, stats["misses"]))
+        families.append(("semd_dataset_swaps_total", "counter",
+                         "Snapshot swaps after data file changes", [({}, stats["swaps"])]))
+
+    disk_cache = sys.modules.get("utils.disk_cache")
+    if disk_cache is not None:
+        for kind, stats in disk_cache.cache_stats().items():
+            for stat, value in stats.items():
+                cache_samples[stat].append(({"cache": kind}, value))
+
+    for stat, samples in cache_samples.items():
+        families.append((f"semd_cache_{stat}_total", "counter", f"Cache {stat} by cache", samples))
+
+    singleflight = sys.modules.get("utils.singleflight")
+    if singleflight is not None:
+        stats = singleflight.singleflight_stats()
+        families.append(("semd_singleflight_deduplicated_total", "counter",
+                         "Calls served by another session's in-flight computation",
+                         [({"function": name}, s["deduplicated"]) for name, s in stats.items()]))
+        families.append(("semd_singleflight_computations_total", "counter",
+                         "Computations actually run by coalesced functions",
+                         [({"function": name}, s["computations"]) for name, s in stats.items()]))
+    return families
+
+
+def render_prometheus():
+    """
+    All metrics in Prometheus text exposition format
+    """
+    lines = []
+    with _lock:
+        registered = list(_metrics.values())
+    for metric in registered:
+        lines.append(f"# HELP {metric.name} {metric.help}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        for name, labels, value in metric.samples():
+            lines.append(f"{name}{_label_str(labels)} {value}")
+    for name, kind, help_text, samples in _collected():
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for labels, value in samples:
+            lines.append(f"{name}{_label_str(labels)} {value}")
+    return "\n".join(lines) + "\n"
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = render_prometheus().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def write_metrics_file(path):
+    """
+    Atomically write the current metrics to path
+    """
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix=".metrics-", dir=directory)
+    with os.fdopen(fd, "w") as f:
+        f.write(render_prometheus())
+    os.replace(tmp_path, path)
+
+
+def _file_writer(path, interval):
+    while True:
+        try:
+            write_metrics_file(path)
+        except OSError:
+            pass
+        time.sleep(interval)
+
+
+def start_exporter():
+    """
+    Start the configured exporters once per process (no-op if none are set)
+    """
+    global _exporter_started
+    with _lock:
+        if _exporter_started:
+            return
+        _exporter_started = True
+
+    port = os.environ.get("SEMD_METRICS_PORT")
+    if port:
+        try:
+            server = ThreadingHTTPServer(("127.0.0.1", int(port)), _MetricsHandler)
+        except OSError:
+            server = None  # port taken, e.g. by another worker
+        if server is not None:
+            threading.Thread(target=server.serve_forever, name="semd-metrics-http",
+                             daemon=True).start()
+
+    path = os.environ.get("SEMD_METRICS_FILE")
+    if path:
+        interval = float(os.environ.get("SEMD_METRICS_INTERVAL", 15))
+        threading.Thread(target=_file_writer, args=(path.format(pid=os.getpid()), interval),
+                         name="semd-metrics-file", daemon=True).start()
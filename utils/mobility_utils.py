@@ -1,6 +1,21 @@
 import pandas as pd
 import numpy as np
+from utils.profiling import profiled
 
+# Tier labels used by the mobility ladder comparison
+TIER_NAMES = {
+    1: "Ivy Plus",
+    2: "Other elite schools",
+    3: "Highly selective public",
+    4: "Highly selective private",
+    5: "Selective public",
+    6: "Selective private",
+    7: "Nonselective 4-year public",
+    8: "Nonselective 4-year private",
+    10: "Four-year for-profit"
+}
+
+@profiled
 def create_mobility_ladder(df, parent_quintile=1):
     """
     Creates mobility ladder dataframe showing probability of movement across quintiles
@@ -63,4 +78,70 @@ def get_top_mobility_colleges(mobility_df: pd.DataFrame,
         Top N colleges by mobility rate to target quintile
     """
     quintile_col = f'Q{target_quintile}_Pct'
-    return mobility_df.nlargest(top_n, quintile_col) 
\ No newline at end of file
+    return mobility_df.nlargest(top_n, quintile_col)
+
+LADDER_COLUMNS = ['par_q'] + [f'kq{k}_cond_parq' for k in range(1, 6)]
+
+@profiled
+def group_ladders(mobility_df, keys, names=None, include_all=True):
+    """
+    Mean mobility ladder of every group in a single groupby, so the cost
+    does not depend on how many groups are compared afterwards
+
+    Parameters:
+    -----------
+    mobility_df : pd.DataFrame
+        Output from create_mobility_ladder function
+    keys : pd.Series
+        Group id per row (tier, type, state, cluster, ...), aligned with
+        mobility_df; rows with a missing key only count towards "All"
+    names : dict, optional
+        Group id -> label; groups without a label are dropped. Defaults to
+        the ids themselves
+    include_all : bool
+        Prepend an "All" row over every row of mobility_df
+
+    Returns:
+    --------
+    pd.DataFrame
+        One row per group label: colleges, mean par_q, mean
+        kq1..kq5_cond_parq and the Q4+Q5 rate
+    """
+    if names is not None:
+        keys = keys.where(keys.isin(list(names)))
+    grouped = mobility_df[LADDER_COLUMNS].groupby(keys.to_numpy(), sort=True)
+    ladders = grouped.mean()
+    ladders.insert(0, 'colleges', grouped.size())
+    if names is not None:
+        ladders = ladders.reindex([g for g in names if g in ladders.index])
+        ladders.index = ladders.index.map(names)
+
+    if include_all:
+        overall = mobility_df[LADDER_COLUMNS].mean()
+        overall['colleges'] = len(mobility_df)
+        ladders = pd.concat([overall.to_frame('All').T, ladders])
+    ladders = ladders[['colleges'] + LADDER_COLUMNS]
+    ladders['colleges'] = ladders['colleges'].astype(int)
+    ladders['q4q5'] = ladders['kq4_cond_parq'] + ladders['kq5_cond_parq']
+    return ladders
+
+@profiled
+def tier_ladders(mobility_df):
+    """
+    Mean mobility ladder for all colleges and for each tier, the numbers
+    plotted by plot_mobility_ladder
+
+    Parameters:
+    -----------
+    mobility_df : pd.DataFrame
+        Output from create_mobility_ladder function
+
+    Returns:
+    --------
+    pd.DataFrame
+        One row per tier label ("All" first): colleges, mean par_q,
+        mean kq1..kq5_cond_parq and the Q4+Q5 rate
+    """
+    ladders = group_ladders(mobility_df, mobility_df['tier'], TIER_NAMES)
+    ladders.index.name = 'tier'
+    return ladders
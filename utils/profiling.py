@@ -0,0 +1,270 @@
+# utils/profiling.py
+"""
+Lightweight per-rerun timing instrumentation.
+
+A rerun is profiled between begin_rerun() and end_rerun() on the thread that
+runs the script. Functions decorated with @profiled and blocks wrapped in
+`with stage(...)` record wall time and the net number of allocated Python
+memory blocks (plus bytes when tracemalloc is tracing). Outside a profiled
+rerun both are no-ops apart from one attribute lookup.
+
+Profiling is on for a rerun when the page is opened with ?debug=1 or when
+SEMD_PROFILE=1 is set. Finished reruns are appended as JSON lines to a
+rotating log (SEMD_PROFILE_LOG, default logs/profile.jsonl).
+
+begin_rerun(trace_memory=True) additionally traces the rerun with
+tracemalloc: the profile records the transient peak, the bytes still
+allocated at the end and the allocation sites that grew the most, and the
+peak is kept per view (view_memory_stats). Tracing slows the rerun down
+considerably and is process-wide: concurrent traced reruns share one
+reference-counted trace, and their profiles are marked approximate because
+the peak and the allocation sites include the other sessions' allocations.
+"""
+import functools
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from logging.handlers import RotatingFileHandler
+
+PROFILE_ALWAYS = os.environ.get("SEMD_PROFILE") == "1"
+PROFILE_LOG = os.environ.get("SEMD_PROFILE_LOG", os.path.join("logs", "profile.jsonl"))
+
+TOP_ALLOCATION_SITES = 10
+
+_local = threading.local()
+_logger = None
+_logger_lock = threading.Lock()
+_view_memory = {}
+_view_memory_lock = threading.Lock()
+
+# Traced reruns in flight; tracemalloc starts on 0 -> 1 and stops on 1 -> 0
+_trace_lock = threading.Lock()
+_active_traces = 0
+_trace_starts = 0
+_owns_tracing = False
+
+
+class RerunProfile:
+    """
+    Stages recorded during one script rerun
+    """
+
+    def __init__(self, label=""):
+        self.label = label
+        self.started_at = time.time()
+        self._t0 = time.perf_counter()
+        self.depth = 0
+        self.stages = []
+        self.total_ms = None
+        self.memory = None
+        self._trace = None
+
+    def elapsed_ms(self):
+        return (time.perf_counter() - self._t0) * 1000
+
+    def to_dict(self):
+        data = {
+            "label": self.label,
+            "started_at": self.started_at,
+            "total_ms": self.total_ms,
+            "stages": sorted(self.stages, key=lambda s: s["start_ms"]),
+        }
+        if self.memory is not None:
+            data["memory"] = self.memory
+        return data
+
+    def start_memory_trace(self):
+        """
+        Join the shared trace (starting tracemalloc if needed) and remember
+        the starting point
+        """
+        global _active_traces, _trace_starts, _owns_tracing
+        with _trace_lock:
+            shared = _active_traces > 0
+            if not shared:
+                # Only the first traced rerun may reset the process-wide peak
+                if not tracemalloc.is_tracing():
+                    tracemalloc.start()
+                    _owns_tracing = True
+                tracemalloc.reset_peak()
+            _active_traces += 1
+            _trace_starts += 1
+            self._trace = {
+                "shared": shared,
+                "starts": _trace_starts,
+                "traced_bytes": tracemalloc.get_traced_memory()[0],
+            }
+        self._trace["snapshot"] = _take_snapshot()
+
+    def finish_memory_trace(self):
+        """
+        Record peak, retained bytes and the top growing allocation sites
+        """
+        global _active_traces, _owns_tracing
+        trace, self._trace = self._trace, None
+        # Still counted as active, so no other rerun can stop the trace here
+        current, peak = tracemalloc.get_traced_memory()
+        growth = _take_snapshot().compare_to(trace["snapshot"], "lineno")
+        with _trace_lock:
+            shared = trace["shared"] or _active_traces > 1 or _trace_starts != trace["starts"]
+            _active_traces -= 1
+            if _active_traces == 0 and _owns_tracing:
+                tracemalloc.stop()
+                _owns_tracing = False
+        self.memory = {
+            # Other sessions' allocations overlapped this rerun
+            "approximate": shared,
+            "peak_bytes": peak - trace["traced_bytes"],
+            "retained_bytes": current - trace["traced_bytes"],
+            "top_sites": [
+                {
+                    "site": f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+                    "size_diff": stat.size_diff,
+                    "count_diff": stat.count_diff,
+                }
+                for stat in growth[:TOP_ALLOCATION_SITES]
+            ],
+        }
+
+
+def _take_snapshot():
+    return tracemalloc.take_snapshot().filter_traces([
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+    ])
+
+
+def current_profile():
+    """
+    Profile of the rerun running on this thread, or None
+    """
+    return getattr(_local, "profile", None)
+
+
+def begin_rerun(label="", trace_memory=False):
+    """
+    Start profiling the rerun on this thread, optionally with tracemalloc
+    """
+    _local.profile = RerunProfile(label)
+    if trace_memory:
+        _local.profile.start_memory_trace()
+    return _local.profile
+
+
+def label_rerun(label):
+    """
+    Name the current rerun (e.g. by the selected view)
+    """
+    profile = current_profile()
+    if profile is not None:
+        profile.label = label
+
+
+def end_rerun():
+    """
+    Finish the current rerun, write it to the rolling log and return it
+    """
+    profile = current_profile()
+    _local.profile = None
+    if profile is None:
+        return None
+    profile.total_ms = profile.elapsed_ms()
+    if profile._trace is not None:
+        profile.finish_memory_trace()
+        _record_view_memory(profile.label, profile.memory["peak_bytes"], profile.memory["approximate"])
+    try:
+        _get_logger().info(json.dumps(profile.to_dict()))
+    except OSError:
+        pass  # logging must never break a rerun
+    return profile
+
+
+def _record_view_memory(view, peak_bytes, approximate=False):
+    with _view_memory_lock:
+        entry = _view_memory.setdefault(view or "unknown",
+                                        {"reruns": 0, "approximate_reruns": 0, "max_peak_bytes": 0})
+        entry["reruns"] += 1
+        entry["approximate_reruns"] += int(approximate)
+        entry["last_peak_bytes"] = peak_bytes
+        entry["max_peak_bytes"] = max(entry["max_peak_bytes"], peak_bytes)
+
+
+def view_memory_stats():
+    """
+    Traced rerun peaks per view in this process: reruns, reruns whose trace
+    overlapped another session's (approximate), last and max peak bytes
+    """
+    with _view_memory_lock:
+        return {view: dict(entry) for view, entry in _view_memory.items()}
+
+
+def _get_logger():
+    global _logger
+    if _logger is None:
+        with _logger_lock:
+            if _logger is None:
+                log_dir = os.path.dirname(PROFILE_LOG)
+                if log_dir:
+                    os.makedirs(log_dir, exist_ok=True)
+                handler = RotatingFileHandler(PROFILE_LOG, maxBytes=5 * 1024 * 1024, backupCount=3)
+                handler.setFormatter(logging.Formatter("%(message)s"))
+                logger = logging.getLogger("semd.profile")
+                logger.setLevel(logging.INFO)
+                logger.propagate = False
+                logger.addHandler(handler)
+                _logger = logger
+    return _logger
+
+
+@contextmanager
+def stage(name):
+    """
+    Record the wall time and allocations of a block in the current rerun
+    """
+    profile = current_profile()
+    if profile is None:
+        yield
+        return
+
+    entry = {"name": name, "depth": profile.depth, "start_ms": profile.elapsed_ms()}
+    tracing = tracemalloc.is_tracing()
+    bytes_before = tracemalloc.get_traced_memory()[0] if tracing else None
+    blocks_before = sys.getallocatedblocks()
+    t0 = time.perf_counter()
+    profile.depth += 1
+    try:
+        yield
+    finally:
+        profile.depth -= 1
+        entry["duration_ms"] = (time.perf_counter() - t0) * 1000
+        # Process-wide counters: concurrent sessions add noise
+        entry["alloc_blocks"] = sys.getallocatedblocks() - blocks_before
+        if tracing:
+            entry["alloc_bytes"] = tracemalloc.get_traced_memory()[0] - bytes_before
+        profile.stages.append(entry)
+
+
+def profiled(func=None, *, name=None):
+    """
+    Decorator recording a function call as a stage of the current rerun
+
+    Usable as @profiled or @profiled(name="...")
+    """
+    if func is None:
+        return functools.partial(profiled, name=name)
+
+    stage_name = name or func.__name__
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if current_profile() is None:
+            return func(*args, **kwargs)
+        with stage(stage_name):
+            return func(*args, **kwargs)
+
+    return wrapper
@@ -0,0 +1,203 @@
+# utils/schema.py
+"""
+Declared compact dtypes for the Opportunity Insights tables.
+
+The CSVs load as float64/int64/object. apply_schema() narrows them:
+
+- string dimensions become categoricals
+- codes and identifiers (tier, iclevel, region, type, flags, ...) become small ints
+- shares, probabilities and ranks become float32
+
+Money, counts and means stay float64. An integer cast is only applied when it
+is lossless (no missing values, no fractional parts); otherwise the column
+keeps its loaded dtype. Compare footprints with:
+
+    python -m utils.schema
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+QUINTILES = range(1, 6)
+
+CATEGORY_COLUMNS = ['name', 'state', 'tier_name', 'czname', 'county']
+
+INT_COLUMNS = {
+    'super_opeid': 'int32',
+    'tier': 'int8',
+    'type': 'int8',
+    'iclevel': 'int8',
+    'region': 'int8',
+    'fips': 'int8',
+    'public': 'int8',
+    'multi': 'int8',
+    'hbcu': 'int8',
+    'flagship': 'int8',
+    'imputed': 'int8',
+    'barrons': 'int16',
+    'cz': 'int32',
+    'cfips': 'int32',
+    'zip': 'int32',
+    'par_median': 'int32',
+    'k_median': 'int32',
+    'k_median_nozero': 'int32',
+    'ipeds_enrollment_2013': 'int32',
+}
+
+FLOAT32_COLUMNS = (
+    [f'par_q{p}' for p in QUINTILES]
+    + ['par_top10pc', 'par_top5pc', 'par_top1pc', 'par_toppt1pc', 'par_rank']
+    + [f'k_q{k}' for k in QUINTILES]
+    + ['k_top10pc', 'k_top5pc', 'k_top1pc', 'k_rank', 'k_0inc', 'k_married']
+    + [f'kq{k}_cond_parq{p}' for p in QUINTILES for k in QUINTILES]
+    + [f'ktop1pc_cond_parq{p}' for p in QUINTILES]
+    + [f'k_rank_cond_parq{p}' for p in QUINTILES]
+    + [f'k_married_cond_parq{p}' for p in QUINTILES]
+    + ['mr_kq5_pq1', 'mr_ktop1_pq1', 'female', 'shareimputed']
+    + ['grad_rate_150_p_2013', 'grad_rate_150_p_2002', 'scorecard_rej_rate_2013']
+    + ['asian_or_pacific_share_fall_2000', 'black_share_fall_2000',
+       'hisp_share_fall_2000', 'alien_share_fall_2000']
+    + ['pct_arthuman_2000', 'pct_business_2000', 'pct_health_2000', 'pct_multidisci_2000',
+       'pct_publicsocial_2000', 'pct_stem_2000', 'pct_socialscience_2000',
+       'pct_tradepersonal_2000']
+)
+
+
+def _lossless_int(series, dtype):
+    values = series.to_numpy()
+    if len(values) == 0:
+        return True
+    if series.isna().any():
+        return False
+    info = np.iinfo(dtype)
+    if values.min() < info.min or values.max() > info.max:
+        return False
+    return bool(np.all(values == np.round(values)))
+
+
+def _declared_dtype(col, lossless_int):
+    """
+    Target dtype of one column, or None to keep the loaded dtype
+    """
+    if col in CATEGORY_COLUMNS:
+        return 'category'
+    if col in INT_COLUMNS and lossless_int:
+        return INT_COLUMNS[col]
+    if col in FLOAT32_COLUMNS:
+        return 'float32'
+    return None
+
+
+def apply_schema(df, dtypes=None):
+    """
+    Return a copy of df with the declared compact dtypes applied
+
+    Parameters:
+    -----------
+    df : pd.DataFrame
+        table2 or table10 as loaded from CSV (any subset of columns)
+    dtypes : dict, optional
+        Column -> dtype plan from plan_dtypes(); use it so that every chunk
+        of a file gets the same dtypes
+    """
+    converted = {}
+    for col in df.columns:
+        series = df[col]
+        if dtypes is not None:
+            dtype = dtypes[col]
+        else:
+            lossless = col in INT_COLUMNS and _lossless_int(series, INT_COLUMNS[col])
+            dtype = _declared_dtype(col, lossless)
+        converted[col] = series if dtype is None else series.astype(dtype)
+    return pd.DataFrame(converted, index=df.index)
+
+
+def category_code_dtype(n_categories):
+    """
+    Smallest signed integer type that holds the category codes (and -1)
+    """
+    for dtype in (np.int8, np.int16, np.int32):
+        if n_categories < np.iinfo(dtype).max:
+            return dtype
+    return np.int64
+
+
+def plan_dtypes(chunks):
+    """
+    Dtype plan for a file read in chunks, valid for every chunk
+
+    Integer casts are planned only if they are lossless in all chunks.
+    Undeclared columns become categoricals (strings), int64 (integers
+    without gaps) or float64.
+
+    Parameters:
+    -----------
+    chunks : iterable of pd.DataFrame
+        The file's chunks, e.g. from pd.read_csv(..., chunksize=...)
+    """
+    columns = None
+    lossless = {}
+    is_string = {}
+    for chunk in chunks:
+        if columns is None:
+            columns = list(chunk.columns)
+        for col in columns:
+            series = chunk[col]
+            is_string[col] = is_string.get(col, False) or series.dtype == object
+            target = INT_COLUMNS.get(col, 'int64')
+            if is_string[col]:
+                lossless[col] = False
+            else:
+                lossless[col] = lossless.get(col, True) and _lossless_int(series, target)
+
+    plan = {}
+    for col in columns or []:
+        dtype = _declared_dtype(col, lossless.get(col, False))
+        if dtype is None:
+            if is_string[col]:
+                dtype = 'category'
+            elif lossless.get(col, False):
+                dtype = 'int64'
+            else:
+                dtype = 'float64'
+        plan[col] = dtype
+    return plan
+
+
+def footprint_report(before, after):
+    """
+    Per-column memory footprint before and after apply_schema
+
+    Returns:
+    --------
+    pd.DataFrame
+        dtype and deep bytes before/after per column, largest saving first,
+        with a final 'TOTAL' row
+    """
+    report = pd.DataFrame({
+        'dtype_before': before.dtypes.astype(str),
+        'dtype_after': after.dtypes.astype(str),
+        'bytes_before': before.memory_usage(deep=True, index=False),
+        'bytes_after': after.memory_usage(deep=True, index=False),
+    })
+    report['saved'] = report['bytes_before'] - report['bytes_after']
+    report = report.sort_values('saved', ascending=False)
+    report.loc['TOTAL'] = ['', '', report['bytes_before'].sum(),
+                           report['bytes_after'].sum(), report['saved'].sum()]
+    return report
+
+
+if __name__ == "__main__":
+    from utils.snapshot import DATA_DIR, MOBILITY_FILE, COST_FILE
+
+    pd.set_option('display.width', 120)
+    for name in (MOBILITY_FILE, COST_FILE):
+        raw = pd.read_csv(os.path.join(DATA_DIR, name))
+        raw = raw[raw['iclevel'] == 1].reset_index(drop=True)
+        report = footprint_report(raw, apply_schema(raw))
+        total = report.loc['TOTAL']
+        print(f"\n{name}: {total['bytes_before'] / 2**20:.2f} MiB -> "
+              f"{total['bytes_after'] / 2**20:.2f} MiB "
+              f"({total['bytes_after'] / total['bytes_before']:.0%} of original)")
+        print(report.head(15).to_string())
@@ -0,0 +1,110 @@
+# utils/singleflight.py
+"""
+Single-flight coalescing for expensive compute functions.
+
+Streamlit runs every session as a thread of the same server process. When
+many sessions ask for the same computation at the same moment, the first
+caller (the leader) computes it and the others wait for and share its
+result instead of recomputing in parallel. Results are shared objects, so
+callers must treat them as read-only.
+"""
+import functools
+import hashlib
+import threading
+from collections import defaultdict
+
+_lock = threading.Lock()
+_in_flight = {}
+_stats = defaultdict(lambda: {"calls": 0, "computations": 0, "deduplicated": 0})
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+def _update(digest, value):
+    """
+    Feed a stable representation of value into digest
+    """
+    if isinstance(value, (list, tuple)):
+        digest.update(b"(")
+        for item in value:
+            _update(digest, item)
+        digest.update(b")")
+    elif isinstance(value, dict):
+        digest.update(b"{")
+        for key in sorted(value, key=repr):
+            _update(digest, key)
+            _update(digest, value[key])
+        digest.update(b"}")
+    elif type(value).__module__.startswith("pandas"):
+        # Hash frame contents so equal copies from different sessions coalesce
+        import pandas as pd
+        digest.update(repr((type(value).__name__, value.shape)).encode())
+        if isinstance(value, pd.DataFrame):
+            digest.update(repr(list(zip(value.columns, value.dtypes.astype(str)))).encode())
+        digest.update(pd.util.hash_pandas_object(value, index=True).values.tobytes())
+    else:
+        digest.update(repr(value).encode())
+
+
+def fingerprint(value):
+    """
+    Content fingerprint of call arguments
+    """
+    digest = hashlib.sha256()
+    _update(digest, value)
+    return digest.hexdigest()
+
+
+def coalesce(func):
+    """
+    Decorator that lets concurrent identical calls share one computation
+    """
+    name = f"{func.__module__}.{func.__qualname__}"
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        key = (name, fingerprint((args, kwargs)))
+        with _lock:
+            stats = _stats[name]
+            stats["calls"] += 1
+            call = _in_flight.get(key)
+            leader = call is None
+            if leader:
+                call = _in_flight[key] = _Call()
+                stats["computations"] += 1
+            else:
+                stats["deduplicated"] += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func(*args, **kwargs)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with _lock:
+                del _in_flight[key]
+            call.done.set()
+
+    return wrapper
+
+
+def singleflight_stats():
+    """
+    Per-function calls, computations and deduplicated calls since start
+    """
+    with _lock:
+        return {name: dict(stats) for name, stats in _stats.items()}
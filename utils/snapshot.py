@@ -0,0 +1,713 @@
+# utils/snapshot.py
+"""
+Compiled, memory-mapped dataset shared by every server process.
+
+`build_snapshot` reads the raw CSVs once, applies the compact dtypes declared
+in utils.schema and writes the four-year rows as plain .npy arrays (one
+column-major block per numeric dtype, the 5x5 transition tensor, parent
+shares, string category codes and the table2 -> table10 join index), plus
+the ingest-time validation report of utils.validation in meta.json.
+`attach_snapshot` opens those arrays with mmap_mode='r', so every worker maps
+the same read-only pages from the OS page cache instead of holding its own
+copy; resident memory does not grow with the worker count.
+
+Snapshots are compiled in artifact groups (SNAPSHOT_GROUPS), each versioned
+by the content hashes of its own input files. A rebuild recompiles only the
+groups whose inputs changed and hard-links the rest from the previous
+snapshot. Each worker polls the data directory (SEMD_WATCH_INTERVAL seconds)
+and, when a file changes, builds the new version under a lock file and swaps
+its shared handle; reruns in flight keep reading the old, still-mapped one.
+
+Build ahead of a deploy with:
+
+    python -m utils.snapshot
+"""
+import contextlib
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows: builds are not serialized across processes
+    fcntl = None
+
+import numpy as np
+import pandas as pd
+
+from utils.ingest import compile_table
+from utils.schema import apply_schema, category_code_dtype
+from utils.validation import validate_tables
+
+DATA_DIR = "data"
+SNAPSHOT_DIR = os.environ.get("SEMD_SNAPSHOT_DIR", os.path.join(DATA_DIR, "snapshot"))
+MOBILITY_FILE = "mrc_table2.csv"
+COST_FILE = "mrc_table10.csv"
+# Optional cohort-by-year version of table2 (same columns plus `cohort`),
+# compiled with the streaming ingest when present
+COHORT_FILE = "mrc_table2_by_cohort.csv"
+
+# Seconds between checks of the raw files for changes (0 disables watching)
+WATCH_INTERVAL = float(os.environ.get("SEMD_WATCH_INTERVAL", 5))
+
+# Bump when the on-disk layout changes so stale snapshots are rebuilt
+SNAPSHOT_FORMAT = 4
+
+logger = logging.getLogger("semd.snapshot")
+
+QUINTILES = range(1, 6)
+TENSOR_COLUMNS = [f'kq{k}_cond_parq{p}' for p in QUINTILES for k in QUINTILES]
+PAR_SHARE_COLUMNS = [f'par_q{p}' for p in QUINTILES]
+
+
+def file_sha256(path, chunk_size=1 << 20):
+    """
+    Content hash of a file, read in chunks
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def source_stats(data_dir=DATA_DIR):
+    """
+    (size, mtime_ns) of each raw file a snapshot is compiled from
+
+    The cohort file is optional and only listed when present.
+    """
+    stats = {}
+    for name in (MOBILITY_FILE, COST_FILE, COHORT_FILE):
+        try:
+            st = os.stat(os.path.join(data_dir, name))
+        except FileNotFoundError:
+            if name == COHORT_FILE:
+                continue
+            raise
+        stats[name] = (st.st_size, st.st_mtime_ns)
+    return stats
+
+
+# (path, size, mtime_ns) -> sha256, so unchanged files are hashed once per process
+_hash_cache = {}
+
+
+def source_hashes(data_dir=DATA_DIR, stats=None):
+    """
+    Content hashes of the raw files a snapshot is compiled from
+
+    A file is re-hashed only when its size or modification time changed
+    since it was last hashed in this process.
+    """
+    stats = stats if stats is not None else source_stats(data_dir)
+    hashes = {}
+    for name, (size, mtime_ns) in stats.items():
+        path = os.path.join(data_dir, name)
+        key = (os.path.abspath(path), size, mtime_ns)
+        if key not in _hash_cache:
+            _hash_cache[key] = file_sha256(path)
+        hashes[name] = _hash_cache[key]
+    return hashes
+
+
+def snapshot_version(hashes):
+    """
+    Version id of the snapshot compiled from the given source hashes
+    """
+    digest = hashlib.sha256(f"format={SNAPSHOT_FORMAT}".encode())
+    for name in sorted(hashes):
+        digest.update(f"{name}={hashes[name]}".encode())
+    return digest.hexdigest()[:16]
+
+
+def group_version(group, hashes):
+    """
+    Version id of one artifact group, from the hashes of its inputs only
+    """
+    digest = hashlib.sha256(f"format={SNAPSHOT_FORMAT};group={group}".encode())
+    for name in SNAPSHOT_GROUPS[group]:
+        digest.update(f"{name}={hashes[name]}".encode())
+    return digest.hexdigest()[:16]
+
+
+def _write_table(df, prefix, out_dir, meta):
+    """
+    Write a schema-typed frame as one column-major block per numeric dtype
+    plus category codes
+    """
+    blocks = {}
+    str_cols = []
+    for col in df.columns:
+        if pd.api.types.is_numeric_dtype(df[col]) and not pd.api.types.is_bool_dtype(df[col]):
+            blocks.setdefault(str(df[col].dtype), []).append(col)
+        else:
+            str_cols.append(col)
+
+    # Column-major so that each row of a block is one contiguous column
+    for dtype, cols in blocks.items():
+        np.save(os.path.join(out_dir, f"{prefix}_{dtype}.npy"),
+                np.ascontiguousarray(df[cols].to_numpy(dtype).T))
+
+    categories = {}
+    for col in str_cols:
+        cat = pd.Categorical(df[col])
+        categories[col] = cat.categories.tolist()
+        np.save(os.path.join(out_dir, f"{prefix}_codes_{col}.npy"),
+                cat.codes.astype(category_code_dtype(len(cat.categories))))
+
+    meta[prefix] = {
+        "columns": df.columns.tolist(),
+        "blocks": blocks,
+        "str_columns": str_cols,
+        "categories": categories,
+    }
+
+
+class _Sources:
+    """
+    Raw tables for one build, read (four-year rows, schema applied) at most once
+    """
+
+    def __init__(self, data_dir):
+        self.data_dir = data_dir
+        self._frames = {}
+
+    def frame(self, name):
+        if name not in self._frames:
+            df = pd.read_csv(os.path.join(self.data_dir, name))
+            self._frames[name] = apply_schema(df[df['iclevel'] == 1].reset_index(drop=True))
+        return self._frames[name]
+
+
+def _build_mobility(sources, out_dir, meta):
+    mobility = sources.frame(MOBILITY_FILE)
+    meta["rows"] = len(mobility)
+    _write_table(mobility, "mobility", out_dir, meta)
+
+    # Transition tensor [institution, parent quintile, kid quintile]
+    tensor = mobility[TENSOR_COLUMNS].to_numpy(np.float32).reshape(-1, 5, 5)
+    np.save(os.path.join(out_dir, "tensor.npy"), tensor)
+    np.save(os.path.join(out_dir, "par_shares.npy"),
+            mobility[PAR_SHARE_COLUMNS].to_numpy(np.float32))
+    np.save(os.path.join(out_dir, "super_opeid.npy"),
+            mobility['super_opeid'].to_numpy(np.int64))
+
+
+def _build_cost(sources, out_dir, meta):
+    _write_table(sources.frame(COST_FILE), "cost", out_dir, meta)
+
+
+def _build_join(sources, out_dir, meta):
+    mobility = sources.frame(MOBILITY_FILE)
+    cost = sources.frame(COST_FILE)
+
+    # Row of each table2 institution in table10, -1 when unmatched
+    cost_rows = pd.Index(cost['super_opeid']).get_indexer(mobility['super_opeid'])
+    np.save(os.path.join(out_dir, "cost_rows.npy"), cost_rows.astype(np.int64))
+
+    # Numeric table10 columns pre-aligned to table2 rows, so the merged
+    # frame is also a view over mapped pages
+    aligned_cols = [c for c in cost.columns
+                    if c != 'super_opeid' and pd.api.types.is_numeric_dtype(cost[c])]
+    aligned = cost[aligned_cols].to_numpy(np.float64)[cost_rows]
+    aligned[cost_rows < 0] = np.nan
+    np.save(os.path.join(out_dir, "cost_aligned.npy"), np.ascontiguousarray(aligned.T))
+    meta["cost_aligned_columns"] = aligned_cols
+
+
+def _build_validation(sources, out_dir, meta):
+    # Checked once per build; views only read the stored report
+    report = validate_tables(sources.frame(MOBILITY_FILE), sources.frame(COST_FILE))
+    meta["validation"] = report
+    for check in report["checks"]:
+        if check["status"] != "pass":
+            logger.warning("validation failed: %s (%s): %d rows",
+                           check["check"], check["scope"], check["failures"])
+
+
+def _build_cohort(sources, out_dir, meta):
+    # Streamed so the raw file is never held in memory
+    compile_table(os.path.join(sources.data_dir, COHORT_FILE), "cohort", out_dir, meta)
+    for dtype, cols in meta["cohort"]["blocks"].items():
+        if "cohort" in cols:
+            block = np.load(os.path.join(out_dir, f"cohort_{dtype}.npy"), mmap_mode='r')
+            meta["cohort"]["cohorts"] = np.unique(block[cols.index("cohort")]).tolist()
+
+
+# Artifact groups: inputs, builder and the meta keys it fills in. A group is
+# rebuilt only when one of its inputs changed; otherwise its files are
+# hard-linked from the previous snapshot (a table10 edit leaves the
+# transition tensor alone).
+SNAPSHOT_GROUPS = {
+    "mobility": (MOBILITY_FILE,),
+    "cost": (COST_FILE,),
+    "join": (MOBILITY_FILE, COST_FILE),
+    "validation": (MOBILITY_FILE, COST_FILE),
+    "cohort": (COHORT_FILE,),
+}
+_GROUP_BUILDERS = {
+    "mobility": (_build_mobility, ("rows", "mobility")),
+    "cost": (_build_cost, ("cost",)),
+    "join": (_build_join, ("cost_aligned_columns",)),
+    "validation": (_build_validation, ("validation",)),
+    "cohort": (_build_cohort, ("cohort",)),
+}
+
+
+def _read_meta(path):
+    if path is None:
+        return None
+    try:
+        with open(os.path.join(path, "meta.json")) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _reuse_files(src_dir, dst_dir, names):
+    """
+    Hard-link (or copy, across filesystems) files from a previous snapshot
+
+    Returns False if any file is missing, so the group is rebuilt instead.
+    """
+    try:
+        for name in names:
+            src, dst = os.path.join(src_dir, name), os.path.join(dst_dir, name)
+            try:
+                os.link(src, dst)
+            except OSError:
+                if not os.path.exists(src):
+                    raise
+                shutil.copy2(src, dst)
+    except OSError:
+        for name in names:
+            try:
+                os.remove(os.path.join(dst_dir, name))
+            except FileNotFoundError:
+                pass
+        return False
+    return True
+
+
+def build_snapshot(data_dir=DATA_DIR, snapshot_dir=SNAPSHOT_DIR, stats=None):
+    """
+    Compile the raw CSVs into a new snapshot directory and make it current
+
+    Artifact groups whose inputs are unchanged since the current snapshot
+    are reused rather than rebuilt; meta["groups"] records which were.
+
+    Parameters:
+    -----------
+    data_dir : str
+        Directory holding the raw Opportunity Insights tables
+    snapshot_dir : str
+        Root directory for compiled snapshots
+    stats : dict, optional
+        source_stats() already taken by the caller
+
+    Returns:
+    --------
+    str
+        Path of the snapshot that is now current
+    """
+    stats = stats if stats is not None else source_stats(data_dir)
+    hashes = source_hashes(data_dir, stats)
+    version = snapshot_version(hashes)
+    target = os.path.join(snapshot_dir, version)
+
+    if not os.path.isdir(target):
+        previous = current_snapshot_path(snapshot_dir)
+        previous_meta = _read_meta(previous) or {}
+        previous_groups = previous_meta.get("groups", {})
+
+        os.makedirs(snapshot_dir, exist_ok=True)
+        tmp_dir = tempfile.mkdtemp(prefix=f".{version}-", dir=snapshot_dir)
+        meta = {
+            "version": version,
+            "format": SNAPSHOT_FORMAT,
+            "sources": hashes,
+            "source_stats": stats,
+            "groups": {},
+        }
+        sources = _Sources(data_dir)
+        for group, inputs in SNAPSHOT_GROUPS.items():
+            if any(name not in hashes for name in inputs):
+                continue
+            builder, meta_keys = _GROUP_BUILDERS[group]
+            gversion = group_version(group, hashes)
+            reused = previous_groups.get(group, {})
+            if reused.get("version") == gversion and _reuse_files(previous, tmp_dir, reused["files"]):
+                for key in meta_keys:
+                    meta[key] = previous_meta[key]
+                files, rebuilt = reused["files"], False
+            else:
+                existing = set(os.listdir(tmp_dir))
+                builder(sources, tmp_dir, meta)
+                files, rebuilt = sorted(set(os.listdir(tmp_dir)) - existing), True
+            meta["groups"][group] = {"version": gversion, "files": files, "rebuilt": rebuilt}
+
+        with open(os.path.join(tmp_dir, "meta.json"), "w") as f:
+            json.dump(meta, f)
+
+        try:
+            os.rename(tmp_dir, target)
+        except OSError:
+            # Another worker finished the same version first
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    _set_current(snapshot_dir, version)
+    return target
+
+
+def _set_current(snapshot_dir, version):
+    """
+    Atomically point CURRENT at a snapshot version
+    """
+    fd, tmp_path = tempfile.mkstemp(prefix=".CURRENT-", dir=snapshot_dir)
+    with os.fdopen(fd, "w") as f:
+        f.write(version)
+    os.replace(tmp_path, os.path.join(snapshot_dir, "CURRENT"))
+
+
+def current_snapshot_path(snapshot_dir=SNAPSHOT_DIR):
+    """
+    Path of the current snapshot, or None if none has been built
+    """
+    try:
+        with open(os.path.join(snapshot_dir, "CURRENT")) as f:
+            version = f.read().strip()
+    except FileNotFoundError:
+        return None
+    path = os.path.join(snapshot_dir, version)
+    return path if os.path.isdir(path) else None
+
+
+class Snapshot:
+    """
+    Read-only view over a compiled snapshot directory
+
+    All arrays are memory-mapped; frames built from them wrap the mapped
+    pages without copying, so in-place writes to loaded columns will fail.
+    Assigning new columns (or to copies) works as usual.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, "meta.json")) as f:
+            self.meta = json.load(f)
+        self.version = self.meta["version"]
+        self.tensor = self._load("tensor")
+        self.par_shares = self._load("par_shares")
+        self.super_opeid = self._load("super_opeid")
+        self.cost_rows = self._load("cost_rows")
+        self.cost_aligned = self._load("cost_aligned")
+        self._tables = {
+            prefix: {
+                "blocks": {dtype: self._load(f"{prefix}_{dtype}")
+                           for dtype in self.meta[prefix]["blocks"]},
+                "codes": {col: self._load(f"{prefix}_codes_{col}")
+                          for col in self.meta[prefix]["str_columns"]},
+            }
+            for prefix in ("mobility", "cost", "cohort") if prefix in self.meta
+        }
+
+    def group_version(self, *groups):
+        """
+        Combined version of the given artifact groups (see SNAPSHOT_GROUPS)
+
+        Unlike `version`, it does not change when unrelated source files do.
+        """
+        versions = [self.meta["groups"].get(g, {}).get("version", "") for g in groups]
+        if len(versions) == 1:
+            return versions[0]
+        return hashlib.sha256("|".join(versions).encode()).hexdigest()[:16]
+
+    def nbytes(self):
+        """
+        Total size of the mapped arrays
+        """
+        arrays = [self.tensor, self.par_shares, self.super_opeid, self.cost_rows, self.cost_aligned]
+        for table in self._tables.values():
+            arrays.extend(table["blocks"].values())
+            arrays.extend(table["codes"].values())
+        return sum(a.nbytes for a in arrays)
+
+    def _load(self, name):
+        return np.load(os.path.join(self.path, f"{name}.npy"), mmap_mode='r')
+
+    def _columns(self, prefix):
+        """
+        Column name -> array (or Categorical) for one table, zero-copy for numerics
+        """
+        meta = self.meta[prefix]
+        arrays = self._tables[prefix]
+        columns = {}
+        for dtype, cols in meta["blocks"].items():
+            for i, col in enumerate(cols):
+                columns[col] = arrays["blocks"][dtype][i]
+        for col in meta["str_columns"]:
+            columns[col] = pd.Categorical.from_codes(
+                arrays["codes"][col], meta["categories"][col]
+            )
+        return columns
+
+    def mobility_frame(self):
+        """
+        table2 (four-year colleges) as a DataFrame over the mapped arrays
+        """
+        columns = self._columns("mobility")
+        order = self.meta["mobility"]["columns"]
+        return pd.DataFrame({col: columns[col] for col in order}, copy=False)
+
+    def cost_frame(self):
+        """
+        table10 (four-year colleges) as a DataFrame over the mapped arrays
+        """
+        columns = self._columns("cost")
+        order = self.meta["cost"]["columns"]
+        return pd.DataFrame({col: columns[col] for col in order}, copy=False)
+
+    def cohorts(self):
+        """
+        Birth cohorts available in the cohort-level table (empty if none)
+        """
+        return self.meta.get("cohort", {}).get("cohorts", [])
+
+    def cohort_frame(self, cohort=None):
+        """
+        Cohort-level table (four-year colleges), optionally for one cohort
+        """
+        columns = self._columns("cohort")
+        df = pd.DataFrame({col: columns[col] for col in self.meta["cohort"]["columns"]}, copy=False)
+        if cohort is not None:
+            df = df[df['cohort'].to_numpy() == cohort].reset_index(drop=True)
+        return df
+
+    def validation_report(self):
+        """
+        Ingest-time validation report (see utils.validation), or None if the
+        snapshot was built without the cost table
+        """
+        return self.meta.get("validation")
+
+    def cost_columns(self, columns):
+        """
+        Numeric table10 columns aligned to table2 rows (NaN where unmatched)
+        """
+        aligned_cols = self.meta["cost_aligned_columns"]
+        return {col: self.cost_aligned[aligned_cols.index(col)] for col in columns}
+
+    def merged_frame(self, cost_columns=('sticker_price_2013', 'scorecard_netprice_2013')):
+        """
+        Inner join of table2 and table10 on super_opeid using the join index
+        """
+        df = self.mobility_frame()
+        for col, values in self.cost_columns(cost_columns).items():
+            df[col] = values
+        matched = self.cost_rows >= 0
+        if not matched.all():
+            df = df[matched].reset_index(drop=True)
+        return df
+
+
+def attach_snapshot(data_dir=DATA_DIR, snapshot_dir=SNAPSHOT_DIR):
+    """
+    Attach to the current snapshot, building it first if it is missing or
+    was compiled from different source files or an older snapshot format
+    """
+    path = current_snapshot_path(snapshot_dir)
+    meta = _read_meta(path)
+    stats = source_stats(data_dir)
+    if meta is not None and not _matches(meta, stats, data_dir):
+        meta = None
+    if meta is None:
+        with _build_lock(snapshot_dir):
+            path = build_snapshot(data_dir, snapshot_dir, stats)
+    return Snapshot(path)
+
+
+def _matches(meta, stats, data_dir):
+    """
+    Whether a snapshot was compiled from the files described by stats
+
+    Files whose size and mtime match the recorded ones are trusted without
+    re-hashing, so attaching to a large snapshot stays cheap.
+    """
+    recorded = {name: tuple(value) for name, value in meta.get("source_stats", {}).items()}
+    if recorded == stats and meta.get("format") == SNAPSHOT_FORMAT:
+        return True
+    return meta["version"] == snapshot_version(source_hashes(data_dir, stats))
+
+
+@contextlib.contextmanager
+def _build_lock(snapshot_dir):
+    """
+    Exclusive lock so that only one process compiles a snapshot at a time
+    """
+    os.makedirs(snapshot_dir, exist_ok=True)
+    with open(os.path.join(snapshot_dir, ".build.lock"), "w") as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def prune_snapshots(snapshot_dir=SNAPSHOT_DIR, keep=3):
+    """
+    Remove all but the newest `keep` snapshot versions (never the current one)
+
+    Arrays already mapped by a running worker stay readable after their
+    files are unlinked, so pruning is safe under live traffic on POSIX.
+    """
+    current = current_snapshot_path(snapshot_dir)
+    versions = []
+    for name in os.listdir(snapshot_dir):
+        path = os.path.join(snapshot_dir, name)
+        if not name.startswith(".") and os.path.isdir(path) and path != current:
+            versions.append((os.path.getmtime(path), path))
+    for _, path in sorted(versions, reverse=True)[max(keep - 1, 0):]:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+_shared_snapshot = None
+_shared_lock = threading.Lock()
+_pinned = threading.local()
+_attach_stats = {"hits": 0, "misses": 0, "swaps": 0}
+_watcher = None
+
+
+def shared_snapshot():
+    """
+    Process-wide snapshot handle, attached on first use
+
+    The first attach also starts the data watcher (see start_data_watcher),
+    which replaces the handle when the raw files change. Callers that need
+    several arrays from one consistent version should hold on to the
+    returned object for the rest of the rerun, or pin it (pinned_snapshot).
+    """
+    global _shared_snapshot
+    pinned = getattr(_pinned, "snapshot", None)
+    if pinned is not None:
+        return pinned
+    with _shared_lock:
+        if _shared_snapshot is None:
+            _attach_stats["misses"] += 1
+            _shared_snapshot = attach_snapshot()
+            start_data_watcher()
+        else:
+            _attach_stats["hits"] += 1
+        return _shared_snapshot
+
+
+@contextlib.contextmanager
+def pinned_snapshot(snapshot=None):
+    """
+    Make shared_snapshot() return one handle on this thread for the block
+
+    Code that derives a cache key or ETag from the data version and then
+    computes from the data must see the same version in both, even if the
+    watcher swaps the shared handle in between. Nested pins keep the
+    outer handle.
+
+    Yields:
+    -------
+    Snapshot
+        The pinned handle
+    """
+    previous = getattr(_pinned, "snapshot", None)
+    _pinned.snapshot = snapshot or previous or shared_snapshot()
+    try:
+        yield _pinned.snapshot
+    finally:
+        _pinned.snapshot = previous
+
+
+def refresh_snapshot(data_dir=DATA_DIR, snapshot_dir=SNAPSHOT_DIR, stats=None):
+    """
+    Rebuild the snapshot if the raw files changed and swap the shared handle
+
+    Only the artifact groups whose inputs changed are recompiled. The swap
+    is a single reference assignment: reruns already holding the previous
+    Snapshot finish on it, later reruns see the new one.
+
+    Returns:
+    --------
+    bool
+        True if the shared snapshot was replaced
+    """
+    global _shared_snapshot
+    with _shared_lock:
+        current = _shared_snapshot
+    stats = stats if stats is not None else source_stats(data_dir)
+    if current is None or _matches(current.meta, stats, data_dir):
+        return False
+
+    with _build_lock(snapshot_dir):
+        # A no-op if another worker already compiled this version
+        path = build_snapshot(data_dir, snapshot_dir, stats)
+    snapshot = Snapshot(path)
+    with _shared_lock:
+        _shared_snapshot = snapshot
+        _attach_stats["swaps"] += 1
+    prune_snapshots(snapshot_dir)
+    return True
+
+
+def _watch(interval, data_dir, snapshot_dir):
+    previous = None
+    while True:
+        time.sleep(interval)
+        try:
+            stats = source_stats(data_dir)
+            # Wait until a file has stopped changing for one interval, so a
+            # half-copied CSV is never compiled
+            if stats == previous:
+                refresh_snapshot(data_dir, snapshot_dir, stats)
+            previous = stats
+        except Exception:
+            logger.exception("Snapshot refresh failed; keeping the current snapshot")
+
+
+def start_data_watcher(interval=WATCH_INTERVAL, data_dir=DATA_DIR, snapshot_dir=SNAPSHOT_DIR):
+    """
+    Poll the raw data files in a daemon thread and refresh the snapshot when
+    they change (once per process; interval 0 disables watching)
+
+    Replace data files atomically (write elsewhere, then mv) where possible.
+    """
+    global _watcher
+    if interval <= 0 or _watcher is not None:
+        return
+    _watcher = threading.Thread(target=_watch, args=(interval, data_dir, snapshot_dir),
+                                name="semd-data-watcher", daemon=True)
+    _watcher.start()
+
+
+def snapshot_stats():
+    """
+    Loader cache counters and the size of the mapped snapshot arrays
+    """
+    with _shared_lock:
+        stats = dict(_attach_stats)
+        snapshot = _shared_snapshot
+    stats["mapped_bytes"] = snapshot.nbytes() if snapshot is not None else 0
+    return stats
+
+
+if __name__ == "__main__":
+    with _build_lock(SNAPSHOT_DIR):
+        snapshot = Snapshot(build_snapshot())
+    print(f"Snapshot {snapshot.version} at {snapshot.path} "
+          f"({snapshot.meta['rows']} institutions)")
+    for group, info in snapshot.meta["groups"].items():
+        print(f"  {group:10s} {info['version']}  {'rebuilt' if info['rebuilt'] else 'reused'}")
+    prune_snapshots()
@@ -0,0 +1,217 @@
+# utils/sql_engine.py
+"""
+Embedded SQL over the compiled snapshot, for ad-hoc questions that do not
+deserve a view of their own.
+
+Uses DuckDB (optional dependency). The snapshot frames are registered as
+tables without copying: DuckDB scans the memory-mapped columns directly,
+vectorized and in parallel, and only the (row-limited) result is
+materialized.
+
+Tables:
+
+- institutions  table2, four-year colleges
+- costs         table10, four-year colleges
+- merged        institutions joined to costs on super_opeid
+- transitions   the 5x5 transition tensor in long form: super_opeid,
+                parent_quintile, kid_quintile, probability
+- cohorts       cohort-level table2 (only when one has been ingested)
+
+Queries must be a single SELECT, run with file access disabled, a memory
+limit and a timeout, and return at most MAX_ROW_LIMIT rows. Results are
+cached on disk per snapshot version.
+"""
+import os
+import re
+import threading
+
+try:
+    import duckdb
+except ImportError:
+    duckdb = None
+
+from utils.disk_cache import disk_cached
+from utils.profiling import profiled
+from utils.singleflight import coalesce
+from utils.snapshot import TENSOR_COLUMNS, shared_snapshot
+
+DEFAULT_ROW_LIMIT = 1000
+MAX_ROW_LIMIT = 10_000
+QUERY_TIMEOUT = float(os.environ.get("SEMD_SQL_TIMEOUT", 15))
+MEMORY_LIMIT = os.environ.get("SEMD_SQL_MEMORY_LIMIT", "512MB")
+
+EXAMPLE_QUERY = """-- Mean Q1 -> Q5 rate of private non-profits in the Northeast
+-- with a sticker price under $30k, by selectivity tier
+SELECT tier_name,
+       COUNT(*) AS institutions,
+       AVG(kq5_cond_parq1) AS q1_to_q5_rate
+FROM merged
+WHERE type = 2
+  AND region = 1
+  AND sticker_price_2013 < 30000
+GROUP BY tier_name
+ORDER BY q1_to_q5_rate DESC
+"""
+
+# One connection per process, rebuilt when the snapshot is swapped. A
+# DuckDB connection runs one query at a time (each using all cores), and
+# frames registered on it are not visible to its cursors, so queries are
+# serialized on this lock.
+_engine = {"version": None, "connection": None}
+_engine_lock = threading.Lock()
+
+
+def sql_available():
+    """
+    Whether the optional duckdb package is installed
+    """
+    return duckdb is not None
+
+
+def _connect(snapshot):
+    """
+    New in-memory DuckDB connection with the snapshot tables registered
+    """
+    con = duckdb.connect(":memory:")
+    con.register("institutions", snapshot.mobility_frame())
+    con.register("costs", snapshot.cost_frame())
+    if snapshot.cohorts():
+        con.register("cohorts", snapshot.cohort_frame())
+
+    mobility_columns = set(snapshot.meta["mobility"]["columns"])
+    cost_only = [c for c in snapshot.meta["cost"]["columns"] if c not in mobility_columns]
+    con.execute(
+        "CREATE TEMP VIEW merged AS SELECT i.*, "
+        + ", ".join(f'c."{c}"' for c in cost_only)
+        + " FROM institutions i JOIN costs c USING (super_opeid)"
+    )
+    # kq{k}_cond_parq{p} are the tensor cells, so unpivoting them gives the
+    # long form without materializing it
+    con.execute(f"""
+        CREATE TEMP VIEW transitions AS
+        SELECT super_opeid,
+               CAST(regexp_extract(cell, 'parq(\\d)', 1) AS TINYINT) AS parent_quintile,
+               CAST(regexp_extract(cell, '^kq(\\d)', 1) AS TINYINT) AS kid_quintile,
+               probability
+        FROM (
+            UNPIVOT (SELECT super_opeid, {", ".join(TENSOR_COLUMNS)} FROM institutions)
+            ON {", ".join(TENSOR_COLUMNS)}
+            INTO NAME cell VALUE probability
+        )
+    """)
+
+    con.execute(f"SET memory_limit = '{MEMORY_LIMIT}'")
+    con.execute("SET enable_external_access = false")
+    con.execute("SET lock_configuration = true")
+    return con
+
+
+def _connection():
+    """
+    Connection for the current snapshot (call with _engine_lock held)
+    """
+    snapshot = shared_snapshot()
+    if _engine["version"] != snapshot.version:
+        _engine["connection"] = _connect(snapshot)
+        _engine["version"] = snapshot.version
+    return _engine["connection"]
+
+
+def validate_query(sql):
+    """
+    Check that sql is a single SELECT statement
+
+    Returns:
+    --------
+    str
+        The query without surrounding whitespace and trailing semicolons
+
+    Raises:
+    -------
+    ValueError
+        If the query does not parse or is not a single SELECT
+    """
+    sql = sql.strip().rstrip(";").strip()
+    if not sql:
+        raise ValueError("Enter a query.")
+    try:
+        statements = duckdb.extract_statements(sql)
+    except duckdb.Error as e:
+        raise ValueError(str(e)) from e
+    if len(statements) != 1 or statements[0].type != duckdb.StatementType.SELECT:
+        raise ValueError("Only a single SELECT statement is allowed.")
+    return sql
+
+
+def run_query(sql, limit=DEFAULT_ROW_LIMIT):
+    """
+    Run a read-only query against the snapshot tables
+
+    Parameters:
+    -----------
+    sql : str
+        A single SELECT statement
+    limit : int
+        Maximum number of rows returned (capped at MAX_ROW_LIMIT)
+
+    Returns:
+    --------
+    tuple
+        (pd.DataFrame of results, bool whether rows were cut at the limit)
+
+    Raises:
+    -------
+    ValueError
+        If duckdb is missing, the query is rejected, fails or times out
+    """
+    if not sql_available():
+        raise ValueError("SQL queries need the optional duckdb package.")
+    sql = validate_query(sql)
+    limit = max(1, min(int(limit), MAX_ROW_LIMIT))
+    return _execute(sql, limit)
+
+
+@profiled
+@coalesce
+@disk_cached("query")
+def _execute(sql, limit):
+    with _engine_lock:
+        con = _connection()
+        timer = threading.Timer(QUERY_TIMEOUT, con.interrupt)
+        timer.start()
+        try:
+            # One row past the limit tells whether the result was truncated
+            result = con.sql(sql).limit(limit + 1).df()
+        except duckdb.InterruptException as e:
+            raise ValueError(f"Query took longer than {QUERY_TIMEOUT:g} s and was stopped.") from e
+        except duckdb.Error as e:
+            raise ValueError(str(e)) from e
+        finally:
+            timer.cancel()
+    return result.head(limit), len(result) > limit
+
+
+def table_columns():
+    """
+    Column names and SQL types of every queryable table
+
+    Returns:
+    --------
+    dict
+        Table name -> pd.DataFrame with 'column' and 'type'
+    """
+    tables = {}
+    with _engine_lock:
+        con = _connection()
+        names = [row[0] for row in con.execute(
+            "SELECT table_name FROM information_schema.tables ORDER BY table_name"
+        ).fetchall()]
+        for name in names:
+            described = con.sql(f'DESCRIBE "{name}"').df()
+            tables[name] = described[['column_name', 'column_type']].rename(
+                columns={'column_name': 'column', 'column_type': 'type'}
+            )
+    # Category columns show up as ENUMs listing every value
+    for described in tables.values():
+        described['type'] = described['type'].map(lambda t: re.sub(r"^ENUM\(.*\)$", "ENUM", t, flags=re.S))
+    return tables
@@ -1,6 +1,8 @@
 import pandas as pd
 import numpy as np
+from utils.profiling import profiled
 
+@profiled
 def calculate_mobility_work(df):
     """
     Calculate institutional mobility work including all upward mobility
@@ -28,4 +30,163 @@ def calculate_mobility_work(df):
     # Scale metrics for readability
     df['mobility_work'] = df['mobility_work'] * 100
     
-    return df
\ No newline at end of file
+    return df
+
+# Institution type grouping used by the mobility work comparison
+INSTITUTION_TYPES = {
+    1: 'Elite Private',
+    2: 'Elite Private',
+    3: 'Highly Selective Public',
+    4: 'Highly Selective Private',
+    5: 'Selective Public',
+    6: 'Selective Private'
+}
+
+@profiled
+def mobility_work_scores(df):
+    """
+    Mobility work plus the supporting metrics shown in the work analysis
+    
+    Adds mobility_work, avg_mobility_score, bottom_80_pct and
+    institution_type columns to a copy of the input
+    """
+    df_work = calculate_mobility_work(df.copy())
+    
+    # Average share of Q1 students moving up at least one quintile
+    df_work['avg_mobility_score'] = (
+        df_work['kq2_cond_parq1'] + 
+        df_work['kq3_cond_parq1'] + 
+        df_work['kq4_cond_parq1'] + 
+        df_work['kq5_cond_parq1']
+    ) * 25
+    
+    # Combined Q1-Q4 enrollment
+    df_work['bottom_80_pct'] = (
+        df_work['par_q1'] + 
+        df_work['par_q2'] + 
+        df_work['par_q3'] + 
+        df_work['par_q4']
+    )
+    
+    df_work['institution_type'] = df_work['tier'].map(INSTITUTION_TYPES).fillna('Other')
+    
+    return df_work
+
+# Mobility rate = access x success, per Opportunity Insights
+RATE_COMPONENTS = {
+    'mr_kq5_pq1': ('par_q1', 'kq5_cond_parq1'),
+    'mr_ktop1_pq1': ('par_q1', 'ktop1pc_cond_parq1'),
+}
+
+@profiled
+def mobility_rate_decomposition(df):
+    """
+    Access x success decomposition of both headline mobility rates, with
+    national and within-tier percentiles of every component
+    
+    Parameters:
+    -----------
+    df : pd.DataFrame
+        Mobility dataset with par_q1, kq5_cond_parq1, ktop1pc_cond_parq1,
+        mr_kq5_pq1 and mr_ktop1_pq1
+    
+    Returns:
+    --------
+    pd.DataFrame
+        One row per institution with the identifying columns, each rate and
+        component, and <column>_pct_national / <column>_pct_tier percentiles
+        (0-100, ties averaged)
+    """
+    values = ['par_q1', 'kq5_cond_parq1', 'ktop1pc_cond_parq1', 'mr_kq5_pq1', 'mr_ktop1_pq1']
+    board = df[['super_opeid', 'name', 'state', 'tier', 'count'] + values]
+    ranks = percentile_ranks(board, values, scopes=('national', 'tier'))
+    return pd.concat([board, ranks], axis=1).reset_index(drop=True)
+
+# Scope -> grouping column of percentile_ranks (None ranks over everything)
+RANK_SCOPES = {
+    'national': None,
+    'tier': 'tier',
+    'state': 'state'
+}
+
+@profiled
+def percentile_ranks(df, metrics, scopes=tuple(RANK_SCOPES)):
+    """
+    Percentile of every institution on every metric, nationally and within
+    groups, with one vectorized rank per scope
+    
+    Parameters:
+    -----------
+    df : pd.DataFrame
+        Institutions with the metric and grouping columns
+    metrics : list of str
+        Columns to rank (higher value -> higher percentile)
+    scopes : iterable of str
+        Keys of RANK_SCOPES
+    
+    Returns:
+    --------
+    pd.DataFrame
+        Aligned with df: <metric>_pct_<scope> (0-100, ties averaged, NaN for
+        missing values) and <metric>_n_<scope> (institutions in the group
+        with a value for the metric, i.e. the population ranked against)
+    """
+    values = df[metrics]
+    columns = []
+    for scope in scopes:
+        group_col = RANK_SCOPES[scope]
+        if group_col is None:
+            ranks = values.rank(pct=True)
+            counts = pd.DataFrame(
+                np.broadcast_to(values.count().to_numpy(), values.shape),
+                index=values.index, columns=values.columns
+            )
+        else:
+            grouped = values.groupby(df[group_col], observed=True)
+            ranks = grouped.rank(pct=True)
+            counts = grouped.transform('count')
+        columns.append((ranks * 100).add_suffix(f'_pct_{scope}'))
+        columns.append(counts.add_suffix(f'_n_{scope}'))
+    return pd.concat(columns, axis=1)
+
+# Metrics ranked for the institution profile: column -> (section, label)
+PROFILE_METRICS = {
+    **{f'q4q5_cond_parq{p}': ('Mobility', f'Q{p} → Q4+Q5 rate') for p in range(1, 6)},
+    **{f'kq5_cond_parq{p}': ('Mobility', f'Q{p} → Q5 rate') for p in range(1, 6)},
+    'mr_kq5_pq1': ('Mobility', 'Mobility rate (Q1 → Q5)'),
+    'mr_ktop1_pq1': ('Mobility', 'Mobility rate (Q1 → top 1%)'),
+    'count': ('Enrollment', 'Students per cohort'),
+    **{f'par_q{p}': ('Enrollment', f'Students from Q{p} families') for p in range(1, 6)},
+    'par_top1pc': ('Enrollment', 'Students from top 1% families'),
+    'par_toppt1pc': ('Enrollment', 'Students from top 0.1% families'),
+    'sticker_price_2013': ('Price', 'Published price (2013)'),
+    'scorecard_netprice_2013': ('Price', 'Net price (2013)'),
+}
+
+@profiled
+def institution_rank_table(df):
+    """
+    Percentile of every institution on every profile metric, nationally,
+    within its tier and within its state
+    
+    Parameters:
+    -----------
+    df : pd.DataFrame
+        Merged dataset (table2 with the 2013 prices)
+    
+    Returns:
+    --------
+    pd.DataFrame
+        Indexed by super_opeid: the PROFILE_METRICS values, their
+        <metric>_pct_<scope> percentiles and <metric>_n_<scope> counts of
+        institutions ranked
+    """
+    values = df[['super_opeid', 'tier', 'state']].copy()
+    for col in PROFILE_METRICS:
+        if col.startswith('q4q5_cond_parq'):
+            p = col[-1]
+            values[col] = df[f'kq4_cond_parq{p}'] + df[f'kq5_cond_parq{p}']
+        else:
+            values[col] = df[col]
+    ranks = percentile_ranks(values, list(PROFILE_METRICS))
+    return pd.concat([values, ranks], axis=1).set_index('super_opeid')
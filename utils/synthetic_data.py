@@ -0,0 +1,252 @@
+# utils/synthetic_data.py
+"""
+Synthetic Opportunity-Insights-shaped tables for scaling tests.
+
+Every synthetic institution starts from a randomly chosen real institution
+(its "template"), which keeps tier, tier_name, type, iclevel and geography
+consistent with each other. The probability blocks are then redrawn around
+the template's values:
+
+- kq1..kq5_cond_parq{p}: one Dirichlet draw per parent quintile (rows sum to 1)
+- par_q1..par_q5 and k_q1..k_q5: Dirichlet draws (sum to 1)
+- par_top*/k_top*/ktop1pc_cond_parq*: nested shares kept below their parents
+- mr_kq5_pq1, mr_ktop1_pq1: recomputed from their components
+
+table10 rows reuse the same super_opeid, so both tables join like the real
+ones. Output is generated and written in chunks, so memory use depends on
+--chunk-size, not on the number of rows. Example:
+
+    python -m utils.synthetic_data --institutions 2000000 --out data/synthetic
+    python -m utils.synthetic_data --institutions 200000 --cohorts 1980-1991 --out data/synthetic
+"""
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from utils.snapshot import DATA_DIR, MOBILITY_FILE, COST_FILE, COHORT_FILE
+
+QUINTILES = range(1, 6)
+PAR_Q = [f'par_q{p}' for p in QUINTILES]
+K_Q = [f'k_q{k}' for k in QUINTILES]
+PAR_TOP = ['par_top10pc', 'par_top5pc', 'par_top1pc', 'par_toppt1pc']
+K_TOP = ['k_top10pc', 'k_top5pc', 'k_top1pc']
+
+# Larger values keep draws closer to the template
+CONCENTRATION = 200.0
+COHORT_CONCENTRATION = 800.0
+
+
+def load_templates(data_dir=DATA_DIR, four_year_only=False):
+    """
+    Real table2 and table10 rows used as templates
+
+    Returns:
+    --------
+    tuple of pd.DataFrame
+        (table2, table10 aligned to table2 rows; NaN rows where unmatched)
+    """
+    mobility = pd.read_csv(os.path.join(data_dir, MOBILITY_FILE))
+    cost = pd.read_csv(os.path.join(data_dir, COST_FILE))
+    if four_year_only:
+        mobility = mobility[mobility['iclevel'] == 1]
+    mobility = mobility.reset_index(drop=True)
+    cost_aligned = (
+        cost.drop_duplicates('super_opeid')
+        .set_index('super_opeid')
+        .reindex(mobility['super_opeid'])
+        .reset_index()
+    )
+    return mobility, cost_aligned
+
+
+def _dirichlet_around(rng, probs, concentration):
+    """
+    One Dirichlet draw per row, centred on each row of probs
+    """
+    alpha = np.clip(np.nan_to_num(probs, nan=0.2), 1e-4, None) * concentration
+    draws = rng.gamma(alpha)
+    draws /= draws.sum(axis=1, keepdims=True)
+    return draws
+
+
+def _nested(rng, parent, template_child, template_parent):
+    """
+    Child share kept at the template's child/parent ratio (jittered), below parent
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = np.where(template_parent > 0, template_child / template_parent, 0.0)
+    ratio = np.clip(np.nan_to_num(ratio) * rng.lognormal(0, 0.1, size=len(ratio)), 0, 1)
+    return parent * ratio
+
+
+def _redraw_probabilities(rng, df, concentration):
+    """
+    Redraw every probability block of a table2-shaped frame in place
+    """
+    for p in QUINTILES:
+        cols = [f'kq{k}_cond_parq{p}' for k in QUINTILES]
+        df[cols] = _dirichlet_around(rng, df[cols].to_numpy(), concentration)
+
+    for block, tops in [(PAR_Q, PAR_TOP), (K_Q, K_TOP)]:
+        template_parent = df[block[-1]].to_numpy()
+        template_tops = {col: df[col].to_numpy() for col in tops}
+        df[block] = _dirichlet_around(rng, df[block].to_numpy(), concentration)
+        parent, parent_template = df[block[-1]].to_numpy(), template_parent
+        for col in tops:
+            df[col] = _nested(rng, parent, template_tops[col], parent_template)
+            parent, parent_template = df[col].to_numpy(), template_tops[col]
+
+    for p in QUINTILES:
+        col = f'ktop1pc_cond_parq{p}'
+        template_q5 = df[f'kq5_cond_parq{p}'].to_numpy()
+        df[col] = _nested(rng, template_q5, df[col].to_numpy(), template_q5)
+
+    df['mr_kq5_pq1'] = df['par_q1'] * df['kq5_cond_parq1']
+    df['mr_ktop1_pq1'] = df['par_q1'] * df['ktop1pc_cond_parq1']
+    return df
+
+
+def generate_chunks(n_institutions, chunk_size=100_000, seed=0, cohorts=None,
+                    cost_coverage=1.0, data_dir=DATA_DIR, four_year_only=False):
+    """
+    Yield synthetic (table2, table10) chunks
+
+    Parameters:
+    -----------
+    n_institutions : int
+        Total number of synthetic institutions
+    chunk_size : int
+        Institutions per chunk
+    seed : int
+        Random seed; the same arguments always give the same data
+    cohorts : sequence of int, optional
+        If given, table2 chunks hold one row per institution and cohort year
+        (with a `cohort` column after super_opeid) instead of one per institution
+    cost_coverage : float
+        Share of institutions that also appear in table10
+    four_year_only : bool
+        Only use four-year colleges (iclevel == 1) as templates
+
+    Yields:
+    -------
+    tuple of pd.DataFrame
+        (table2 chunk, table10 chunk)
+    """
+    templates, cost_templates = load_templates(data_dir, four_year_only)
+    rng = np.random.default_rng(seed)
+    cost_columns = cost_templates.columns
+
+    for start in range(0, n_institutions, chunk_size):
+        size = min(chunk_size, n_institutions - start)
+        picks = rng.integers(0, len(templates), size=size)
+        ids = np.arange(start + 1, start + size + 1)
+
+        mobility = templates.iloc[picks].reset_index(drop=True)
+        mobility['super_opeid'] = ids
+        mobility['name'] = [f"Synthetic Institution {i}" for i in ids]
+        mobility['count'] = mobility['count'] * rng.lognormal(0, 0.2, size=size)
+        mobility = _redraw_probabilities(rng, mobility, CONCENTRATION)
+
+        cost = cost_templates.iloc[picks].reset_index(drop=True)
+        cost['super_opeid'] = ids
+        cost['name'] = mobility['name']
+        cost['sticker_price_2013'] = (cost['sticker_price_2013'] * rng.lognormal(0, 0.05, size=size)).round()
+        # Templates without a table10 row still get one, from the same tier
+        for col in ['tier', 'tier_name', 'type', 'iclevel', 'state', 'region']:
+            cost[col] = mobility[col]
+        keep = rng.random(size) < cost_coverage
+        cost = cost.loc[keep, cost_columns]
+
+        if cohorts:
+            mobility = _expand_cohorts(rng, mobility, cohorts)
+
+        yield mobility, cost
+
+
+def _expand_cohorts(rng, mobility, cohorts):
+    """
+    One row per institution and cohort, redrawn around the institution's values
+    """
+    n_cohorts = len(cohorts)
+    expanded = mobility.loc[mobility.index.repeat(n_cohorts)].reset_index(drop=True)
+    expanded.insert(1, 'cohort', np.tile(np.asarray(cohorts), len(mobility)))
+    expanded['count'] = expanded['count'] / n_cohorts * rng.lognormal(0, 0.1, size=len(expanded))
+    return _redraw_probabilities(rng, expanded, COHORT_CONCENTRATION)
+
+
+def write_synthetic(out_dir, n_institutions, chunk_size=100_000, seed=0, cohorts=None,
+                    cost_coverage=1.0, data_dir=DATA_DIR, four_year_only=False):
+    """
+    Stream synthetic tables to CSV files in out_dir, one chunk at a time
+
+    Returns:
+    --------
+    dict
+        Output file path -> rows written
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    mobility_path = os.path.join(out_dir, COHORT_FILE if cohorts else MOBILITY_FILE)
+    cost_path = os.path.join(out_dir, COST_FILE)
+    rows = {mobility_path: 0, cost_path: 0}
+
+    chunks = generate_chunks(n_institutions, chunk_size, seed, cohorts,
+                             cost_coverage, data_dir, four_year_only)
+    for i, (mobility, cost) in enumerate(chunks):
+        mode = "w" if i == 0 else "a"
+        mobility.to_csv(mobility_path, mode=mode, header=(i == 0), index=False)
+        cost.to_csv(cost_path, mode=mode, header=(i == 0), index=False)
+        rows[mobility_path] += len(mobility)
+        rows[cost_path] += len(cost)
+    return rows
+
+
+def synthetic_merged_frame(n_institutions, seed=0, data_dir=DATA_DIR):
+    """
+    In-memory equivalent of merge_datasets() for n synthetic four-year
+    colleges, with the same compact dtypes as the snapshot
+    """
+    from utils.schema import apply_schema
+
+    merged = []
+    for mobility, cost in generate_chunks(n_institutions, seed=seed, data_dir=data_dir,
+                                          four_year_only=True):
+        merged.append(pd.merge(
+            mobility,
+            cost[['super_opeid', 'sticker_price_2013', 'scorecard_netprice_2013']],
+            on='super_opeid',
+            how='inner'
+        ))
+    return apply_schema(pd.concat(merged, ignore_index=True))
+
+
+def _parse_cohorts(value):
+    if not value:
+        return None
+    if "-" in value:
+        first, last = (int(v) for v in value.split("-"))
+        return list(range(first, last + 1))
+    return [int(v) for v in value.split(",")]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate synthetic Opportunity Insights tables")
+    parser.add_argument("--institutions", type=int, required=True,
+                        help="Number of synthetic institutions")
+    parser.add_argument("--out", required=True, help="Output directory")
+    parser.add_argument("--chunk-size", type=int, default=100_000,
+                        help="Institutions generated per chunk (default: 100000)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--cohorts", help="Cohort years, e.g. 1980-1991 or 1980,1985,1990")
+    parser.add_argument("--cost-coverage", type=float, default=1.0,
+                        help="Share of institutions present in table10 (default: 1.0)")
+    parser.add_argument("--four-year-only", action="store_true",
+                        help="Only use four-year colleges as templates")
+    args = parser.parse_args()
+
+    written = write_synthetic(args.out, args.institutions, args.chunk_size, args.seed,
+                              _parse_cohorts(args.cohorts), args.cost_coverage,
+                              four_year_only=args.four_year_only)
+    for path, n_rows in written.items():
+        print(f"{path}: {n_rows:,} rows")
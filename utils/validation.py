@@ -0,0 +1,209 @@
+# utils/validation.py
+"""
+Ingest-time validation of the mobility (table2) and cost (table10) tables.
+
+validate_tables() runs once per snapshot build (the "validation" artifact
+group in utils.snapshot) and every check is vectorized over all rows:
+
+- required columns are present
+- the kid-quintile probabilities of each parent quintile sum to ~1
+- the parent quintile shares sum to ~1
+- shares, rates and ranks stay within [0, 1]; counts and prices are positive
+- super_opeid is unique in both tables and every table2 institution joins
+  to table10
+
+The report is plain JSON stored in the snapshot's meta.json, so the
+verification view only displays it. Check it from the command line with:
+
+    python -m utils.validation
+"""
+import re
+
+import numpy as np
+import pandas as pd
+
+QUINTILES = range(1, 6)
+PAR_SHARE_COLUMNS = [f'par_q{p}' for p in QUINTILES]
+TENSOR_COLUMNS = [f'kq{k}_cond_parq{p}' for p in QUINTILES for k in QUINTILES]
+REQUIRED_COLUMNS = ['super_opeid', 'name', 'count'] + PAR_SHARE_COLUMNS + TENSOR_COLUMNS
+
+# Largest accepted |sum - 1| of a probability row
+SUM_TOLERANCE = 1e-3
+
+# Range rules: label, table, column pattern, lower bound, upper bound and
+# whether the lower bound itself is allowed (the upper bound always is)
+RANGE_RULES = [
+    ("Shares, rates and ranks in [0, 1]", 'mobility',
+     r'^(par_q\d|par_top\w+|par_rank|k_q\d|k_top\w+|k_rank\w*|k_0inc|k_married\w*|female'
+     r'|kq\d_cond_parq\d|ktop1pc_cond_parq\d|mr_\w+|shareimputed)$', 0.0, 1.0, True),
+    ("Cohort counts positive", 'mobility', r'^count$', 0.0, np.inf, False),
+    ("Prices non-negative", 'cost', r'^(sticker_price|scorecard_netprice)_\d{4}$', 0.0, np.inf, True),
+]
+
+# Failing rows kept in the report, per check
+MAX_FAILURES = 50
+
+CHECK_KEYS = ['check', 'scope', 'rows', 'missing', 'failures', 'worst', 'status']
+
+
+def missing_columns(df, required=REQUIRED_COLUMNS):
+    """
+    Required columns absent from df, in the order they are required
+    """
+    return list(pd.Index(required).difference(df.columns, sort=False))
+
+
+def _result(check, scope, rows, missing, failed, worst):
+    """
+    One row of the report
+    """
+    return {
+        'check': check,
+        'scope': scope,
+        'rows': int(rows),
+        'missing': int(missing),
+        'failures': int(failed),
+        'worst': None if worst is None or not np.isfinite(worst) else float(worst),
+        'status': 'pass' if failed == 0 else 'fail',
+    }
+
+
+def _failures(frame, mask, check, scope, values=None):
+    """
+    Up to MAX_FAILURES failing rows of one check, with the offending value
+    """
+    rows = np.flatnonzero(mask)[:MAX_FAILURES]
+    return [
+        {
+            'check': check,
+            'scope': scope,
+            'super_opeid': int(frame['super_opeid'].iat[i]),
+            'name': str(frame['name'].iat[i]) if 'name' in frame else '',
+            'value': None if values is None else float(values[i]),
+        }
+        for i in rows
+    ]
+
+
+def _sum_checks(frame, checks, failures):
+    """
+    Probability rows summing to ~1: one (n, 5, 5) sum for the transition
+    tensor and one (n, 5) sum for the parent shares
+    """
+    tensor = frame[TENSOR_COLUMNS].to_numpy(np.float64).reshape(-1, 5, 5)
+    deviations = [("Kid quintiles sum to 1", f"Parent Q{p}", tensor[:, p - 1].sum(axis=1))
+                  for p in QUINTILES]
+    deviations.append(("Parent shares sum to 1", "All institutions",
+                       frame[PAR_SHARE_COLUMNS].to_numpy(np.float64).sum(axis=1)))
+
+    for check, scope, sums in deviations:
+        error = np.abs(sums - 1)
+        missing = np.isnan(error)
+        failed = ~missing & (error > SUM_TOLERANCE)
+        worst = error[~missing].max() if (~missing).any() else None
+        checks.append(_result(check, scope, len(frame), missing.sum(), failed.sum(), worst))
+        failures.extend(_failures(frame, failed, check, scope, sums))
+
+
+def _range_checks(tables, checks, failures):
+    """
+    Every column of a rule compared against its bounds in one 2-D comparison
+    """
+    for check, table, pattern, low, high, low_inclusive in RANGE_RULES:
+        frame = tables[table]
+        columns = [c for c in frame.columns
+                   if re.match(pattern, c) and pd.api.types.is_numeric_dtype(frame[c])]
+        if not columns:
+            continue
+        values = frame[columns].to_numpy(np.float64)
+        missing = np.isnan(values)
+        below = values < low if low_inclusive else values <= low
+        outside = ~missing & (below | (values > high))
+        excess = np.where(outside, np.maximum(low - values, values - high), 0)
+        checks.append(_result(check, f"{len(columns)} {table} columns", len(frame),
+                              missing.any(axis=1).sum(), outside.any(axis=1).sum(),
+                              excess.max() if outside.any() else 0.0))
+        for j in np.flatnonzero(outside.any(axis=0)):
+            failures.extend(_failures(frame, outside[:, j], check, columns[j], values[:, j]))
+
+
+def _join_checks(mobility, cost, checks, failures):
+    """
+    super_opeid uniqueness in both tables and table2 -> table10 coverage
+    """
+    for table, frame in (('table2', mobility), ('table10', cost)):
+        duplicated = frame['super_opeid'].duplicated(keep=False).to_numpy()
+        checks.append(_result("super_opeid unique", table, len(frame), 0, duplicated.sum(), None))
+        failures.extend(_failures(frame, duplicated, "super_opeid unique", table))
+
+    unmatched = ~mobility['super_opeid'].isin(cost['super_opeid']).to_numpy()
+    check = "Joins to table10"
+    checks.append(_result(check, "table2 institutions", len(mobility), 0, unmatched.sum(),
+                          unmatched.mean() if len(mobility) else None))
+    failures.extend(_failures(mobility, unmatched, check, "table2 institutions"))
+
+
+def validate_tables(mobility, cost=None):
+    """
+    Validation report of the four-year mobility and cost tables
+
+    Parameters:
+    -----------
+    mobility : pd.DataFrame
+        table2 rows (four-year colleges)
+    cost : pd.DataFrame, optional
+        table10 rows (four-year colleges); join checks are skipped without it
+
+    Returns:
+    --------
+    dict
+        JSON-serializable report: 'rows', 'passed' (bool), 'checks' (one dict
+        per check with CHECK_KEYS; 'worst' is the largest deviation, excess
+        over a bound or unmatched share) and 'failures' (failing rows, at most
+        MAX_FAILURES per check and column)
+    """
+    checks, failures = [], []
+    tables = {'mobility': mobility, 'cost': cost if cost is not None else pd.DataFrame()}
+
+    missing = missing_columns(mobility)
+    checks.append(_result("Required columns present", "table2", len(REQUIRED_COLUMNS), 0,
+                          len(missing), None))
+    failures.extend({'check': "Required columns present", 'scope': col, 'super_opeid': None,
+                     'name': '', 'value': None} for col in missing)
+
+    if not missing:
+        _sum_checks(mobility, checks, failures)
+    _range_checks(tables, checks, failures)
+    if cost is not None and 'super_opeid' in mobility and 'super_opeid' in cost:
+        _join_checks(mobility, cost, checks, failures)
+
+    return {
+        'rows': int(len(mobility)),
+        'passed': all(c['status'] == 'pass' for c in checks),
+        'checks': checks,
+        'failures': failures,
+    }
+
+
+def report_frames(report):
+    """
+    The report's checks and failures as DataFrames for display
+    """
+    checks = pd.DataFrame(report['checks'], columns=CHECK_KEYS)
+    failures = pd.DataFrame(report['failures'],
+                            columns=['check', 'scope', 'super_opeid', 'name', 'value'])
+    return checks, failures
+
+
+if __name__ == "__main__":
+    from utils.snapshot import shared_snapshot
+
+    report = shared_snapshot().validation_report()
+    if report is None:
+        raise SystemExit("The current snapshot has no validation report; rebuild it with python -m utils.snapshot")
+    checks, failures = report_frames(report)
+    print(checks.to_string(index=False))
+    if not failures.empty:
+        print(f"\n{len(failures)} failing rows")
+        print(failures.to_string(index=False))
+    raise SystemExit(0 if report['passed'] else 1)
@@ -1,128 +1,98 @@
 import plotly.graph_objects as go
-import plotly.express as px
 import streamlit as st
 import numpy as np
 import pandas as pd
+from utils.profiling import profiled
+from utils.singleflight import coalesce
 
-def plot_mobility_ladder(df, tier1, tier2):
+# Comparison colors; the first two match the original two-tier charts
+GROUP_COLORS = ['#1a9850', '#1f77b4', '#ff7f0e', '#d62728', '#9467bd',
+                '#8c564b', '#e377c2', '#7f7f7f', '#bcbd22', '#17becf']
+
+LADDER_QUINTILES = ['Q5', 'Q4', 'Q3', 'Q2', 'Q1']
+
+def _ladder_values(row):
+    """
+    Individual and cumulative probabilities (%) from Q5 down to Q1 for one
+    group_ladders row
     """
-    Create mobility ladder plot and bar chart comparing two tiers
+    individual = np.array([row[f'kq{k}_cond_parq'] for k in range(5, 0, -1)], dtype=float) * 100
+    cumulative = np.cumsum(individual)
+    cumulative[-1] = 100
+    return individual, cumulative
+
+@profiled
+@coalesce
+def plot_mobility_ladder(df, *groups, group_col='tier', group_names=None):
+    """
+    Create mobility ladder plot and bar chart comparing any number of groups
     Returns both figures for display
+    
+    Parameters:
+    -----------
+    df : pd.DataFrame
+        Output from create_mobility_ladder()
+    *groups : str
+        Group labels to compare, in order; "All" is every row of df
+    group_col : str
+        Column holding the group id of each row ('tier', 'type', 'state',
+        'cluster', ...)
+    group_names : dict, optional
+        Group id -> label; defaults to the tier names
+    
+    Returns:
+    --------
+    tuple
+        (line figure, bar figure, group_ladders rows of the compared groups)
     """
-    tier_map = {
-        1: "Ivy Plus",
-        2: "Other elite schools",
-        3: "Highly selective public",
-        4: "Highly selective private",
-        5: "Selective public",
-        6: "Selective private",
-        7: "Nonselective 4-year public",
-        8: "Nonselective 4-year private",
-        10: "Four-year for-profit"
-    }
+    from utils.mobility_utils import TIER_NAMES, group_ladders
+    
+    group_label = "Tier" if group_col == 'tier' else "Group"
+    names = group_names if group_names is not None else TIER_NAMES
+    
+    # Every group's ladder in one aggregation, then pick the compared ones
+    all_ladders = group_ladders(df, df[group_col], names)
+    ladders = all_ladders.loc[[g for g in dict.fromkeys(groups) if g in all_ladders.index]]
+    ladders = ladders[ladders['colleges'] > 0]
     
-    # Create line plot
     fig_line = go.Figure()
-    # Create bar plot
     fig_bar = go.Figure()
-    college_data = {}
     
-    # Process both tiers
-    for tier_name, color in [(tier1, '#1a9850'), (tier2, '#1f77b4')]:
-        if tier_name == "All":
-            tier_df = df.copy()
-            college_data[tier_name] = tier_df
-        else:
-            try:
-                tier_id = next(k for k, v in tier_map.items() if v == tier_name)
-                tier_df = df[df['tier'] == tier_id].copy()
-                college_data[tier_name] = tier_df
-            except StopIteration:
-                continue
-            
-        if len(tier_df) == 0:
-            continue
-            
-        # Calculate probabilities using new generic column names
-        q5_prob = tier_df['kq5_cond_parq'].mean()
-        q4_prob = tier_df['kq4_cond_parq'].mean()
-        q3_prob = tier_df['kq3_cond_parq'].mean()
-        q2_prob = tier_df['kq2_cond_parq'].mean()
-        q1_prob = tier_df['kq1_cond_parq'].mean()
-        
-        # Calculate Q4+Q5 probability
-        q4q5_prob = (q5_prob + q4_prob) * 100
+    for i, (name, row) in enumerate(ladders.iterrows()):
+        color = GROUP_COLORS[i % len(GROUP_COLORS)]
+        individual, cumulative = _ladder_values(row)
+        q4q5_prob = row['q4q5'] * 100
+        avg_q1_pct = row['par_q'] * 100
         
-        # Calculate average bottom quintile enrollment if column exists
-        avg_q1_pct = tier_df['par_q'].mean() * 100 if 'par_q' in tier_df.columns else 0
-        
-        # Create cumulative probabilities for line plot
-        x = ['Q5', 'Q4', 'Q3', 'Q2', 'Q1']
-        y_cumulative = [
-            q5_prob * 100,
-            q4q5_prob,  # This is the Q4+Q5 point
-            (q5_prob + q4_prob + q3_prob) * 100,
-            (q5_prob + q4_prob + q3_prob + q2_prob) * 100,
-            100
-        ]
-        
-        # Individual probabilities for bar plot
-        y_individual = [
-            q5_prob * 100,
-            q4_prob * 100,
-            q3_prob * 100,
-            q2_prob * 100,
-            q1_prob * 100
-        ]
-        
-        # Add line plot trace
         hover_text = [
-            "Tier: " + tier_name,
+            f"{group_label}: " + name,
             "Quintile: %{x}",
             "Cumulative Probability: %{y:.1f}%",
-            "Colleges: " + str(len(tier_df))
+            f"Colleges: {row['colleges']}"
         ]
         if avg_q1_pct > 0:
             hover_text.append(f"Avg Q1 Students: {avg_q1_pct:.1f}%")
         hover_text.append("<extra></extra>")
         
         fig_line.add_trace(go.Scatter(
-            x=x, y=y_cumulative,
+            x=LADDER_QUINTILES, y=cumulative,
             mode='lines+markers',
-            name=f"{tier_name} (n={len(tier_df)})",
+            name=f"{name} (n={row['colleges']})",
             line=dict(color=color, width=2),
             marker=dict(size=8),
             hovertemplate="<br>".join(hover_text)
         ))
         
-        # Add annotation for Q4+Q5 with different placement for each tier
-        if tier_name == tier1:
-            # First tier annotation (left side, pointing down-right)
+        # Q4+Q5 callouts, left and right, while they still fit
+        if len(ladders) <= 2:
             fig_line.add_annotation(
                 x='Q4',
                 y=q4q5_prob,
                 text=f"Q4+Q5 = {q4q5_prob:.1f}%",
                 showarrow=True,
                 arrowhead=1,
-                ax=-60,  # Move box to the left
-                ay=-60,  # Move box down
-                font=dict(color=color),
-                bordercolor=color,
-                borderwidth=2,
-                borderpad=4,
-                bgcolor="white",
-                opacity=0.8
-            )
-        else:
-            # Second tier annotation (right side, as before but longer arrow)
-            fig_line.add_annotation(
-                x='Q4',
-                y=q4q5_prob,
-                text=f"Q4+Q5 = {q4q5_prob:.1f}%",
-                showarrow=True,
-                arrowhead=1,
-                ax=60,   # Longer arrow to the right
-                ay=-60,  # Longer arrow up
+                ax=-60 if i == 0 else 60,
+                ay=-60,
                 font=dict(color=color),
                 bordercolor=color,
                 borderwidth=2,
@@ -131,14 +101,13 @@ def plot_mobility_ladder(df, tier1, tier2):
                 opacity=0.8
             )
         
-        # Add bar plot trace
         fig_bar.add_trace(go.Bar(
-            x=x,
-            y=y_individual,
-            name=f"{tier_name} (n={len(tier_df)})",
+            x=LADDER_QUINTILES,
+            y=individual,
+            name=f"{name} (n={row['colleges']})",
             marker_color=color,
             hovertemplate="<br>".join([
-                "Tier: " + tier_name,
+                f"{group_label}: " + name,
                 "Quintile: %{x}",
                 "Probability: %{y:.1f}%",
                 "<extra></extra>"
@@ -152,7 +121,7 @@ def plot_mobility_ladder(df, tier1, tier2):
         yaxis_title="Cumulative Probability (%)",
         yaxis_range=[0, 100],
         xaxis_categoryorder='array',
-        xaxis_categoryarray=['Q5', 'Q4', 'Q3', 'Q2', 'Q1'],
+        xaxis_categoryarray=LADDER_QUINTILES,
         showlegend=True
     )
     
@@ -163,16 +132,79 @@ def plot_mobility_ladder(df, tier1, tier2):
         yaxis_title="Probability (%)",
         yaxis_range=[0, 100],
         xaxis_categoryorder='array',
-        xaxis_categoryarray=['Q5', 'Q4', 'Q3', 'Q2', 'Q1'],
+        xaxis_categoryarray=LADDER_QUINTILES,
         barmode='group'
     )
     
-    return fig_line, fig_bar, college_data
+    return fig_line, fig_bar, ladders
+
+@profiled
+def plot_ladder_small_multiples(ladders, cumulative=True, reference=None, columns=3):
+    """
+    One small panel per group ladder on shared axes
+    
+    Parameters:
+    -----------
+    ladders : pd.DataFrame
+        group_ladders rows, one panel each
+    cumulative : bool
+        Cumulative (line) or individual (bar) probabilities
+    reference : pd.Series, optional
+        Ladder drawn as a dotted line in every panel, e.g. the "All" row
+    columns : int
+        Panels per row
+    """
+    from plotly.subplots import make_subplots
+    
+    rows = max(1, -(-len(ladders) // columns))
+    fig = make_subplots(
+        rows=rows, cols=columns,
+        subplot_titles=[f"{name} (n={row['colleges']})" for name, row in ladders.iterrows()],
+        shared_yaxes=True,
+        vertical_spacing=0.3 / rows,
+        horizontal_spacing=0.04
+    )
+    if reference is not None:
+        ref_individual, ref_cumulative = _ladder_values(reference)
+        ref_values = ref_cumulative if cumulative else ref_individual
+    
+    for i, (name, row) in enumerate(ladders.iterrows()):
+        position = dict(row=i // columns + 1, col=i % columns + 1)
+        color = GROUP_COLORS[i % len(GROUP_COLORS)]
+        individual, cumulative_values = _ladder_values(row)
+        if cumulative:
+            trace = go.Scatter(x=LADDER_QUINTILES, y=cumulative_values, mode='lines+markers',
+                               line=dict(color=color, width=2), marker=dict(size=6))
+        else:
+            trace = go.Bar(x=LADDER_QUINTILES, y=individual, marker_color=color)
+        trace.update(name=name, showlegend=False,
+                     hovertemplate=name + "<br>%{x}: %{y:.1f}%<extra></extra>")
+        fig.add_trace(trace, **position)
+        if reference is not None:
+            fig.add_trace(go.Scatter(
+                x=LADDER_QUINTILES, y=ref_values, mode='lines',
+                line=dict(color='gray', dash='dot', width=1),
+                name=reference.name, showlegend=i == 0,
+                hovertemplate=f"{reference.name}<br>%{{x}}: %{{y:.1f}}%<extra></extra>"
+            ), **position)
+    
+    fig.update_yaxes(range=[0, 100] if cumulative else [0, max(60, ladders.filter(like='kq').max().max() * 110)])
+    fig.update_xaxes(categoryorder='array', categoryarray=LADDER_QUINTILES)
+    fig.update_layout(
+        title="Cumulative Probabilities by Group" if cumulative else "Individual Probabilities by Group",
+        height=80 + 240 * rows,
+        margin=dict(t=100)
+    )
+    return fig
 
+@profiled
 def plot_cost_mobility(df):
     """
     Create scatter plot of cost vs mobility
     """
+    # plotly.express is slow to import and only needed here
+    import plotly.express as px
+    
     fig = px.scatter(
         df,
         x='sticker_price_2013',
@@ -357,6 +389,7 @@ def plot_mobility_ladder_cdf(df):
                 - Total: 100%
                 """)
 
+@profiled
 def plot_mobility_sankey(df, tier_name):
     """
     Create a Sankey diagram showing student flows between quintiles
@@ -406,6 +439,7 @@ def plot_mobility_sankey(df, tier_name):
     
     return fig
 
+@profiled
 def plot_mobility_alluvial(df, tier_name):
     """
     Create an alluvial plot showing transitions between quintiles
@@ -458,6 +492,7 @@ def plot_mobility_alluvial(df, tier_name):
     
     return fig
 
+@profiled
 def plot_mobility_area(df, tier_name):
     """
     Create a stacked area chart showing cumulative probabilities
@@ -495,4 +530,83 @@ def plot_mobility_area(df, tier_name):
         height=400
     )
     
-    return fig
\ No newline at end of file
+    return fig
+
+@profiled
+def plot_enrollment_distribution(distribution, tier_name):
+    """
+    Create bar chart of parent income distribution with a cumulative line
+    
+    Parameters:
+    -----------
+    distribution : dict
+        Output of enrollment_distribution(): quintiles, top_pcts, cumulative
+    tier_name : str
+        Label used in the chart title
+    """
+    cumulative_values = distribution['cumulative']
+    
+    # Create bar chart
+    fig = go.Figure()
+    
+    # Create x-axis labels including both top percentiles
+    x_labels = [f'Q{i}' for i in range(1, 6)] + ['Top 1%', 'Top 0.1%']
+    
+    # Create y-values including both top percentiles
+    y_values = distribution['quintiles'] + distribution['top_pcts']
+    
+    # Add bars first (lower layer)
+    fig.add_trace(go.Bar(
+        x=x_labels,
+        y=y_values,
+        text=[f'{val:.1f}%' for val in y_values],
+        textposition='auto',
+        marker_color='#1f77b4',
+        width=0.3,
+        name='Enrollment'
+    ))
+    
+    # Add cumulative line with offset to appear above bars
+    offset = 5  # Increased base offset
+    
+    # Create custom offsets for each point
+    custom_offsets = [
+        offset + 5,  # Increased space for Q1 (first point)
+        offset,      # Regular offset for Q2
+        offset,      # Regular offset for Q3
+        offset,      # Regular offset for Q4
+        offset - 3   # Negative offset for Q5 (last point)
+    ]
+    
+    fig.add_trace(go.Scatter(
+        x=x_labels[:5],  # Only quintiles, not top percentiles
+        y=[val + offset for val, offset in zip(cumulative_values, custom_offsets)],
+        mode='lines+markers+text',
+        text=[f'{val:.1f}%' for val in cumulative_values],
+        textposition=['top center', 'top center', 'top center', 'top center', 'bottom right'],  # Changed last label to bottom
+        line=dict(color='#e74c3c', width=2),
+        marker=dict(size=8),
+        name='Cumulative',
+        hovertemplate="Cumulative: %{text}<extra></extra>"
+    ))
+    
+    # Update layout with increased y-range
+    fig.update_layout(
+        title=f"Parent Income Distribution - {tier_name}",
+        xaxis_title="Parent Income Group",
+        yaxis_title="Percentage of Students",
+        yaxis_range=[0, max(max(y_values), max(cumulative_values) + max(custom_offsets) + 2)],  # Adjusted range
+        showlegend=True,
+        height=400,
+        bargap=0.2,
+        width=800,
+        margin=dict(l=50, r=50, t=50, b=50),  # Added top and bottom margins
+        legend=dict(
+            yanchor="top",
+            y=0.99,
+            xanchor="right",
+            x=0.99
+        )
+    )
+    
+    return fig
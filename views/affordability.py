@@ -1,7 +1,11 @@
 import streamlit as st
 from utils.data_utils import merge_datasets
 import plotly.express as px
+import plotly.graph_objects as go
 import pandas as pd
+from utils.affordability_utils import QUADRANTS, add_affordability_columns, assign_quadrants
+from utils.profiling import stage
+from views.export import show_export_controls
 
 def show_affordability_analysis(df=None, parent_quintile=1):
     """
@@ -18,31 +22,8 @@ def show_affordability_analysis(df=None, parent_quintile=1):
         df = merge_datasets()
     
     if df is not None:
-        def get_group_and_subgroup(row):
-            if row['tier'] in [1, 2]:
-                group = 'Elite'
-                subgroup = 'Ivy Plus' if row['tier'] == 1 else 'Other Elite'
-            elif row['tier'] in [3, 4]:
-                group = 'Highly Selective'
-                subgroup = 'Public' if row['tier'] == 3 else 'Private'
-            elif row['tier'] in [5, 6]:
-                group = 'Selective'
-                subgroup = 'Public' if row['tier'] == 5 else 'Private'
-            elif row['tier'] in [7, 8]:
-                group = 'Nonselective'
-                subgroup = 'Public' if row['tier'] == 7 else 'Private'
-            elif row['tier'] == 10:
-                group = 'Four-year for-profit'
-                subgroup = 'For-profit'
-            return pd.Series([group, subgroup])
-        
-        df[['group', 'subgroup']] = df.apply(get_group_and_subgroup, axis=1)
-        
-        # Update mobility rate calculation for selected parent quintile
-        df['mobility_rate'] = (
-            df[f'kq4_cond_parq{parent_quintile}'] + 
-            df[f'kq5_cond_parq{parent_quintile}']
-        )
+        # Group/subgroup labels and Q4+Q5 mobility rate for the selected parent quintile
+        add_affordability_columns(df, parent_quintile)
         
         st.sidebar.header("Filters")
         
@@ -56,6 +37,27 @@ def show_affordability_analysis(df=None, parent_quintile=1):
             default=["All"],
             help="Select one or more institution groups to compare"
         )
+        if not selected_groups:
+            st.info("Select at least one institution group.")
+            return
+        
+        # Pareto frontier: cheapest institutions for each attainable mobility rate
+        st.sidebar.markdown("### Price–Mobility Frontier")
+        show_frontier = st.sidebar.checkbox(
+            "Show frontier",
+            value=True,
+            help="Institutions that no other institution beats on both price and mobility rate"
+        )
+        frontier_prices = {
+            "Sticker Price": 'sticker_price_2013',
+            "Net Price": 'scorecard_netprice_2013'
+        }
+        frontier_price = st.sidebar.radio(
+            "Frontier Price",
+            options=list(frontier_prices.keys()),
+            horizontal=True,
+            disabled=not show_frontier
+        )
         
         # Modify the filtering logic
         if "All" in selected_groups:
@@ -187,7 +189,57 @@ def show_affordability_analysis(df=None, parent_quintile=1):
             ])
         )
         
-        st.plotly_chart(fig, use_container_width=True)
+        if show_frontier:
+            from utils.artifacts import affordability_frontier
+            price_col = frontier_prices[frontier_price]
+            groups = () if "All" in selected_groups else tuple(sorted(selected_groups))
+            frontier = affordability_frontier(parent_quintile, groups, price_col)
+            
+            # Staircase through the frontier schools; on the net price basis
+            # they are only marked, since the x axis is the sticker price
+            fig.add_trace(go.Scatter(
+                x=frontier['sticker_price_2013'],
+                y=frontier['mobility_rate'],
+                mode='lines+markers' if price_col == 'sticker_price_2013' else 'markers',
+                line=dict(color='black', width=2, shape='hv'),
+                marker=dict(symbol='star', size=14, color='gold', line=dict(color='black', width=1)),
+                name=f"Frontier ({frontier_price.lower()})",
+                text=frontier['name'],
+                customdata=frontier[price_col],
+                hovertemplate="<br>".join([
+                    "<b>%{text}</b>",
+                    f"{frontier_price}: $%{{customdata:,.0f}}",
+                    "Mobility Rate: %{y:.1%}",
+                    "<extra>Frontier</extra>"
+                ])
+            ))
+        
+        with stage("serialize chart"):
+            st.plotly_chart(fig, use_container_width=True)
+        
+        if show_frontier:
+            st.markdown("### Frontier Schools")
+            st.markdown(f"""
+            No other institution{'' if groups == () else ' in the selected groups'} offers a higher
+            Q4+Q5 mobility rate for Q{parent_quintile} students at the same or lower {frontier_price.lower()}.
+            """)
+            st.dataframe(
+                frontier[['name', 'subgroup', 'sticker_price_2013', 'scorecard_netprice_2013', 'mobility_rate']]
+                .rename(columns={
+                    'name': 'Institution',
+                    'subgroup': 'Type',
+                    'sticker_price_2013': 'Sticker Price',
+                    'scorecard_netprice_2013': 'Net Price',
+                    'mobility_rate': 'Mobility Rate'
+                })
+                .style.format({
+                    'Sticker Price': '${:,.0f}',
+                    'Net Price': '${:,.0f}',
+                    'Mobility Rate': '{:.1%}'
+                }),
+                hide_index=True,
+                use_container_width=True
+            )
         
         st.markdown("### Summary Statistics")
         col1, col2, col3 = st.columns(3)
@@ -202,14 +254,12 @@ def show_affordability_analysis(df=None, parent_quintile=1):
                      f"{global_median_mobility:.1%}")
         
         st.markdown("### Quadrant Distribution")
-        q1 = len(plot_df[(plot_df['sticker_price_2013'] > global_median_price) & 
-                        (plot_df['mobility_rate'] > global_median_mobility)])
-        q2 = len(plot_df[(plot_df['sticker_price_2013'] < global_median_price) & 
-                        (plot_df['mobility_rate'] > global_median_mobility)])
-        q3 = len(plot_df[(plot_df['sticker_price_2013'] > global_median_price) & 
-                        (plot_df['mobility_rate'] < global_median_mobility)])
-        q4 = len(plot_df[(plot_df['sticker_price_2013'] < global_median_price) & 
-                        (plot_df['mobility_rate'] < global_median_mobility)])
+        plot_df['quadrant'] = assign_quadrants(plot_df, global_median_price, global_median_mobility)
+        quadrant_counts = plot_df['quadrant'].value_counts()
+        q1 = quadrant_counts.get('High Mobility, High Cost', 0)
+        q2 = quadrant_counts.get('High Mobility, Low Cost', 0)
+        q3 = quadrant_counts.get('Low Mobility, High Cost', 0)
+        q4 = quadrant_counts.get('Low Mobility, Low Cost', 0)
         
         col1, col2 = st.columns(2)
         with col1:
@@ -227,12 +277,7 @@ def show_affordability_analysis(df=None, parent_quintile=1):
 
         st.markdown("### Institution Lists by Quadrant")
         
-        tab1, tab2, tab3, tab4 = st.tabs([
-            "High Mobility, Low Cost", 
-            "High Mobility, High Cost",
-            "Low Mobility, Low Cost",
-            "Low Mobility, High Cost"
-        ])
+        tabs = st.tabs(QUADRANTS)
         
         # Update labels for the quadrant lists
         column_labels = {
@@ -244,98 +289,30 @@ def show_affordability_analysis(df=None, parent_quintile=1):
         }
 
         # Update display for each quadrant
-        with tab1:
-            high_mob_low_cost = plot_df[
-                (plot_df['sticker_price_2013'] < global_median_price) & 
-                (plot_df['mobility_rate'] > global_median_mobility)
-            ].copy()
-            
-            if not high_mob_low_cost.empty:
-                display_df = high_mob_low_cost[['name', 'subgroup', 'sticker_price_2013', 'mobility_rate', f'par_q{parent_quintile}']].copy()
-                display_df = display_df.rename(columns=column_labels)
-                st.dataframe(
-                    display_df.sort_values('Mobility Rate', ascending=False)
-                    .reset_index(drop=True)
-                    .assign(Rank=lambda x: range(1, len(x) + 1))
-                    .set_index('Rank')
-                    .style.format({
-                        'Sticker Price': '${:,.0f}',
-                        'Mobility Rate': '{:.1%}',
-                        f'Q{parent_quintile} Students': '{:.1%}'
-                    }),
-                    use_container_width=True
-                )
-            else:
-                st.write("No institutions in this quadrant")
-        
-        with tab2:
-            high_mob_high_cost = plot_df[
-                (plot_df['sticker_price_2013'] > global_median_price) & 
-                (plot_df['mobility_rate'] > global_median_mobility)
-            ].copy()
-            
-            if not high_mob_high_cost.empty:
-                display_df = high_mob_high_cost[['name', 'subgroup', 'sticker_price_2013', 'mobility_rate', f'par_q{parent_quintile}']].copy()
-                display_df = display_df.rename(columns=column_labels)
-                st.dataframe(
-                    display_df.sort_values('Mobility Rate', ascending=False)
-                    .reset_index(drop=True)
-                    .assign(Rank=lambda x: range(1, len(x) + 1))
-                    .set_index('Rank')
-                    .style.format({
-                        'Sticker Price': '${:,.0f}',
-                        'Mobility Rate': '{:.1%}',
-                        f'Q{parent_quintile} Students': '{:.1%}'
-                    }),
-                    use_container_width=True
-                )
-            else:
-                st.write("No institutions in this quadrant")
-        
-        with tab3:
-            low_mob_low_cost = plot_df[
-                (plot_df['sticker_price_2013'] < global_median_price) & 
-                (plot_df['mobility_rate'] < global_median_mobility)
-            ].copy()
-            
-            if not low_mob_low_cost.empty:
-                display_df = low_mob_low_cost[['name', 'subgroup', 'sticker_price_2013', 'mobility_rate', f'par_q{parent_quintile}']].copy()
-                display_df = display_df.rename(columns=column_labels)
-                st.dataframe(
-                    display_df.sort_values('Mobility Rate', ascending=False)
-                    .reset_index(drop=True)
-                    .assign(Rank=lambda x: range(1, len(x) + 1))
-                    .set_index('Rank')
-                    .style.format({
-                        'Sticker Price': '${:,.0f}',
-                        'Mobility Rate': '{:.1%}',
-                        f'Q{parent_quintile} Students': '{:.1%}'
-                    }),
-                    use_container_width=True
-                )
-            else:
-                st.write("No institutions in this quadrant")
-        
-        with tab4:
-            low_mob_high_cost = plot_df[
-                (plot_df['sticker_price_2013'] > global_median_price) & 
-                (plot_df['mobility_rate'] < global_median_mobility)
-            ].copy()
-            
-            if not low_mob_high_cost.empty:
-                display_df = low_mob_high_cost[['name', 'subgroup', 'sticker_price_2013', 'mobility_rate', f'par_q{parent_quintile}']].copy()
-                display_df = display_df.rename(columns=column_labels)
-                st.dataframe(
-                    display_df.sort_values('Mobility Rate', ascending=False)
-                    .reset_index(drop=True)
-                    .assign(Rank=lambda x: range(1, len(x) + 1))
-                    .set_index('Rank')
-                    .style.format({
-                        'Sticker Price': '${:,.0f}',
-                        'Mobility Rate': '{:.1%}',
-                        f'Q{parent_quintile} Students': '{:.1%}'
-                    }),
-                    use_container_width=True
-                )
-            else:
-                st.write("No institutions in this quadrant")
+        for tab, quadrant in zip(tabs, QUADRANTS):
+            with tab:
+                quadrant_df = plot_df[plot_df['quadrant'] == quadrant]
+                
+                if not quadrant_df.empty:
+                    display_df = quadrant_df[['name', 'subgroup', 'sticker_price_2013', 'mobility_rate', f'par_q{parent_quintile}']].copy()
+                    display_df = display_df.rename(columns=column_labels)
+                    st.dataframe(
+                        display_df.sort_values('Mobility Rate', ascending=False)
+                        .reset_index(drop=True)
+                        .assign(Rank=lambda x: range(1, len(x) + 1))
+                        .set_index('Rank')
+                        .style.format({
+                            'Sticker Price': '${:,.0f}',
+                            'Mobility Rate': '{:.1%}',
+                            f'Q{parent_quintile} Students': '{:.1%}'
+                        }),
+                        use_container_width=True
+                    )
+                    show_export_controls(
+                        quadrant_df[['super_opeid', 'name', 'subgroup', 'sticker_price_2013', 'mobility_rate', f'par_q{parent_quintile}']]
+                        .sort_values('mobility_rate', ascending=False),
+                        file_stem=f"{quadrant.lower().replace(', ', '_').replace(' ', '_')}_q{parent_quintile}",
+                        key=f"export_{quadrant}"
+                    )
+                else:
+                    st.write("No institutions in this quadrant")
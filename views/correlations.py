@@ -0,0 +1,128 @@
+import plotly.graph_objects as go
+import streamlit as st
+from utils.correlation_utils import ACCESS_OUTCOMES, COVARIATE_LABELS, outcome_labels
+from utils.mobility_utils import TIER_NAMES
+from utils.profiling import stage
+
+# Cells with fewer institution pairs than this are left blank by default
+MIN_PAIRS = 30
+
+INSTITUTION_GROUPS = {
+    "Public": 1,
+    "Private Non-Profit": 2,
+    "For-Profit": 3
+}
+
+
+def show_covariate_correlations():
+    """
+    Correlations between the table10 institutional covariates and the
+    mobility outcomes, as a sortable heatmap
+    """
+    from utils.artifacts import covariate_correlation_matrix
+
+    st.title("Covariate Correlations")
+
+    st.markdown("""
+    How do institutional characteristics (selectivity, prices, graduation rates, spending, faculty
+    salaries, student body and majors) relate to access and mobility outcomes? Each cell is the
+    correlation between a covariate and an outcome across the institutions in the current filter,
+    using every institution that reports both.
+    """)
+
+    # Filters
+    st.sidebar.markdown("### Filters")
+    selected_tiers = st.sidebar.multiselect(
+        "Tiers",
+        options=list(TIER_NAMES.values()),
+        help="Leave empty to include every tier"
+    )
+    selected_groups = st.sidebar.multiselect(
+        "Institution Group",
+        options=list(INSTITUTION_GROUPS),
+        help="Leave empty to include every group"
+    )
+    min_q1_pct = st.sidebar.slider(
+        "Minimum % of Bottom Quintile Students",
+        min_value=0,
+        max_value=20,
+        value=0
+    )
+
+    # Display settings
+    st.sidebar.markdown("### Correlation")
+    method = st.sidebar.radio("Method", ["Pearson", "Spearman"], horizontal=True)
+    quintile = st.sidebar.selectbox(
+        "Parent Income Quintile",
+        ["All", "Q1", "Q2", "Q3", "Q4", "Q5"],
+        help="Which parent quintile's outcomes to show; access outcomes are always shown"
+    )
+    min_pairs = st.sidebar.slider(
+        "Minimum Institutions per Cell",
+        min_value=3,
+        max_value=100,
+        value=MIN_PAIRS,
+        help="Correlations over fewer institutions are left blank"
+    )
+
+    tiers = tuple(t for t, name in TIER_NAMES.items() if name in selected_tiers)
+    types = tuple(INSTITUTION_GROUPS[g] for g in selected_groups)
+    try:
+        matrices = covariate_correlation_matrix(tiers, types, min_q1_pct)
+    except Exception as e:
+        st.error(f"Error computing correlations: {e}")
+        return
+
+    outcomes = dict(ACCESS_OUTCOMES)
+    for p in (range(1, 6) if quintile == "All" else [int(quintile[1])]):
+        outcomes.update(outcome_labels(p))
+
+    n = matrices['n'][list(outcomes)]
+    corr = matrices[method.lower()][list(outcomes)].where(n >= min_pairs)
+    if corr.isna().all().all():
+        st.info(f"Fewer than {min_pairs} institutions match the current filters.")
+        return
+
+    sort_by = st.selectbox(
+        "Sort Covariates By",
+        ["Covariate"] + list(outcomes.values()),
+        index=1 + list(outcomes).index(next(c for c in outcomes if c.startswith('q4q5'))),
+        help="Outcome columns sort by the strength of the correlation (absolute value)"
+    )
+    if sort_by == "Covariate":
+        order = sorted(corr.index, key=COVARIATE_LABELS.get)
+    else:
+        column = next(c for c, label in outcomes.items() if label == sort_by)
+        order = corr[column].abs().sort_values(ascending=False, na_position='last').index
+    corr = corr.loc[order]
+    n = n.loc[order]
+
+    # Heatmap, strongest correlations at the top
+    fig = go.Figure(go.Heatmap(
+        z=corr.to_numpy(),
+        x=list(outcomes.values()),
+        y=[COVARIATE_LABELS[c] for c in corr.index],
+        customdata=n.to_numpy(),
+        zmin=-1,
+        zmax=1,
+        colorscale='RdBu',
+        colorbar=dict(title=method),
+        hovertemplate="%{y}<br>%{x}<br>r = %{z:.3f}<br>Institutions: %{customdata}<extra></extra>"
+    ))
+    fig.update_layout(
+        title=f"{method} Correlation with Mobility Outcomes",
+        height=max(500, 22 * len(corr) + 200),
+        yaxis=dict(autorange='reversed'),
+        xaxis=dict(side='top', tickangle=-45)
+    )
+    with stage("serialize chart"):
+        st.plotly_chart(fig, use_container_width=True)
+
+    st.caption(
+        f"Pairwise correlations over institutions reporting both values; cells with fewer than "
+        f"{min_pairs} institutions are blank. Click a column header below to sort."
+    )
+
+    table = corr.rename(index=COVARIATE_LABELS, columns=outcomes).round(3)
+    table.index.name = 'Covariate'
+    st.dataframe(table, use_container_width=True)
@@ -0,0 +1,116 @@
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+import streamlit as st
+from utils.profiling import stage
+
+
+def show_counterfactual_simulator():
+    """
+    Show the counterfactual enrollment simulator: shift the parent income
+    mix of selected tiers and compare the resulting tier and national
+    outcomes with the data
+    """
+    from utils.counterfactual import QUINTILE_LABELS, outcome_tables, simulate, simulation_inputs
+
+    st.title("Counterfactual Enrollment Simulator")
+
+    st.markdown("""
+    What if selective colleges enrolled more students from low-income families? Shift the share of
+    students from each parent income quintile in the tiers you pick and see how the student-weighted
+    outcomes of each tier and of all four-year colleges would change.
+    """)
+
+    try:
+        inputs = simulation_inputs()
+    except Exception as e:
+        st.error(f"Error loading data: {e}")
+        return
+    tier_names = inputs['tier_names']
+
+    # Scenario controls
+    st.sidebar.markdown("### Scenario")
+    selected_tiers = st.sidebar.multiselect(
+        "Tiers to Reweight",
+        options=tier_names,
+        default=tier_names[:4],
+        help="Every institution in these tiers gets the same shift in its parent income shares"
+    )
+    shift_pp = [
+        st.sidebar.slider(
+            f"Parent {label} Share Shift (pp)",
+            min_value=-20.0,
+            max_value=20.0,
+            value=5.0 if label == 'Q1' else -5.0 if label == 'Q5' else 0.0,
+            step=0.5,
+            key=f'counterfactual_shift_{label}'
+        )
+        for label in QUINTILE_LABELS
+    ]
+
+    st.caption(
+        "Shares are clipped at zero and renormalized to 100% per institution, so shifts that do not sum "
+        "to zero are rescaled. Enrollment sizes and each institution's outcomes for a given parent "
+        "quintile are held fixed."
+    )
+
+    # Baseline and scenario in one batched computation
+    shifts = np.zeros((2, len(tier_names), len(QUINTILE_LABELS)))
+    for name in selected_tiers:
+        shifts[1, tier_names.index(name)] = np.asarray(shift_pp) / 100
+    with stage("simulate"):
+        students = simulate(shifts)
+    baseline = outcome_tables(students[0], tier_names)
+    scenario = outcome_tables(students[1], tier_names)
+
+    # National headline
+    national_base = baseline.loc['All tiers']
+    national_scen = scenario.loc['All tiers']
+    col1, col2, col3 = st.columns(3)
+    col1.metric(
+        "Students from Q1 Families",
+        f"{national_scen['q1_share']:.1%}",
+        f"{(national_scen['q1_share'] - national_base['q1_share']) * 100:+.2f} pp"
+    )
+    col2.metric(
+        "Q1 Students Reaching Q4/Q5",
+        f"{national_scen['q1_q4q5_rate']:.1%}",
+        f"{(national_scen['q1_q4q5_rate'] - national_base['q1_q4q5_rate']) * 100:+.2f} pp"
+    )
+    col3.metric(
+        "Q1 Students Reaching Q5",
+        f"{national_scen['q1_to_q5_students']:,.0f}",
+        f"{national_scen['q1_to_q5_students'] - national_base['q1_to_q5_students']:+,.0f}"
+    )
+
+    # Kid income distribution, baseline vs scenario
+    st.subheader("Child Income Distribution")
+    view_tier = st.selectbox("Tier", options=['All tiers'] + tier_names)
+    kid_columns = [f'kid_{label}' for label in QUINTILE_LABELS]
+    fig = go.Figure([
+        go.Bar(name='Baseline', x=QUINTILE_LABELS, y=baseline.loc[view_tier, kid_columns].to_numpy()),
+        go.Bar(name='Scenario', x=QUINTILE_LABELS, y=scenario.loc[view_tier, kid_columns].to_numpy()),
+    ])
+    fig.update_layout(
+        barmode='group',
+        title=f"Child Income Quintile of All Students: {view_tier}",
+        xaxis_title="Child Income Quintile",
+        yaxis_title="Share of Students",
+        yaxis_tickformat='.0%'
+    )
+    with stage("serialize chart"):
+        st.plotly_chart(fig, use_container_width=True)
+
+    # Tier outcomes
+    st.subheader("Outcomes by Tier")
+    comparison = pd.DataFrame({
+        'Q1 Share (Baseline)': baseline['q1_share'] * 100,
+        'Q1 Share (Scenario)': scenario['q1_share'] * 100,
+        'Q1 → Q4/Q5 (Baseline)': baseline['q1_q4q5_rate'] * 100,
+        'Q1 → Q4/Q5 (Scenario)': scenario['q1_q4q5_rate'] * 100,
+        'Q1 → Q5 Students (Baseline)': baseline['q1_to_q5_students'],
+        'Q1 → Q5 Students (Scenario)': scenario['q1_to_q5_students'],
+        'Change in Q1 → Q5 Students': scenario['q1_to_q5_students'] - baseline['q1_to_q5_students'],
+    })
+    comparison.index.name = 'Tier'
+    st.dataframe(comparison.round(1), use_container_width=True)
@@ -0,0 +1,128 @@
+import streamlit as st
+import plotly.graph_objects as go
+import pandas as pd
+from utils.memory import memory_report
+
+def show_debug_panel(profile):
+    """
+    Show a flame-style breakdown of the last rerun and a memory report in the sidebar
+
+    Parameters:
+    -----------
+    profile : utils.profiling.RerunProfile
+        Finished rerun profile
+    """
+    if profile is None:
+        return
+
+    data = profile.to_dict()
+    stages = pd.DataFrame(data['stages'])
+
+    with st.sidebar.expander("🛠 Debug: rerun profile", expanded=False):
+        st.markdown(f"**{data['label'] or 'Rerun'}** — {data['total_ms']:.1f} ms total")
+
+        if stages.empty:
+            st.write("No instrumented stages ran.")
+        else:
+            show_stage_breakdown(stages)
+
+    with st.sidebar.expander("🛠 Debug: memory", expanded=False):
+        show_memory_breakdown(data.get('memory'))
+
+def show_stage_breakdown(stages):
+    """
+    Flame-style chart and per-stage table
+
+    Parameters:
+    -----------
+    stages : pd.DataFrame
+        Recorded stages of one rerun
+    """
+    # Flame-style chart: one row per nesting depth, bars placed at their start offset
+    colors = ['#1f77b4', '#ff7f0e', '#2ca02c', '#d62728', '#9467bd', '#8c564b']
+    fig = go.Figure()
+    fig.add_trace(go.Bar(
+        x=stages['duration_ms'],
+        base=stages['start_ms'],
+        y=stages['depth'],
+        orientation='h',
+        text=stages['name'],
+        textposition='inside',
+        insidetextanchor='start',
+        marker_color=[colors[d % len(colors)] for d in stages['depth']],
+        customdata=stages['alloc_blocks'],
+        hovertemplate="<br>".join([
+            "%{text}",
+            "Start: %{base:.1f} ms",
+            "Duration: %{x:.1f} ms",
+            "Net blocks: %{customdata:,}",
+            "<extra></extra>"
+        ])
+    ))
+    fig.update_layout(
+        xaxis_title="ms since rerun start",
+        yaxis=dict(autorange='reversed', dtick=1, title="Depth"),
+        bargap=0.05,
+        height=120 + 40 * (stages['depth'].max() + 1),
+        margin=dict(l=10, r=10, t=10, b=10),
+        showlegend=False
+    )
+    st.plotly_chart(fig, use_container_width=True)
+
+    # Per-stage detail, in start order
+    columns = ['name', 'depth', 'start_ms', 'duration_ms', 'alloc_blocks']
+    if 'alloc_bytes' in stages.columns:
+        columns.append('alloc_bytes')
+    st.dataframe(
+        stages[columns].style.format({'start_ms': '{:.1f}', 'duration_ms': '{:.1f}'}),
+        hide_index=True
+    )
+
+def show_memory_breakdown(rerun_memory):
+    """
+    Traced peak of this rerun, cache sizes, session state sizes and per-view peaks
+
+    Parameters:
+    -----------
+    rerun_memory : dict or None
+        RerunProfile.memory (None unless the rerun was traced)
+    """
+    report = memory_report(st.session_state.to_dict())
+    mib = 2 ** 20
+    st.markdown(f"Worker RSS: **{report['resident_bytes'] / mib:.1f} MiB**")
+
+    if rerun_memory is None:
+        st.caption("Add `&memtrace=1` to the URL to trace this rerun's allocations.")
+    else:
+        st.markdown(
+            f"This rerun: peak **{rerun_memory['peak_bytes'] / mib:.2f} MiB**, "
+            f"still allocated **{rerun_memory['retained_bytes'] / mib:.2f} MiB**"
+            + (" (approximate: another session was traced at the same time)"
+               if rerun_memory.get('approximate') else "")
+        )
+        st.dataframe(pd.DataFrame(rerun_memory['top_sites']), hide_index=True)
+
+    st.markdown("**Caches**")
+    caches = pd.DataFrame(report['caches'])
+    if caches.empty:
+        st.write("No cache entries.")
+    else:
+        caches['MiB'] = caches.pop('bytes') / mib
+        st.dataframe(caches.style.format({'MiB': '{:.2f}'}), hide_index=True)
+
+    st.markdown("**Session state**")
+    state = pd.DataFrame(report['session_state'])
+    if state.empty:
+        st.write("Session state is empty.")
+    else:
+        st.dataframe(state, hide_index=True)
+
+    if report['views']:
+        st.markdown("**Traced peak per view**")
+        views = pd.DataFrame.from_dict(report['views'], orient='index')
+        views['max_peak_MiB'] = views.pop('max_peak_bytes') / mib
+        views['last_peak_MiB'] = views.pop('last_peak_bytes') / mib
+        st.dataframe(
+            views.sort_values('max_peak_MiB', ascending=False)
+            .style.format({'max_peak_MiB': '{:.2f}', 'last_peak_MiB': '{:.2f}'})
+        )
@@ -1,7 +1,12 @@
 import streamlit as st
 import pandas as pd
 from utils.mobility_utils import create_mobility_ladder
-from utils.viz_utils import plot_mobility_ladder, plot_mobility_sankey, plot_mobility_alluvial, plot_mobility_area
+from utils.viz_utils import (
+    plot_ladder_small_multiples, plot_mobility_ladder, plot_mobility_sankey, plot_mobility_alluvial, plot_mobility_area
+)
+from utils.profiling import stage
+from views.export import show_export_controls
+from views.grouping import select_comparison, show_cluster_profiles
 
 def show_mobility_ladder(df=None, view_type="cumulative", parent_quintile=1):
     """
@@ -38,91 +43,103 @@ def show_mobility_ladder(df=None, view_type="cumulative", parent_quintile=1):
     # Create mobility ladder DataFrame
     df_mobility = create_mobility_ladder(df, parent_quintile=parent_quintile)
     
-    # Create tier selection in sidebar
-    tier_map = {
-        1: "Ivy Plus",
-        2: "Other elite schools",
-        3: "Highly selective public",
-        4: "Highly selective private",
-        5: "Selective public",
-        6: "Selective private",
-        7: "Nonselective 4-year public",
-        8: "Nonselective 4-year private",
-        10: "Four-year for-profit"
-    }
-    
-    # Allow selection of types to compare
-    st.sidebar.markdown("### Compare College Types")
-    tier1 = st.sidebar.selectbox(
-        "First Type",
-        ["All"] + list(tier_map.values()),
-        key="tier1_select"
-    )
+    # Groups to compare: tiers, control, states or mobility clusters
+    dimension, keys, names, groups, n_clusters = select_comparison(df)
+    if not groups:
+        st.info("Select at least one group to compare.")
+        return
+    df_mobility = df_mobility.assign(group=keys)
     
-    remaining_tiers = ["All"] + [t for t in tier_map.values() if t != tier1]
-    tier2 = st.sidebar.selectbox(
-        "Second Type",
-        remaining_tiers,
-        key="tier2_select"
+    # Every group is aggregated in one pass; the figures show the selected ones
+    fig_line, fig_bar, ladders = plot_mobility_ladder(
+        df_mobility, *groups, group_col='group', group_names=names
     )
     
-    # Create and display appropriate visualization
-    fig_line, fig_bar, college_data = plot_mobility_ladder(df_mobility, tier1, tier2)
-    
     if view_type == "cumulative":
-        st.plotly_chart(fig_line, use_container_width=True)
+        with stage("serialize chart"):
+            st.plotly_chart(fig_line, use_container_width=True)
     elif view_type == "individual":
-        st.plotly_chart(fig_bar, use_container_width=True)
+        with stage("serialize chart"):
+            st.plotly_chart(fig_bar, use_container_width=True)
     else:  # transitions
         st.plotly_chart(fig_line, use_container_width=True)  # You might want to create a new visualization for transitions
     
-    # Display college counts and statistics
-    st.markdown("### College Statistics")
-    
-    col1, col2 = st.columns(2)
+    # One panel per group, with "All" as the reference line
+    reference = ladders.loc['All'] if 'All' in ladders.index else None
+    panels = ladders.drop(index='All') if reference is not None else ladders
+    if len(panels) > 1:
+        st.markdown("### Small Multiples")
+        fig_multiples = plot_ladder_small_multiples(
+            panels, cumulative=view_type != "individual", reference=reference
+        )
+        with stage("serialize chart"):
+            st.plotly_chart(fig_multiples, use_container_width=True)
     
-    for tier_name, col in [(tier1, col1), (tier2, col2)]:
-        if tier_name in college_data:
-            tier_df = college_data[tier_name]
-            with col:
-                st.markdown(f"""
-                #### {tier_name}
-                - Number of colleges: {len(tier_df)}
-                - Average Q{parent_quintile} enrollment: {(tier_df['par_q'].mean() * 100):.1f}%
-                - Average Q5 mobility rate: {(tier_df['kq5_cond_parq'].mean() * 100):.1f}%
-                """)
+    if n_clusters is not None:
+        show_cluster_profiles(n_clusters)
     
-    # Display colleges for each type
-    st.markdown("### Colleges by Type")
+    # Display college counts and statistics
+    st.markdown("### College Statistics")
+    stats = pd.DataFrame({
+        'Colleges': ladders['colleges'],
+        f'Average Q{parent_quintile} Enrollment %': (ladders['par_q'] * 100).round(1),
+        'Average Q5 Mobility Rate %': (ladders['kq5_cond_parq'] * 100).round(1),
+        'Average Q4+Q5 Mobility Rate %': (ladders['q4q5'] * 100).round(1)
+    })
+    stats.index.name = dimension
+    st.dataframe(stats, use_container_width=True)
     
-    col1, col2 = st.columns(2)
+    # Display colleges for each group
+    st.markdown("### Colleges by Group")
     
     column_config = {
+        'group': dimension,
         'name': 'College Name',
         'par_q': f'Q{parent_quintile} Enrollment %',
         'mobility_rate': 'Q4+Q5 Mobility Rate'
     }
     
-    for tier_name, col in [(tier1, col1), (tier2, col2)]:
-        if tier_name in college_data:
-            tier_df = college_data[tier_name]
-            with col:
-                st.markdown(f"#### {tier_name} Colleges")
-                # Calculate Q4+Q5 mobility rate
-                tier_df['mobility_rate'] = tier_df['kq4_cond_parq'] + tier_df['kq5_cond_parq']
-                
-                # Create display DataFrame with selected columns
-                display_df = tier_df[['name', 'par_q', 'mobility_rate']].copy()
-                
-                # Format percentages
-                display_df['par_q'] = (display_df['par_q'] * 100).round(1)
-                display_df['mobility_rate'] = (display_df['mobility_rate'] * 100).round(1)
-                
-                st.dataframe(
-                    display_df,
-                    column_config=column_config,
-                    height=400
-                )
+    # One mask for every selected group ("All" lists everything only on its own)
+    labels = keys.map(names)
+    listed = [g for g in groups if g != 'All']
+    if listed:
+        mask = labels.isin(listed).to_numpy()
+        group_labels = labels[mask]
+    else:
+        mask = slice(None)
+        group_labels = 'All'
+    # (df_mobility may be shared with other sessions, so don't modify it)
+    colleges = df_mobility.loc[mask, ['name', 'par_q']].assign(
+        group=group_labels,
+        super_opeid=df.loc[mask, 'super_opeid'],
+        mobility_rate=df_mobility['kq4_cond_parq'] + df_mobility['kq5_cond_parq']
+    )
+    group_order = {g: i for i, g in enumerate(groups)}
+    colleges = colleges.sort_values(
+        ['group', 'mobility_rate'],
+        ascending=[True, False],
+        key=lambda col: col.map(group_order) if col.name == 'group' else col
+    )
+    display_df = colleges.assign(
+        par_q=(colleges['par_q'] * 100).round(1),
+        mobility_rate=(colleges['mobility_rate'] * 100).round(1)
+    )
+    
+    st.dataframe(
+        display_df[['group', 'name', 'par_q', 'mobility_rate']],
+        column_config=column_config,
+        hide_index=True,
+        height=400
+    )
+    show_export_controls(
+        colleges[['group', 'super_opeid', 'name', 'par_q', 'mobility_rate']].rename(columns={
+            'group': dimension.lower().replace(' ', '_'),
+            'par_q': f'par_q{parent_quintile}',
+            'mobility_rate': f'q4q5_cond_parq{parent_quintile}'
+        }),
+        file_stem=f"colleges_by_{dimension.lower().replace(' ', '_')}_q{parent_quintile}",
+        key="export_colleges"
+    )
 
 def show_mobility_visualizations(df):
     """
@@ -168,7 +185,8 @@ def show_mobility_visualizations(df):
     The width of each flow represents the percentage of students.
     """)
     sankey_fig = plot_mobility_sankey(tier_df, selected_tier)
-    st.plotly_chart(sankey_fig, use_container_width=True)
+    with stage("serialize chart"):
+        st.plotly_chart(sankey_fig, use_container_width=True)
     
     # Display Alluvial plot
     st.subheader("Mobility Transitions")
@@ -177,7 +195,8 @@ def show_mobility_visualizations(df):
     The thickness of each line represents the percentage of students making that transition.
     """)
     alluvial_fig = plot_mobility_alluvial(tier_df, selected_tier)
-    st.plotly_chart(alluvial_fig, use_container_width=True)
+    with stage("serialize chart"):
+        st.plotly_chart(alluvial_fig, use_container_width=True)
     
     # Display Area chart
     st.subheader("Cumulative Mobility Distribution")
@@ -186,7 +205,69 @@ def show_mobility_visualizations(df):
     Each color represents a different destination quintile.
     """)
     area_fig = plot_mobility_area(tier_df, selected_tier)
-    st.plotly_chart(area_fig, use_container_width=True)
+    with stage("serialize chart"):
+        st.plotly_chart(area_fig, use_container_width=True)
+
+def show_validation_report():
+    """
+    Show the validation report stored with the current snapshot
+    """
+    from utils.data_utils import get_snapshot
+    from utils.validation import SUM_TOLERANCE, report_frames
+    
+    st.header("Validation Report")
+    try:
+        report = get_snapshot().validation_report()
+    except Exception as e:
+        st.error(f"Error loading validation report: {e}")
+        return
+    if report is None:
+        st.info("The current snapshot was built without the cost table, so it has no validation report.")
+        return
+    
+    checks, failures = report_frames(report)
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Institutions Checked", f"{report['rows']:,}")
+    col2.metric("Checks Passed", f"{(checks['status'] == 'pass').sum()} / {len(checks)}")
+    col3.metric("Failing Rows", f"{checks['failures'].sum():,}")
+    
+    if report['passed']:
+        st.success("Every check passed when the data was ingested.")
+    else:
+        st.warning("Some checks failed when the data was ingested; the failing rows are listed below.")
+    
+    st.dataframe(
+        checks,
+        hide_index=True,
+        use_container_width=True,
+        column_config={
+            'check': 'Check',
+            'scope': 'Scope',
+            'rows': 'Rows',
+            'missing': 'Rows with Missing Values',
+            'failures': 'Failures',
+            'worst': st.column_config.NumberColumn("Worst Deviation", format="%.2e"),
+            'status': 'Status'
+        }
+    )
+    if not failures.empty:
+        st.markdown("#### Failing Rows")
+        st.dataframe(
+            failures,
+            hide_index=True,
+            use_container_width=True,
+            column_config={
+                'check': 'Check',
+                'scope': 'Column / Scope',
+                'super_opeid': 'super_opeid',
+                'name': 'Institution',
+                'value': 'Value'
+            }
+        )
+    st.caption(
+        f"Sums must be within {SUM_TOLERANCE:g} of 1; shares, rates and ranks within [0, 1]. Rows with missing "
+        "values are skipped by the sum and range checks."
+    )
 
 def show_data_verification(df, parent_quintile):
     """
@@ -197,7 +278,10 @@ def show_data_verification(df, parent_quintile):
     # Create processed dataset
     df_mobility = create_mobility_ladder(df, parent_quintile=parent_quintile)
     
-    # 1. Show summary statistics
+    # 1. Ingest-time validation report (computed once per snapshot build)
+    show_validation_report()
+    
+    # 2. Show summary statistics
     st.header("Summary Statistics")
     col1, col2 = st.columns(2)
     
@@ -244,7 +328,7 @@ def show_data_verification(df, parent_quintile):
         })
         st.dataframe(processed_stats.style.format({'Mean': '{:.1f}%'}))
     
-    # 2. Show sample comparisons
+    # 3. Show sample comparisons
     st.header("Sample Data Comparison")
     sample_size = st.slider("Number of colleges to show", 5, 20, 10)
     
@@ -271,7 +355,7 @@ def show_data_verification(df, parent_quintile):
         })
     )
     
-    # 3. Distribution plots
+    # 4. Distribution plots
     st.header("Value Distributions")
     
     # Create distribution plot using plotly express
@@ -301,4 +385,5 @@ def show_data_verification(df, parent_quintile):
         showlegend=True
     )
     
-    st.plotly_chart(fig, use_container_width=True)
\ No newline at end of file
+    with stage("serialize chart"):
+        st.plotly_chart(fig, use_container_width=True)
\ No newline at end of file
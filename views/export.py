@@ -0,0 +1,50 @@
+import streamlit as st
+from utils.export import EXPORT_FORMATS, available_formats, cost_column_options, export_bytes, with_cost_columns
+
+
+def show_export_controls(df, file_stem, key):
+    """
+    Export controls for a result table, optionally with table10 columns; the
+    file is encoded only after "Prepare" is clicked
+
+    Parameters:
+    -----------
+    df : pd.DataFrame
+        Rows to export, unformatted; a super_opeid column enables the
+        table10 column picker
+    file_stem : str
+        Download file name without extension
+    key : str
+        Widget key prefix, unique on the page
+    """
+    with st.expander("Export"):
+        formats = available_formats()
+        col1, col2 = st.columns([3, 1])
+        extra = []
+        if 'super_opeid' in df.columns:
+            extra = col1.multiselect(
+                "Add table10 Columns",
+                options=[c for c in cost_column_options() if c not in df.columns],
+                key=f"{key}_cost_columns",
+                help="Institutional characteristics from table10, matched by super_opeid"
+            )
+        fmt = col2.radio(
+            "Format",
+            formats,
+            horizontal=True,
+            key=f"{key}_format",
+            help=None if "Parquet" in formats else "Install pyarrow to export Parquet"
+        )
+
+        # Encoded only on request, so ordinary reruns export nothing
+        rows = f"{len(df):,} row{'' if len(df) == 1 else 's'}"
+        if not st.button(f"Prepare {rows} as {fmt}", key=f"{key}_prepare"):
+            return
+        extension, mime = EXPORT_FORMATS[fmt]
+        st.download_button(
+            f"Download {file_stem}.{extension}",
+            data=export_bytes(with_cost_columns(df, extra), fmt),
+            file_name=f"{file_stem}.{extension}",
+            mime=mime,
+            key=f"{key}_download"
+        )
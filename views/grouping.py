@@ -0,0 +1,153 @@
+import streamlit as st
+from utils.clustering import DEFAULT_K, K_RANGE, cluster_names
+
+
+def select_grouping():
+    """
+    Sidebar choice between the fixed tiers and k-means mobility clusters
+
+    Returns:
+    --------
+    int or None
+        Number of clusters, or None to group by tier
+    """
+    st.sidebar.markdown("### Grouping")
+    grouping = st.sidebar.radio(
+        "Group Institutions By",
+        ["Tier", "Mobility Cluster"],
+        horizontal=True,
+        help="Mobility clusters group institutions with similar transition matrices and parent income mix, across tiers"
+    )
+    if grouping == "Tier":
+        return None
+    return st.sidebar.slider(
+        "Number of Clusters",
+        min_value=K_RANGE.start,
+        max_value=K_RANGE.stop - 1,
+        value=DEFAULT_K
+    )
+
+
+def cluster_labels(k):
+    """
+    Cluster id per super_opeid and display names for k clusters
+
+    Returns:
+    --------
+    tuple
+        (pd.Series super_opeid -> cluster id, dict cluster id -> name)
+    """
+    from utils.artifacts import mobility_clusters
+    assignments, _ = mobility_clusters(k)
+    return assignments, cluster_names(k)
+
+
+def show_cluster_profiles(k):
+    """
+    Expander describing each cluster's centroid
+    """
+    from utils.artifacts import mobility_clusters
+    _, profile = mobility_clusters(k)
+    with st.expander("Cluster Profiles"):
+        st.caption(
+            "Clusters come from k-means on each institution's 5×5 mobility transition matrix and parent "
+            "income shares. They are numbered by the Q1 → Q4+Q5 rate of their centroid, highest first."
+        )
+        display = profile.copy()
+        display.index = display.index.map(cluster_names(k))
+        percent_cols = [c for c in display.columns if c not in ('colleges', 'top_tier')]
+        display[percent_cols] = (display[percent_cols] * 100).round(1)
+        st.dataframe(
+            display,
+            column_config={
+                'colleges': 'Colleges',
+                **{f'par_q{p}': f'Parent Q{p} %' for p in range(1, 6)},
+                **{f'kq{q}_cond_parq1': f'Q1 → Q{q} %' for q in range(1, 6)},
+                'q1_q4q5': 'Q1 → Q4+Q5 %',
+                'top_tier': 'Most Common Tier'
+            }
+        )
+
+
+COMPARE_DIMENSIONS = ["Tier", "Institution Control", "State", "Mobility Cluster"]
+
+CONTROL_NAMES = {
+    1: "Public",
+    2: "Private non-profit",
+    3: "For-profit"
+}
+
+
+def comparison_keys(df, dimension, k=None):
+    """
+    Group id of every row of df for a comparison dimension
+
+    Returns:
+    --------
+    tuple
+        (pd.Series of group ids aligned with df, dict group id -> label)
+    """
+    from utils.mobility_utils import TIER_NAMES
+    if dimension == "Tier":
+        return df['tier'], dict(TIER_NAMES)
+    if dimension == "Institution Control":
+        return df['type'], CONTROL_NAMES
+    if dimension == "State":
+        keys = df['state'].astype(object)
+        return keys, {state: state for state in sorted(keys.dropna().unique())}
+    if dimension == "Mobility Cluster":
+        assignments, names = cluster_labels(k)
+        return df['super_opeid'].map(assignments), names
+    raise ValueError(f"unknown comparison dimension {dimension!r}")
+
+
+def select_comparison(df, extra_dimensions=None):
+    """
+    Sidebar controls for an N-way group comparison
+
+    Parameters:
+    -----------
+    df : pd.DataFrame
+        Rows to compare, with tier, type, state and super_opeid columns
+    extra_dimensions : dict, optional
+        View-specific dimensions offered first: label -> (keys, names)
+
+    Returns:
+    --------
+    tuple
+        (dimension label, keys aligned with df, dict id -> label, selected
+        labels in the order picked, number of clusters or None)
+    """
+    extra_dimensions = extra_dimensions or {}
+    st.sidebar.markdown("### Compare Groups")
+    dimension = st.sidebar.selectbox("Compare By", list(extra_dimensions) + COMPARE_DIMENSIONS)
+
+    n_clusters = None
+    if dimension in extra_dimensions:
+        keys, names = extra_dimensions[dimension]
+    else:
+        if dimension == "Mobility Cluster":
+            n_clusters = st.sidebar.slider(
+                "Number of Clusters",
+                min_value=K_RANGE.start,
+                max_value=K_RANGE.stop - 1,
+                value=DEFAULT_K
+            )
+        keys, names = comparison_keys(df, dimension, n_clusters)
+
+    # Small dimensions default to every group, larger ones to the three biggest
+    sizes = keys.value_counts()
+    present = [g for g in names if sizes.get(g, 0) > 0]
+    if len(present) <= 5:
+        default = [names[g] for g in present]
+    else:
+        default = [names[g] for g in sorted(present, key=lambda g: -sizes[g])[:3]]
+
+    selected = st.sidebar.multiselect(
+        "Groups",
+        ["All"] + [names[g] for g in present],
+        default=["All"] + default,
+        key=f"compare_groups_{dimension}_{n_clusters}",
+        help="Every group is aggregated in one pass, so comparing more groups costs the same"
+    )
+    return dimension, keys, names, selected, n_clusters
@@ -1,5 +1,73 @@
 import streamlit as st
 import pandas as pd
+from utils.mobility_utils import TIER_NAMES
+from utils.profiling import stage
+from utils.stats_models import PROFILE_METRICS
+from views.export import show_export_controls
+
+def _ordinal(n):
+    """
+    1 -> '1st', 22 -> '22nd', 85 -> '85th'
+    """
+    suffix = 'th' if 10 <= n % 100 <= 20 else {1: 'st', 2: 'nd', 3: 'rd'}.get(n % 10, 'th')
+    return f"{n}{suffix}"
+
+def _format_metric(col, value):
+    """
+    Display a PROFILE_METRICS value
+    """
+    if pd.isna(value):
+        return "N/A"
+    if col in ('sticker_price_2013', 'scorecard_netprice_2013'):
+        return f"${value:,.0f}"
+    if col == 'count':
+        return f"{value:,.0f}"
+    return f"{value * 100:.1f}%" if value >= 0.001 or value == 0 else f"{value * 100:.2f}%"
+
+def _standing(ranks, col, scope, group_name):
+    """
+    '85th percentile among Selective public colleges' from the rank table
+    """
+    pct = ranks[f'{col}_pct_{scope}']
+    if pd.isna(pct):
+        return None
+    return f"{_ordinal(int(round(pct)))} percentile {group_name}"
+
+def _rank_table(ranks, tier_label, state):
+    """
+    One row per profile metric with its value, the three percentiles and
+    the number of institutions each is ranked among
+    """
+    rows = []
+    for col, (section, label) in PROFILE_METRICS.items():
+        row = {'section': section, 'metric': label, 'value': _format_metric(col, ranks[col])}
+        for scope in ('national', 'tier', 'state'):
+            row[scope] = ranks[f'{col}_pct_{scope}']
+            row[f'{scope}_n'] = ranks[f'{col}_n_{scope}']
+        rows.append(row)
+    table = pd.DataFrame(rows)
+    progress = lambda title: st.column_config.ProgressColumn(title, min_value=0, max_value=100, format="%.0f")
+    st.dataframe(
+        table,
+        hide_index=True,
+        use_container_width=True,
+        column_config={
+            'section': 'Section',
+            'metric': 'Metric',
+            'value': 'Value',
+            'national': progress("Nationally"),
+            'national_n': st.column_config.NumberColumn("n", format="%d"),
+            'tier': progress(f"Among {tier_label}"),
+            'tier_n': st.column_config.NumberColumn("n", format="%d"),
+            'state': progress(f"In {state}"),
+            'state_n': st.column_config.NumberColumn("n", format="%d"),
+        }
+    )
+    st.caption(
+        "Percentiles rank every four-year college on each metric (higher value = higher percentile, "
+        "ties averaged); n counts the colleges with a value for that metric. For prices, a high "
+        "percentile means more expensive."
+    )
 
 def show_institution_profile(df):
     """
@@ -86,6 +154,23 @@ def show_institution_profile(df):
         except (StopIteration, KeyError):
             st.markdown("**Other**")
     
+    # Precomputed percentiles: one lookup by super_opeid
+    from utils.artifacts import institution_percentiles
+    try:
+        ranks = institution_percentiles().loc[inst_data['super_opeid']]
+    except KeyError:
+        ranks = None
+    tier_label = TIER_NAMES.get(inst_data['tier'], "Other")
+    among_tier = f"among {tier_label} colleges"
+    
+    if ranks is not None:
+        standing = _standing(ranks, 'q4q5_cond_parq1', 'tier', among_tier)
+        if standing:
+            st.markdown(
+                f"**Q1 → Q4+Q5 mobility rate: {_format_metric('q4q5_cond_parq1', ranks['q4q5_cond_parq1'])}**, "
+                f"{standing} and {_standing(ranks, 'q4q5_cond_parq1', 'national', 'nationally')}"
+            )
+    
     # Add cost information in a separate section
     st.markdown("### Cost Information (2013)")
     
@@ -95,12 +180,16 @@ def show_institution_profile(df):
         f"${inst_data['sticker_price_2013']:,.0f}",
         help="Total published cost before financial aid (tuition, fees, room & board)"
     )
+    if ranks is not None:
+        standing = _standing(ranks, 'sticker_price_2013', 'tier', among_tier)
+        if standing:
+            st.caption(f"{standing} (higher = more expensive)")
     
     # Display mobility metrics
     st.markdown("### Mobility Metrics")
     
     # Create tabs for different views
-    tab1, tab2 = st.tabs(["Parent Income Distribution", "Mobility Rates"])
+    tab1, tab2, tab3 = st.tabs(["Parent Income Distribution", "Mobility Rates", "Percentile Ranks"])
     
     with tab1:
         # Show only the bar chart
@@ -139,7 +228,8 @@ def show_institution_profile(df):
         )
         
         # Display chart
-        st.plotly_chart(fig, use_container_width=True)
+        with stage("serialize chart"):
+            st.plotly_chart(fig, use_container_width=True)
     
     with tab2:
         # Create grouped bar chart for mobility rates
@@ -204,7 +294,8 @@ def show_institution_profile(df):
         )
         
         # Display chart
-        st.plotly_chart(fig, use_container_width=True)
+        with stage("serialize chart"):
+            st.plotly_chart(fig, use_container_width=True)
         
         # Add explanation
         st.markdown("""
@@ -213,4 +304,21 @@ def show_institution_profile(df):
         - Red line shows combined Q4+Q5 mobility rate
         - Rates are shown for students from each parent income quintile
         """)
-        
\ No newline at end of file
+        
+    
+    with tab3:
+        if ranks is None:
+            st.info("No percentile ranks are available for this institution.")
+        else:
+            _rank_table(ranks, tier_label, inst_data.get('state', 'N/A'))
+    
+    # Full record of the institution, with its percentiles
+    st.markdown("### Export Profile")
+    profile = df[df['name'] == selected_institution].iloc[[0]]
+    if ranks is not None:
+        profile = profile.assign(**{col: ranks[col] for col in ranks.index if '_pct_' in col})
+    show_export_controls(
+        profile,
+        file_stem="".join(ch if ch.isalnum() else "_" for ch in selected_institution.lower()),
+        key="export_profile"
+    )
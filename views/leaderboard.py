@@ -0,0 +1,163 @@
+import numpy as np
+import plotly.graph_objects as go
+import streamlit as st
+from utils.mobility_utils import TIER_NAMES
+from utils.profiling import stage
+from utils.stats_models import RATE_COMPONENTS
+
+RATES = {
+    "Q1 → Q5": 'mr_kq5_pq1',
+    "Q1 → Top 1%": 'mr_ktop1_pq1'
+}
+
+TIER_COLORS = ['#1f77b4', '#ff7f0e', '#2ca02c', '#d62728', '#9467bd',
+               '#8c564b', '#e377c2', '#7f7f7f', '#bcbd22']
+
+
+def show_mobility_rate_leaderboard():
+    """
+    Leaderboard of the headline mobility rates, decomposed into access
+    (share of students from Q1 families) and success (share of those
+    students reaching the top)
+    """
+    from utils.artifacts import mobility_rate_leaderboard
+
+    st.title("Mobility Rate Leaderboard")
+
+    st.markdown("""
+    A college's **mobility rate** is the share of all its students who came from bottom-quintile
+    families *and* reached the top of the income distribution. It is the product of two parts:
+
+    - **Access**: the share of students from bottom-quintile (Q1) families
+    - **Success**: the share of those Q1 students who reach the top quintile (or top 1%)
+
+    Two colleges with the same rate can get there very differently; rank by either part to see how.
+    """)
+
+    try:
+        board = mobility_rate_leaderboard()
+    except Exception as e:
+        st.error(f"Error loading data: {e}")
+        return
+
+    # Leaderboard settings
+    st.sidebar.markdown("### Leaderboard")
+    rate_label = st.sidebar.radio("Mobility Rate", list(RATES), horizontal=True)
+    rank_by = st.sidebar.radio("Rank By", ["Mobility rate", "Access", "Success"], horizontal=True)
+    basis = st.sidebar.radio(
+        "Percentiles",
+        ["Within tier", "National"],
+        horizontal=True,
+        help="Compare each institution with its own tier or with all four-year colleges"
+    )
+    selected_tiers = st.sidebar.multiselect(
+        "Tiers",
+        options=list(TIER_NAMES.values()),
+        help="Leave empty to include every tier"
+    )
+    top_n = st.sidebar.slider("Institutions Shown", min_value=10, max_value=200, value=50, step=10)
+
+    rate = RATES[rate_label]
+    access, success = RATE_COMPONENTS[rate]
+    sort_col = {"Mobility rate": rate, "Access": access, "Success": success}[rank_by]
+    suffix = '_pct_tier' if basis == "Within tier" else '_pct_national'
+
+    if selected_tiers:
+        tier_ids = [t for t, name in TIER_NAMES.items() if name in selected_tiers]
+        board = board[board['tier'].isin(tier_ids)]
+    if board.empty:
+        st.info("No institutions match the selected tiers.")
+        return
+
+    # Precomputed columns, so re-ranking is a single argsort
+    order = np.argsort(-board[sort_col].to_numpy(), kind='stable')
+    top = board.iloc[order[:top_n]]
+
+    # Access vs success, with the top institutions highlighted
+    fig = go.Figure()
+    for color, (tier, name) in zip(TIER_COLORS, TIER_NAMES.items()):
+        tier_df = board[board['tier'] == tier]
+        if tier_df.empty:
+            continue
+        highlighted = tier_df['super_opeid'].isin(top['super_opeid'])
+        fig.add_trace(go.Scatter(
+            x=tier_df[access] * 100,
+            y=tier_df[success] * 100,
+            mode='markers',
+            name=name,
+            text=tier_df['name'],
+            customdata=tier_df[rate] * 100,
+            marker=dict(
+                color=color,
+                size=np.where(highlighted, 10, 5),
+                opacity=np.where(highlighted, 0.95, 0.35),
+                line=dict(width=np.where(highlighted, 1, 0), color='black')
+            ),
+            hovertemplate="<br>".join([
+                "%{text}",
+                "Access: %{x:.1f}%",
+                "Success: %{y:.1f}%",
+                "Mobility rate: %{customdata:.2f}%",
+                "<extra></extra>"
+            ])
+        ))
+
+    # Iso-rate curves: every point on a curve has the same mobility rate
+    x = np.linspace(max(board[access].min(), 1e-3), board[access].max(), 200)
+    for q in (0.5, 0.9):
+        level = board[rate].quantile(q)
+        fig.add_trace(go.Scatter(
+            x=x * 100,
+            y=np.minimum(level / x, 1) * 100,
+            mode='lines',
+            name=f"{q:.0%} percentile rate ({level * 100:.2f}%)",
+            line=dict(color='gray', dash='dot' if q == 0.5 else 'dash', width=1),
+            hoverinfo='skip'
+        ))
+
+    fig.update_layout(
+        title=f"Access vs Success ({rate_label})",
+        xaxis_title="Access: Students from Q1 Families (%)",
+        yaxis_title=f"Success: Q1 Students Reaching {rate_label.split('→ ')[1]} (%)",
+        yaxis_range=[0, min(100, board[success].max() * 110)],
+        height=600
+    )
+    with stage("serialize chart"):
+        st.plotly_chart(fig, use_container_width=True)
+
+    # Leaderboard table
+    st.markdown(f"### Top {len(top)} by {rank_by} ({rate_label})")
+    table = top[['name', 'tier', 'state']].assign(
+        tier=top['tier'].map(TIER_NAMES),
+        rate=top[rate] * 100,
+        access=top[access] * 100,
+        success=top[success] * 100,
+        rate_pct=top[rate + suffix],
+        access_pct=top[access + suffix],
+        success_pct=top[success + suffix]
+    )
+    table.insert(0, 'rank', np.arange(1, len(table) + 1))
+    percentile_column = lambda label: st.column_config.ProgressColumn(
+        f"{label} Pctl ({basis.lower()})", min_value=0, max_value=100, format="%.0f"
+    )
+    st.dataframe(
+        table,
+        hide_index=True,
+        use_container_width=True,
+        column_config={
+            'rank': 'Rank',
+            'name': 'Institution',
+            'tier': 'Tier',
+            'state': 'State',
+            'rate': st.column_config.NumberColumn("Mobility Rate %", format="%.2f"),
+            'access': st.column_config.NumberColumn("Access %", format="%.1f"),
+            'success': st.column_config.NumberColumn("Success %", format="%.1f"),
+            'rate_pct': percentile_column("Rate"),
+            'access_pct': percentile_column("Access"),
+            'success_pct': percentile_column("Success")
+        }
+    )
+    st.caption(
+        "Mobility rate = access × success. Percentiles average ties; within-tier percentiles compare "
+        "each institution with the other institutions of its tier."
+    )
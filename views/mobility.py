@@ -2,6 +2,7 @@
 import streamlit as st
 from utils.mobility_utils import create_mobility_ladder
 from utils.viz_utils import plot_mobility_sankey, plot_mobility_alluvial, plot_mobility_area
+from utils.profiling import stage
 
 def show_mobility_visualizations(df):
     """
@@ -47,7 +48,8 @@ def show_mobility_visualizations(df):
     The width of each flow represents the percentage of students.
     """)
     sankey_fig = plot_mobility_sankey(tier_df, selected_tier)
-    st.plotly_chart(sankey_fig, use_container_width=True)
+    with stage("serialize chart"):
+        st.plotly_chart(sankey_fig, use_container_width=True)
     
     # Display Alluvial plot
     st.subheader("Mobility Transitions")
@@ -56,7 +58,8 @@ def show_mobility_visualizations(df):
     The thickness of each line represents the percentage of students making that transition.
     """)
     alluvial_fig = plot_mobility_alluvial(tier_df, selected_tier)
-    st.plotly_chart(alluvial_fig, use_container_width=True)
+    with stage("serialize chart"):
+        st.plotly_chart(alluvial_fig, use_container_width=True)
     
     # Display Area chart
     st.subheader("Cumulative Mobility Distribution")
@@ -65,4 +68,5 @@ def show_mobility_visualizations(df):
     Each color represents a different destination quintile.
     """)
     area_fig = plot_mobility_area(tier_df, selected_tier)
-    st.plotly_chart(area_fig, use_container_width=True)
\ No newline at end of file
+    with stage("serialize chart"):
+        st.plotly_chart(area_fig, use_container_width=True)
\ No newline at end of file
@@ -1,11 +1,21 @@
+from itertools import cycle
 import streamlit as st
 import plotly.express as px
 import plotly.graph_objects as go
 import pandas as pd
+from utils.profiling import stage
+from utils.viz_utils import GROUP_COLORS
+from views.export import show_export_controls
+from views.grouping import select_comparison, show_cluster_profiles
 
-def show_mobility_work_analysis(df):
+def show_mobility_work_analysis(df=None):
     """
     Show analysis of institutional mobility work
+    
+    Parameters:
+    -----------
+    df : pd.DataFrame, optional
+        Merged dataset. If None, uses the cached mobility work rankings
     """
     st.title("Institutional Mobility Work Analysis")
     
@@ -17,76 +27,40 @@ def show_mobility_work_analysis(df):
     - Extra weight for institutions serving more disadvantaged students
     """)
     
-    # Calculate work metrics
-    from utils.stats_models import calculate_mobility_work
-    df_work = calculate_mobility_work(df)
-    
-    # Calculate average mobility score
-    df_work['avg_mobility_score'] = (
-        df_work['kq2_cond_parq1'] + 
-        df_work['kq3_cond_parq1'] + 
-        df_work['kq4_cond_parq1'] + 
-        df_work['kq5_cond_parq1']
-    ) * 25
-    
-    # Create institution type grouping
-    def get_institution_type(row):
-        if row['tier'] in [1, 2]:
-            return 'Elite Private'
-        elif row['tier'] in [3]:
-            return 'Highly Selective Public'
-        elif row['tier'] in [4]:
-            return 'Highly Selective Private'
-        elif row['tier'] in [5]:
-            return 'Selective Public'
-        elif row['tier'] in [6]:
-            return 'Selective Private'
-        else:
-            return 'Other'
-    
-    df_work['institution_type'] = df_work.apply(get_institution_type, axis=1)
-    
-    # Add institution type selection to sidebar
-    st.sidebar.markdown("### Compare Institution Types")
-    
+    # Calculate work metrics (cached on disk for the full dataset)
+    if df is None:
+        from utils.artifacts import mobility_work_rankings
+        try:
+            df_work = mobility_work_rankings()
+        except Exception as e:
+            st.error(f"Error loading data: {e}")
+            return
+    else:
+        from utils.stats_models import mobility_work_scores
+        df_work = mobility_work_scores(df)
+    
+    # Institution types, tiers, control, states or mobility clusters
     institution_types = ['Elite Private', 'Highly Selective Public', 
                         'Highly Selective Private', 'Selective Public', 
                         'Selective Private', 'Other']
-    
-    type1 = st.sidebar.selectbox(
-        "First Institution Type",
-        options=institution_types,
-        key='type1'
-    )
-    
-    remaining_types = [t for t in institution_types if t != type1]
-    type2 = st.sidebar.selectbox(
-        "Second Institution Type",
-        options=remaining_types,
-        key='type2'
-    )
-    
-    # Filter data for selected types
-    df_type1 = df_work[df_work['institution_type'] == type1]
-    df_type2 = df_work[df_work['institution_type'] == type2]
-    
-    # Calculate combined Q1-Q4 enrollment for each filtered dataset
-    df_type1['bottom_80_pct'] = (
-        df_type1['par_q1'] + 
-        df_type1['par_q2'] + 
-        df_type1['par_q3'] + 
-        df_type1['par_q4']
-    )
-    
-    df_type2['bottom_80_pct'] = (
-        df_type2['par_q1'] + 
-        df_type2['par_q2'] + 
-        df_type2['par_q3'] + 
-        df_type2['par_q4']
+    dimension, keys, names, groups, n_clusters = select_comparison(
+        df_work,
+        extra_dimensions={
+            "Institution Type": (df_work['institution_type'], {t: t for t in institution_types})
+        }
     )
-    
-    # Combine selected data for visualizations
-    df_selected = pd.concat([df_type1, df_type2])
+    if not groups:
+        st.info("Select at least one group to compare.")
+        return
+    
+    # One mask for every selected group; "All" appends the full dataset once
+    labels = keys.map(names)
+    in_groups = labels.isin(groups).to_numpy()
+    df_selected = df_work[in_groups].assign(group=labels[in_groups])
+    if 'All' in groups:
+        df_selected = pd.concat([df_work.assign(group='All'), df_selected], ignore_index=True)
+    # Ordered like the selection, so groupby and sorting follow it
+    df_selected['group'] = pd.Categorical(df_selected['group'], categories=groups, ordered=True)
     
     # Create visualizations with filtered data
     st.subheader("Mobility Work Comparison")
@@ -94,49 +68,40 @@ def show_mobility_work_analysis(df):
     # Box plot of mobility work
     fig1 = px.box(
         df_selected,
-        x='institution_type',
+        x='group',
         y='mobility_work',
+        category_orders={'group': groups},
         title="Distribution of Mobility Work",
         labels={
-            'institution_type': 'Institution Type',
+            'group': dimension,
             'mobility_work': 'Mobility Work Score'
         }
     )
-    st.plotly_chart(fig1, use_container_width=True)
+    with stage("serialize chart"):
+        st.plotly_chart(fig1, use_container_width=True)
+    
+    if n_clusters is not None:
+        show_cluster_profiles(n_clusters)
     
     # Scatter plot comparing mobility work vs sticker price
     fig2 = go.Figure()
     
-    # Add traces for each institution type
-    fig2.add_trace(go.Scatter(
-        x=df_type1['sticker_price_2013'],
-        y=df_type1['mobility_work'],
-        mode='markers',
-        name=type1,
-        marker=dict(color='#1f77b4'),
-        text=df_type1['name'],
-        hovertemplate="<br>".join([
-            "Institution: %{text}",
-            "Sticker Price: $%{x:,.0f}",
-            "Work Score: %{y:.1f}",
-            "<extra></extra>"
-        ])
-    ))
-    
-    fig2.add_trace(go.Scatter(
-        x=df_type2['sticker_price_2013'],
-        y=df_type2['mobility_work'],
-        mode='markers',
-        name=type2,
-        marker=dict(color='#2ca02c'),
-        text=df_type2['name'],
-        hovertemplate="<br>".join([
-            "Institution: %{text}",
-            "Sticker Price: $%{x:,.0f}",
-            "Work Score: %{y:.1f}",
-            "<extra></extra>"
-        ])
-    ))
+    # Add a trace for each group
+    for color, (group, df_group) in zip(cycle(GROUP_COLORS), df_selected.groupby('group', observed=True)):
+        fig2.add_trace(go.Scatter(
+            x=df_group['sticker_price_2013'],
+            y=df_group['mobility_work'],
+            mode='markers',
+            name=group,
+            marker=dict(color=color),
+            text=df_group['name'],
+            hovertemplate="<br>".join([
+                "Institution: %{text}",
+                "Sticker Price: $%{x:,.0f}",
+                "Work Score: %{y:.1f}",
+                "<extra></extra>"
+            ])
+        ))
     
     fig2.update_layout(
         title=f"Mobility Work vs Sticker Price",
@@ -146,49 +111,53 @@ def show_mobility_work_analysis(df):
         xaxis=dict(tickformat="$,.0f")  # Format x-axis ticks as currency
     )
     
-    st.plotly_chart(fig2, use_container_width=True)
-    
-    # Show summary statistics side by side
-    col1, col2 = st.columns(2)
+    with stage("serialize chart"):
+        st.plotly_chart(fig2, use_container_width=True)
+    
+    # Summary statistics, one row per group
+    st.subheader("Group Statistics")
+    grouped = df_selected.groupby('group', observed=True)
+    stats = grouped.agg(
+        institutions=('name', 'size'),
+        mobility_work=('mobility_work', 'mean'),
+        avg_mobility_score=('avg_mobility_score', 'mean'),
+        bottom_80_pct=('bottom_80_pct', 'mean')
+    )
+    stats['bottom_80_pct'] = stats['bottom_80_pct'] * 100
+    stats.index.name = dimension
+    st.dataframe(
+        stats,
+        use_container_width=True,
+        column_config={
+            'institutions': 'Number of Institutions',
+            'mobility_work': st.column_config.NumberColumn("Average Mobility Work", format="%.1f"),
+            'avg_mobility_score': st.column_config.NumberColumn("Average Mobility Score", format="%.1f%%"),
+            'bottom_80_pct': st.column_config.NumberColumn("Average Q1-Q4 Enrollment", format="%.1f%%")
+        }
+    )
     
-    with col1:
-        st.subheader(f"{type1} Statistics")
-        st.metric("Number of Institutions", len(df_type1))
-        st.metric("Average Mobility Work", f"{df_type1['mobility_work'].mean():.1f}")
-        st.metric("Average Mobility Score", f"{df_type1['avg_mobility_score'].mean():.1f}%")
-        st.metric("Average Q1-Q4 Enrollment", f"{df_type1['bottom_80_pct'].mean() * 100:.1f}%")
-        
-        # Show top 10 institutions
-        st.markdown(f"#### Top 10 {type1} Institutions")
-        top10_1 = df_type1.nlargest(10, 'mobility_work')[
-            ['name', 'mobility_work', 'avg_mobility_score', 'bottom_80_pct']
-        ].copy()
-        top10_1['bottom_80_pct'] = top10_1['bottom_80_pct'] * 100
-        st.dataframe(
-            top10_1.style.format({
-                'mobility_work': '{:.1f}',
-                'avg_mobility_score': '{:.1f}%',
-                'bottom_80_pct': '{:.1f}%'
-            }).set_properties(**{'text-align': 'left'})
-        )
+    # Show top 10 institutions of each group
+    st.markdown("#### Top 10 Institutions per Group")
+    top10 = (
+        df_selected.sort_values(['group', 'mobility_work'], ascending=[True, False])
+        .groupby('group', observed=True).head(10)
+    )
+    top10 = top10.assign(bottom_80_pct=top10['bottom_80_pct'] * 100)
+    st.dataframe(
+        top10[['group', 'name', 'mobility_work', 'avg_mobility_score', 'bottom_80_pct']].style.format({
+            'mobility_work': '{:.1f}',
+            'avg_mobility_score': '{:.1f}%',
+            'bottom_80_pct': '{:.1f}%'
+        }).set_properties(**{'text-align': 'left'}),
+        hide_index=True
+    )
     
-    with col2:
-        st.subheader(f"{type2} Statistics")
-        st.metric("Number of Institutions", len(df_type2))
-        st.metric("Average Mobility Work", f"{df_type2['mobility_work'].mean():.1f}")
-        st.metric("Average Mobility Score", f"{df_type2['avg_mobility_score'].mean():.1f}%")
-        st.metric("Average Q1-Q4 Enrollment", f"{df_type2['bottom_80_pct'].mean() * 100:.1f}%")
-        
-        # Show top 10 institutions
-        st.markdown(f"#### Top 10 {type2} Institutions")
-        top10_2 = df_type2.nlargest(10, 'mobility_work')[
-            ['name', 'mobility_work', 'avg_mobility_score', 'bottom_80_pct']
-        ].copy()
-        top10_2['bottom_80_pct'] = top10_2['bottom_80_pct'] * 100
-        st.dataframe(
-            top10_2.style.format({
-                'mobility_work': '{:.1f}',
-                'avg_mobility_score': '{:.1f}%',
-                'bottom_80_pct': '{:.1f}%'
-            }).set_properties(**{'text-align': 'left'})
-        ) 
\ No newline at end of file
+    # Full ranking of the selected groups
+    st.markdown("#### Export Rankings")
+    ranking = df_selected.sort_values(['group', 'mobility_work'], ascending=[True, False])
+    show_export_controls(
+        ranking[['group', 'super_opeid', 'name', 'tier', 'state', 'mobility_work',
+                 'avg_mobility_score', 'bottom_80_pct', 'sticker_price_2013']],
+        file_stem=f"mobility_work_by_{dimension.lower().replace(' ', '_')}",
+        key="export_mobility_work"
+    )
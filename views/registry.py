@@ -0,0 +1,57 @@
+# views/registry.py
+import importlib
+from utils.profiling import stage
+
+# Maps a view key to the module and function that render it. Modules are only
+# imported on first navigation, so plotly and pandas stay out of the cold
+# start of a worker that only serves the Home page.
+VIEW_REGISTRY = {
+    "mobility_ladder": ("views.economic", "show_mobility_ladder"),
+    "data_verification": ("views.economic", "show_data_verification"),
+    "mobility_visualizations": ("views.mobility", "show_mobility_visualizations"),
+    "affordability": ("views.affordability", "show_affordability_analysis"),
+    "institution_profile": ("views.institution", "show_institution_profile"),
+    "enrollment_patterns": ("views.enrollment", "show_enrollment_patterns"),
+    "counterfactual": ("views.counterfactual", "show_counterfactual_simulator"),
+    "mobility_work": ("views.mobility_work", "show_mobility_work_analysis"),
+    "mobility_rate_leaderboard": ("views.leaderboard", "show_mobility_rate_leaderboard"),
+    "sql_query": ("views.sql_query", "show_sql_query"),
+    "covariate_correlations": ("views.correlations", "show_covariate_correlations"),
+    "debug_panel": ("views.debug", "show_debug_panel"),
+}
+
+_loaded_views = {}
+
+
+def get_view(view_key):
+    """
+    Return the render function for a registered view, importing its module
+    on first use
+
+    Parameters:
+    -----------
+    view_key : str
+        Key in VIEW_REGISTRY
+    """
+    if view_key not in _loaded_views:
+        module_name, func_name = VIEW_REGISTRY[view_key]
+        module = importlib.import_module(module_name)
+        _loaded_views[view_key] = getattr(module, func_name)
+    return _loaded_views[view_key]
+
+
+def show_view(view_key, *args, **kwargs):
+    """
+    Render a registered view, importing it lazily
+    """
+    with stage(f"import {view_key}"):
+        view = get_view(view_key)
+    with stage(f"view {view_key}"):
+        return view(*args, **kwargs)
+
+
+def view_modules():
+    """
+    Return the distinct view modules in registration order
+    """
+    return list(dict.fromkeys(module for module, _ in VIEW_REGISTRY.values()))
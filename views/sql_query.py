@@ -0,0 +1,62 @@
+import time
+import streamlit as st
+from utils.sql_engine import (
+    DEFAULT_ROW_LIMIT, EXAMPLE_QUERY, MAX_ROW_LIMIT, run_query, sql_available, table_columns
+)
+
+def show_sql_query():
+    """
+    Ad-hoc, read-only SQL over the compiled dataset
+    """
+    st.title("SQL Query")
+
+    st.markdown("""
+    Ask ad-hoc questions of the four-year college data with SQL. Queries run in an embedded
+    engine directly over the compiled dataset; only a single `SELECT` is allowed and results
+    are capped at the row limit.
+    """)
+
+    if not sql_available():
+        st.info("This view needs the optional `duckdb` package (`pip install duckdb`).")
+        return
+
+    with st.expander("Tables and columns", expanded=False):
+        try:
+            tables = table_columns()
+        except Exception as e:
+            st.error(f"Error loading data: {e}")
+            return
+        table = st.selectbox("Table", list(tables))
+        st.dataframe(tables[table], hide_index=True, use_container_width=True)
+        st.caption(
+            "`type`: 1 = public, 2 = private non-profit, 3 = for-profit. "
+            "`region`: 1 = Northeast, 2 = Midwest, 3 = South, 4 = West."
+        )
+
+    with st.form("sql_query"):
+        sql = st.text_area("Query", EXAMPLE_QUERY, height=240)
+        limit = st.number_input(
+            "Row limit",
+            min_value=1,
+            max_value=MAX_ROW_LIMIT,
+            value=DEFAULT_ROW_LIMIT,
+            step=100
+        )
+        submitted = st.form_submit_button("Run query")
+
+    if not submitted:
+        return
+
+    started = time.perf_counter()
+    try:
+        result, truncated = run_query(sql, limit)
+    except ValueError as e:
+        st.error(f"Query failed: {e}")
+        return
+    elapsed_ms = (time.perf_counter() - started) * 1000
+
+    caption = f"{len(result):,} rows in {elapsed_ms:.0f} ms"
+    if truncated:
+        caption += f" (cut at the row limit of {limit:,})"
+    st.caption(caption)
+    st.dataframe(result, hide_index=True, use_container_width=True)